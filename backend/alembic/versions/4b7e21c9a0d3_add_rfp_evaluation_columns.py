@@ -0,0 +1,28 @@
+"""Add stored evaluation columns to rfp_info
+
+Revision ID: 4b7e21c9a0d3
+Revises: d831ca347721
+Create Date: 2026-10-19 09:12:44.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e21c9a0d3'
+down_revision: Union[str, None] = 'd831ca347721'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('rfp_info', sa.Column('rfp_evaluation_json', sa.JSON(), nullable=True))
+    op.add_column('rfp_info', sa.Column('rfp_evaluation_fingerprint', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('rfp_info', 'rfp_evaluation_fingerprint')
+    op.drop_column('rfp_info', 'rfp_evaluation_json')
@@ -0,0 +1,126 @@
+"""Move raw RFP/email text into a compressed, content-addressed blob store
+
+Revision ID: 9c2f5a7d3e18
+Revises: 4b7e21c9a0d3
+Create Date: 2026-10-19 14:03:27.540912
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.compression import compress_text, content_hash, decompress_text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c2f5a7d3e18'
+down_revision: Union[str, None] = '4b7e21c9a0d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COMPRESSION_LEVEL = 3
+
+text_blob = sa.table(
+    'text_blob',
+    sa.column('blob_hash', sa.String),
+    sa.column('blob_codec', sa.String),
+    sa.column('blob_data', sa.LargeBinary),
+    sa.column('blob_size', sa.Integer),
+    sa.column('blob_created_at', sa.DateTime)
+)
+
+
+def _create_blob_table(table_name: str, *extra_columns) -> None:
+    op.create_table(
+        table_name,
+        sa.Column('blob_hash', sa.String(length=64), nullable=False),
+        sa.Column('blob_codec', sa.String(length=10), nullable=False),
+        sa.Column('blob_data', sa.LargeBinary(), nullable=False),
+        sa.Column('blob_size', sa.Integer(), nullable=False),
+        sa.Column('blob_created_at', sa.DateTime(), nullable=False),
+        *extra_columns,
+        sa.PrimaryKeyConstraint('blob_hash')
+    )
+
+
+def _move_text_to_blobs(table_name: str, key_column: str, text_column: str, hash_column: str, stored_hashes: set) -> None:
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(f'SELECT {key_column}, {text_column} FROM {table_name}')).fetchall()
+    for row_key, raw_text in rows:
+        raw_text = raw_text or ''
+        blob_hash = content_hash(raw_text)
+        if blob_hash not in stored_hashes:
+            blob_codec, blob_data = compress_text(raw_text, COMPRESSION_LEVEL)
+            connection.execute(text_blob.insert(), [{
+                'blob_hash': blob_hash,
+                'blob_codec': blob_codec,
+                'blob_data': blob_data,
+                'blob_size': len(raw_text),
+                'blob_created_at': datetime.utcnow()
+            }])
+            stored_hashes.add(blob_hash)
+        connection.execute(
+            sa.text(f'UPDATE {table_name} SET {hash_column} = :blob_hash WHERE {key_column} = :row_key'),
+            {'blob_hash': blob_hash, 'row_key': row_key}
+        )
+
+
+def _restore_text_from_blobs(table_name: str, key_column: str, text_column: str, hash_column: str) -> None:
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(f'''
+        SELECT t.{key_column}, COALESCE(b.blob_codec, a.blob_codec), COALESCE(b.blob_data, a.blob_data)
+        FROM {table_name} t
+        LEFT JOIN text_blob b ON b.blob_hash = t.{hash_column}
+        LEFT JOIN text_blob_archive a ON a.blob_hash = t.{hash_column}
+    ''')).fetchall()
+    for row_key, blob_codec, blob_data in rows:
+        connection.execute(
+            sa.text(f'UPDATE {table_name} SET {text_column} = :raw_text WHERE {key_column} = :row_key'),
+            {'raw_text': decompress_text(blob_codec, blob_data) if blob_codec else '', 'row_key': row_key}
+        )
+
+
+def upgrade() -> None:
+    _create_blob_table('text_blob')
+    _create_blob_table('text_blob_archive', sa.Column('blob_archived_at', sa.DateTime(), nullable=False))
+
+    op.add_column('rfp_info', sa.Column('rfp_raw_text_hash', sa.String(length=64), nullable=True))
+    op.add_column('vendor_rfp_response', sa.Column('email_raw_text_hash', sa.String(length=64), nullable=True))
+
+    stored_hashes = set()
+    _move_text_to_blobs('rfp_info', 'rfp_id', 'rfp_raw_text', 'rfp_raw_text_hash', stored_hashes)
+    _move_text_to_blobs('vendor_rfp_response', 'id', 'email_raw_text', 'email_raw_text_hash', stored_hashes)
+
+    with op.batch_alter_table('rfp_info') as batch_op:
+        batch_op.alter_column('rfp_raw_text_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.drop_column('rfp_raw_text')
+    with op.batch_alter_table('vendor_rfp_response') as batch_op:
+        batch_op.alter_column('email_raw_text_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.drop_column('email_raw_text')
+
+    op.create_index(op.f('ix_rfp_info_rfp_raw_text_hash'), 'rfp_info', ['rfp_raw_text_hash'], unique=False)
+    op.create_index(
+        op.f('ix_vendor_rfp_response_email_raw_text_hash'), 'vendor_rfp_response', ['email_raw_text_hash'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_vendor_rfp_response_email_raw_text_hash'), table_name='vendor_rfp_response')
+    op.drop_index(op.f('ix_rfp_info_rfp_raw_text_hash'), table_name='rfp_info')
+
+    op.add_column('rfp_info', sa.Column('rfp_raw_text', sa.Text(), nullable=True))
+    op.add_column('vendor_rfp_response', sa.Column('email_raw_text', sa.Text(), nullable=True))
+    _restore_text_from_blobs('rfp_info', 'rfp_id', 'rfp_raw_text', 'rfp_raw_text_hash')
+    _restore_text_from_blobs('vendor_rfp_response', 'id', 'email_raw_text', 'email_raw_text_hash')
+
+    with op.batch_alter_table('rfp_info') as batch_op:
+        batch_op.alter_column('rfp_raw_text', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_column('rfp_raw_text_hash')
+    with op.batch_alter_table('vendor_rfp_response') as batch_op:
+        batch_op.alter_column('email_raw_text', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_column('email_raw_text_hash')
+
+    op.drop_table('text_blob_archive')
+    op.drop_table('text_blob')
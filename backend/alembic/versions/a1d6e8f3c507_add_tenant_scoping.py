@@ -0,0 +1,134 @@
+"""Scope vendors, RFPs and responses by tenant with tenant-leading indexes
+
+Existing rows move to the default tenant. With TENANT_RESPONSE_HASH_PARTITIONS
+set, vendor_rfp_response is also rebuilt as a hash-partitioned table on Postgres.
+
+Revision ID: a1d6e8f3c507
+Revises: f4c9a2d7b5e1
+Create Date: 2026-10-19 20:31:16.902457
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1d6e8f3c507'
+down_revision: Union[str, None] = 'f4c9a2d7b5e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TENANT_INDEXES = [
+    ('ix_vendor_info_tenant_created', 'vendor_info', ['tenant_id', 'vendor_created_at']),
+    ('ix_rfp_info_tenant_created', 'rfp_info', ['tenant_id', 'rfp_created_at']),
+    ('ix_rfp_info_tenant_status', 'rfp_info', ['tenant_id', 'rfp_status']),
+    ('ix_rfp_info_tenant_title', 'rfp_info', ['tenant_id', 'rfp_title']),
+    ('ix_vendor_rfp_response_tenant_vendor', 'vendor_rfp_response', ['tenant_id', 'fk_vendor_id']),
+]
+RESPONSE_INDEXES = [
+    "CREATE INDEX ix_vendor_rfp_response_id ON vendor_rfp_response (id)",
+    "CREATE INDEX ix_vendor_rfp_response_email_raw_text_hash ON vendor_rfp_response (email_raw_text_hash)",
+    "CREATE INDEX ix_vendor_rfp_response_tenant_vendor ON vendor_rfp_response (tenant_id, fk_vendor_id)",
+    "CREATE INDEX ix_vendor_rfp_response_email_parsed_json ON vendor_rfp_response "
+    "USING gin (email_parsed_json jsonb_path_ops)",
+]
+
+
+def _rebuild_response_table(partition_count: int):
+    """Copy vendor_rfp_response into a fresh table, hash-partitioned by tenant when partition_count > 0.
+
+    Partitioned tables need the partition key in every unique constraint, so
+    the primary key becomes (id, tenant_id); ids still come from the same sequence.
+    """
+    op.execute("ALTER TABLE vendor_rfp_response RENAME TO vendor_rfp_response_rebuild")
+    op.execute("ALTER SEQUENCE vendor_rfp_response_id_seq OWNED BY NONE")
+    partition_clause = " PARTITION BY HASH (tenant_id)" if partition_count else ""
+    op.execute(
+        "CREATE TABLE vendor_rfp_response (LIKE vendor_rfp_response_rebuild INCLUDING DEFAULTS)"
+        + partition_clause
+    )
+    for remainder in range(partition_count):
+        op.execute(
+            f"CREATE TABLE vendor_rfp_response_p{remainder} PARTITION OF vendor_rfp_response "
+            f"FOR VALUES WITH (MODULUS {partition_count}, REMAINDER {remainder})"
+        )
+    op.execute("INSERT INTO vendor_rfp_response SELECT * FROM vendor_rfp_response_rebuild")
+    op.execute("DROP TABLE vendor_rfp_response_rebuild")
+    op.execute("ALTER SEQUENCE vendor_rfp_response_id_seq OWNED BY vendor_rfp_response.id")
+
+    primary_key_columns = "id, tenant_id" if partition_count else "id"
+    op.execute(f"ALTER TABLE vendor_rfp_response ADD CONSTRAINT vendor_rfp_response_pkey "
+               f"PRIMARY KEY ({primary_key_columns})")
+    op.execute("ALTER TABLE vendor_rfp_response ADD CONSTRAINT unique_rfp_vendor "
+               "UNIQUE (tenant_id, fk_rfp_id, fk_vendor_id)")
+    op.execute("ALTER TABLE vendor_rfp_response ADD CONSTRAINT vendor_rfp_response_fk_rfp_id_fkey "
+               "FOREIGN KEY (fk_rfp_id) REFERENCES rfp_info (rfp_id)")
+    op.execute("ALTER TABLE vendor_rfp_response ADD CONSTRAINT vendor_rfp_response_fk_vendor_id_fkey "
+               "FOREIGN KEY (fk_vendor_id) REFERENCES vendor_info (vendor_id)")
+    for statement in RESPONSE_INDEXES:
+        op.execute(statement)
+
+
+def _response_table_is_partitioned() -> bool:
+    return bool(op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'vendor_rfp_response'::regclass"
+    )).first())
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    for table_name in ('vendor_info', 'rfp_info', 'vendor_rfp_response'):
+        op.add_column(table_name, sa.Column(
+            'tenant_id', sa.String(length=64), nullable=False, server_default=settings.default_tenant_id
+        ))
+
+    op.drop_index('ix_vendor_info_vendor_email', table_name='vendor_info')
+    op.create_index('ix_vendor_info_vendor_email', 'vendor_info', ['vendor_email'], unique=False)
+    op.create_index('uq_vendor_info_tenant_email', 'vendor_info', ['tenant_id', 'vendor_email'], unique=True)
+
+    with op.batch_alter_table('vendor_rfp_response') as batch_op:
+        batch_op.drop_constraint('unique_rfp_vendor', type_='unique')
+        batch_op.create_unique_constraint('unique_rfp_vendor', ['tenant_id', 'fk_rfp_id', 'fk_vendor_id'])
+
+    for index_name, table_name, columns in TENANT_INDEXES:
+        op.create_index(index_name, table_name, columns)
+
+    if is_postgresql and settings.tenant_response_hash_partitions > 0:
+        op.drop_index('ix_vendor_rfp_response_tenant_vendor', table_name='vendor_rfp_response')
+        _rebuild_response_table(settings.tenant_response_hash_partitions)
+
+
+def downgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    if is_postgresql and _response_table_is_partitioned():
+        op.execute("DROP INDEX ix_vendor_rfp_response_tenant_vendor")
+        op.execute("ALTER TABLE vendor_rfp_response DROP CONSTRAINT unique_rfp_vendor")
+        op.execute("ALTER TABLE vendor_rfp_response DROP CONSTRAINT vendor_rfp_response_pkey")
+        op.execute("ALTER TABLE vendor_rfp_response DROP CONSTRAINT vendor_rfp_response_fk_rfp_id_fkey")
+        op.execute("ALTER TABLE vendor_rfp_response DROP CONSTRAINT vendor_rfp_response_fk_vendor_id_fkey")
+        for index_name in ('ix_vendor_rfp_response_id', 'ix_vendor_rfp_response_email_raw_text_hash',
+                           'ix_vendor_rfp_response_email_parsed_json'):
+            op.execute(f"DROP INDEX {index_name}")
+        _rebuild_response_table(0)
+
+    for index_name, table_name, _ in reversed(TENANT_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
+
+    # Fails if two tenants now share a vendor/RFP pair or a vendor email; those must be merged first.
+    with op.batch_alter_table('vendor_rfp_response') as batch_op:
+        batch_op.drop_constraint('unique_rfp_vendor', type_='unique')
+        batch_op.create_unique_constraint('unique_rfp_vendor', ['fk_rfp_id', 'fk_vendor_id'])
+
+    op.drop_index('uq_vendor_info_tenant_email', table_name='vendor_info')
+    op.drop_index('ix_vendor_info_vendor_email', table_name='vendor_info')
+    op.create_index('ix_vendor_info_vendor_email', 'vendor_info', ['vendor_email'], unique=True)
+
+    # Plain drops: rfp_info has generated columns that a batch table copy can't recreate on SQLite.
+    for table_name in ('vendor_rfp_response', 'rfp_info', 'vendor_info'):
+        op.drop_column(table_name, 'tenant_id')
@@ -0,0 +1,62 @@
+"""Soft-delete RFPs and vendors; track blob reuse for the retention purge
+
+Revision ID: b2e7c4f9d613
+Revises: a1d6e8f3c507
+Create Date: 2026-10-19 21:47:03.551920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e7c4f9d613'
+down_revision: Union[str, None] = 'a1d6e8f3c507'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE_VENDOR = sa.text('vendor_deleted_at IS NULL')
+
+
+def upgrade() -> None:
+    op.add_column('rfp_info', sa.Column('rfp_deleted_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_rfp_info_rfp_deleted_at'), 'rfp_info', ['rfp_deleted_at'])
+    op.add_column('vendor_info', sa.Column('vendor_deleted_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_vendor_info_vendor_deleted_at'), 'vendor_info', ['vendor_deleted_at'])
+
+    op.drop_index('uq_vendor_info_tenant_email', table_name='vendor_info')
+    op.create_index(
+        'uq_vendor_info_tenant_email', 'vendor_info', ['tenant_id', 'vendor_email'], unique=True,
+        postgresql_where=LIVE_VENDOR, sqlite_where=LIVE_VENDOR
+    )
+
+    with op.batch_alter_table('vendor_rfp_response') as batch_op:
+        batch_op.alter_column('email_raw_text_hash', existing_type=sa.String(length=64), nullable=True)
+
+    for table_name in ('text_blob', 'text_blob_archive'):
+        op.add_column(table_name, sa.Column('blob_used_at', sa.DateTime(), nullable=True))
+        op.execute(f"UPDATE {table_name} SET blob_used_at = blob_created_at")
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column('blob_used_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    for table_name in ('text_blob_archive', 'text_blob'):
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column('blob_used_at')
+
+    # Expired emails have no text left; an empty hash reads back as no text.
+    op.execute("UPDATE vendor_rfp_response SET email_raw_text_hash = '' WHERE email_raw_text_hash IS NULL")
+    with op.batch_alter_table('vendor_rfp_response') as batch_op:
+        batch_op.alter_column('email_raw_text_hash', existing_type=sa.String(length=64), nullable=False)
+
+    # Fails while a soft-deleted vendor shares its email with a live one; run the purge first.
+    op.drop_index('uq_vendor_info_tenant_email', table_name='vendor_info')
+    op.create_index('uq_vendor_info_tenant_email', 'vendor_info', ['tenant_id', 'vendor_email'], unique=True)
+
+    op.drop_index(op.f('ix_vendor_info_vendor_deleted_at'), table_name='vendor_info')
+    op.drop_column('vendor_info', 'vendor_deleted_at')
+    op.drop_index(op.f('ix_rfp_info_rfp_deleted_at'), table_name='rfp_info')
+    op.drop_column('rfp_info', 'rfp_deleted_at')
@@ -0,0 +1,76 @@
+"""JSONB documents with GIN indexes and generated budget/timeline columns
+
+Revision ID: b5d08e6f41c2
+Revises: 9c2f5a7d3e18
+Create Date: 2026-10-19 15:21:09.772316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.models.json_columns import json_integer, json_number
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d08e6f41c2'
+down_revision: Union[str, None] = '9c2f5a7d3e18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSON_DOCUMENT_COLUMNS = [
+    ('rfp_info', 'rfp_structured_json'),
+    ('rfp_info', 'rfp_evaluation_json'),
+    ('vendor_rfp_response', 'email_parsed_json'),
+]
+GIN_INDEXES = [
+    ('ix_rfp_info_rfp_structured_json', 'rfp_info', 'rfp_structured_json'),
+    ('ix_vendor_rfp_response_email_parsed_json', 'vendor_rfp_response', 'email_parsed_json'),
+]
+GENERATED_COLUMNS = [
+    ('rfp_budget_min', sa.Float(), json_number('rfp_structured_json', 'budget_range', 'min')),
+    ('rfp_budget_max', sa.Float(), json_number('rfp_structured_json', 'budget_range', 'max')),
+    ('rfp_timeline_days', sa.Integer(), json_integer('rfp_structured_json', 'timeline_days')),
+]
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    if is_postgresql:
+        for table_name, column_name in JSON_DOCUMENT_COLUMNS:
+            op.alter_column(
+                table_name, column_name,
+                type_=postgresql.JSONB(), existing_type=sa.JSON(),
+                postgresql_using=f'{column_name}::jsonb'
+            )
+        for index_name, table_name, column_name in GIN_INDEXES:
+            op.create_index(
+                index_name, table_name, [column_name],
+                postgresql_using='gin', postgresql_ops={column_name: 'jsonb_path_ops'}
+            )
+
+    # Generated columns are STORED on Postgres; SQLite can only add VIRTUAL ones via ALTER TABLE.
+    for column_name, column_type, expression in GENERATED_COLUMNS:
+        op.add_column('rfp_info', sa.Column(column_name, column_type, sa.Computed(expression), nullable=True))
+        op.create_index(op.f(f'ix_rfp_info_{column_name}'), 'rfp_info', [column_name], unique=False)
+
+
+def downgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    for column_name, _, _ in reversed(GENERATED_COLUMNS):
+        op.drop_index(op.f(f'ix_rfp_info_{column_name}'), table_name='rfp_info')
+        op.drop_column('rfp_info', column_name)
+
+    if is_postgresql:
+        for index_name, table_name, _ in GIN_INDEXES:
+            op.drop_index(index_name, table_name=table_name)
+        for table_name, column_name in JSON_DOCUMENT_COLUMNS:
+            op.alter_column(
+                table_name, column_name,
+                type_=sa.JSON(), existing_type=postgresql.JSONB(),
+                postgresql_using=f'{column_name}::json'
+            )
@@ -0,0 +1,28 @@
+"""Index vendor_rfp_response by RFP
+
+Tenant scoping widened unique_rfp_vendor to (tenant_id, fk_rfp_id, fk_vendor_id),
+which left lookups by fk_rfp_id alone without a usable index.
+
+Revision ID: c5f1a8e2d734
+Revises: b2e7c4f9d613
+Create Date: 2026-10-19 23:12:40.318275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f1a8e2d734'
+down_revision: Union[str, None] = 'b2e7c4f9d613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_vendor_rfp_response_fk_rfp_id', 'vendor_rfp_response', ['fk_rfp_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vendor_rfp_response_fk_rfp_id', table_name='vendor_rfp_response')
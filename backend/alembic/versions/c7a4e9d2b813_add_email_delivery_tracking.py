@@ -0,0 +1,67 @@
+"""Add partitioned email delivery event log and per-vendor delivery state
+
+Revision ID: c7a4e9d2b813
+Revises: b5d08e6f41c2
+Create Date: 2026-10-19 16:48:51.203377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a4e9d2b813'
+down_revision: Union[str, None] = 'b5d08e6f41c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    op.create_table(
+        'email_delivery_event',
+        sa.Column('event_timestamp', sa.DateTime(), nullable=False),
+        sa.Column('sg_event_id', sa.String(length=100), nullable=False),
+        sa.Column('event_type', sa.String(length=32), nullable=False),
+        sa.Column('rfp_id', sa.Integer(), nullable=True),
+        sa.Column('vendor_id', sa.Integer(), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=True),
+        sa.Column('sg_message_id', sa.String(length=255), nullable=True),
+        sa.Column('event_payload', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=True),
+        sa.Column('event_received_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('event_timestamp', 'sg_event_id', name='pk_email_delivery_event'),
+        postgresql_partition_by='RANGE (event_timestamp)'
+    )
+    op.create_index(
+        'ix_email_delivery_event_rfp_vendor', 'email_delivery_event', ['rfp_id', 'vendor_id', 'event_timestamp']
+    )
+    if is_postgresql:
+        # Monthly partitions are created on demand by the app; this catches anything outside them.
+        op.execute('CREATE TABLE email_delivery_event_default PARTITION OF email_delivery_event DEFAULT')
+
+    op.create_table(
+        'rfp_vendor_delivery_state',
+        sa.Column('rfp_id', sa.Integer(), nullable=False),
+        sa.Column('vendor_id', sa.Integer(), nullable=False),
+        sa.Column('delivery_status', sa.String(length=32), nullable=False),
+        sa.Column('delivery_status_rank', sa.Integer(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.Column('delivered_at', sa.DateTime(), nullable=True),
+        sa.Column('first_opened_at', sa.DateTime(), nullable=True),
+        sa.Column('open_count', sa.Integer(), nullable=False),
+        sa.Column('click_count', sa.Integer(), nullable=False),
+        sa.Column('failure_reason', sa.String(length=500), nullable=True),
+        sa.Column('last_event_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('rfp_id', 'vendor_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rfp_vendor_delivery_state')
+    op.drop_index('ix_email_delivery_event_rfp_vendor', table_name='email_delivery_event')
+    # Dropping the partitioned parent drops every partition with it.
+    op.drop_table('email_delivery_event')
@@ -0,0 +1,27 @@
+"""Index vendor_rfp_response by creation time for email-text retention
+
+Revision ID: d8a3b6f1c942
+Revises: c5f1a8e2d734
+Create Date: 2026-10-19 23:40:05.127604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a3b6f1c942'
+down_revision: Union[str, None] = 'c5f1a8e2d734'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f('ix_vendor_rfp_response_response_created_at'), 'vendor_rfp_response', ['response_created_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_vendor_rfp_response_response_created_at'), table_name='vendor_rfp_response')
@@ -0,0 +1,38 @@
+"""Add checkpoint table for resumable backfill jobs
+
+Revision ID: e3b8f1c6a924
+Revises: c7a4e9d2b813
+Create Date: 2026-10-19 18:12:37.540918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8f1c6a924'
+down_revision: Union[str, None] = 'c7a4e9d2b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'backfill_checkpoint',
+        sa.Column('job_name', sa.String(length=100), nullable=False),
+        sa.Column('job_target', sa.String(length=50), nullable=False),
+        sa.Column('last_processed_id', sa.Integer(), nullable=False),
+        sa.Column('processed_count', sa.Integer(), nullable=False),
+        sa.Column('changed_count', sa.Integer(), nullable=False),
+        sa.Column('failed_count', sa.Integer(), nullable=False),
+        sa.Column('job_status', sa.String(length=20), nullable=False),
+        sa.Column('job_started_at', sa.DateTime(), nullable=False),
+        sa.Column('job_updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('job_name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('backfill_checkpoint')
@@ -0,0 +1,96 @@
+"""Add incrementally maintained vendor performance aggregates
+
+Revision ID: f4c9a2d7b5e1
+Revises: e3b8f1c6a924
+Create Date: 2026-10-19 19:04:52.118034
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c9a2d7b5e1'
+down_revision: Union[str, None] = 'e3b8f1c6a924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+AVERAGE_COLUMNS = [
+    ('response_rate', 'CASE WHEN rfps_invited > 0 THEN responses_received * 1.0 / rfps_invited END'),
+    ('average_reply_hours', 'CASE WHEN reply_samples > 0 THEN reply_seconds_total * 1.0 / reply_samples / 3600.0 END'),
+    ('average_ai_score', 'CASE WHEN ai_score_samples > 0 THEN ai_score_total * 1.0 / ai_score_samples END'),
+    ('average_price_to_budget',
+     'CASE WHEN price_to_budget_samples > 0 THEN price_to_budget_total * 1.0 / price_to_budget_samples END'),
+]
+
+# Seed the running totals once from existing history; from here on the app only adds deltas.
+SEED_PERFORMANCE_SQL = """
+INSERT INTO vendor_performance (
+    vendor_id, rfps_invited, responses_received, reply_seconds_total, reply_samples,
+    ai_score_total, ai_score_samples, win_count, price_to_budget_total, price_to_budget_samples,
+    performance_updated_at
+)
+SELECT
+    v.vendor_id,
+    (SELECT COUNT(*) FROM rfp_vendor_delivery_state s WHERE s.vendor_id = v.vendor_id)
+        + (SELECT COUNT(*) FROM vendor_rfp_response r WHERE r.fk_vendor_id = v.vendor_id AND NOT EXISTS (
+            SELECT 1 FROM rfp_vendor_delivery_state s WHERE s.rfp_id = r.fk_rfp_id AND s.vendor_id = r.fk_vendor_id
+        )),
+    (SELECT COUNT(*) FROM vendor_rfp_response r WHERE r.fk_vendor_id = v.vendor_id),
+    COALESCE((SELECT SUM({reply_seconds}) FROM vendor_rfp_response r JOIN rfp_vendor_delivery_state s
+              ON s.rfp_id = r.fk_rfp_id AND s.vendor_id = r.fk_vendor_id
+              WHERE r.fk_vendor_id = v.vendor_id AND r.response_created_at >= s.sent_at), 0),
+    (SELECT COUNT(*) FROM vendor_rfp_response r JOIN rfp_vendor_delivery_state s
+     ON s.rfp_id = r.fk_rfp_id AND s.vendor_id = r.fk_vendor_id
+     WHERE r.fk_vendor_id = v.vendor_id AND r.response_created_at >= s.sent_at),
+    COALESCE((SELECT SUM(r.ai_score) FROM vendor_rfp_response r WHERE r.fk_vendor_id = v.vendor_id), 0),
+    (SELECT COUNT(r.ai_score) FROM vendor_rfp_response r WHERE r.fk_vendor_id = v.vendor_id),
+    (SELECT COUNT(*) FROM vendor_rfp_response r WHERE r.fk_vendor_id = v.vendor_id AND r.ai_recommended),
+    COALESCE((SELECT SUM(r.total_price / COALESCE(p.rfp_budget_max, p.rfp_budget_min))
+              FROM vendor_rfp_response r JOIN rfp_info p ON p.rfp_id = r.fk_rfp_id
+              WHERE r.fk_vendor_id = v.vendor_id AND COALESCE(p.rfp_budget_max, p.rfp_budget_min) > 0), 0),
+    (SELECT COUNT(r.total_price)
+     FROM vendor_rfp_response r JOIN rfp_info p ON p.rfp_id = r.fk_rfp_id
+     WHERE r.fk_vendor_id = v.vendor_id AND COALESCE(p.rfp_budget_max, p.rfp_budget_min) > 0),
+    CURRENT_TIMESTAMP
+FROM vendor_info v
+"""
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    op.create_table(
+        'vendor_performance',
+        sa.Column('vendor_id', sa.Integer(), nullable=False),
+        sa.Column('rfps_invited', sa.Integer(), nullable=False),
+        sa.Column('responses_received', sa.Integer(), nullable=False),
+        sa.Column('reply_seconds_total', sa.Float(), nullable=False),
+        sa.Column('reply_samples', sa.Integer(), nullable=False),
+        sa.Column('ai_score_total', sa.Float(), nullable=False),
+        sa.Column('ai_score_samples', sa.Integer(), nullable=False),
+        sa.Column('win_count', sa.Integer(), nullable=False),
+        sa.Column('price_to_budget_total', sa.Float(), nullable=False),
+        sa.Column('price_to_budget_samples', sa.Integer(), nullable=False),
+        sa.Column('performance_updated_at', sa.DateTime(), nullable=False),
+        *[sa.Column(column_name, sa.Float(), sa.Computed(expression), nullable=True)
+          for column_name, expression in AVERAGE_COLUMNS],
+        sa.ForeignKeyConstraint(['vendor_id'], ['vendor_info.vendor_id']),
+        sa.PrimaryKeyConstraint('vendor_id')
+    )
+    for column_name in ['win_count'] + [column_name for column_name, _ in AVERAGE_COLUMNS]:
+        op.create_index(op.f(f'ix_vendor_performance_{column_name}'), 'vendor_performance', [column_name])
+
+    reply_seconds = (
+        'EXTRACT(EPOCH FROM (r.response_created_at - s.sent_at))' if is_postgresql
+        else '(julianday(r.response_created_at) - julianday(s.sent_at)) * 86400.0'
+    )
+    op.execute(SEED_PERFORMANCE_SQL.format(reply_seconds=reply_seconds))
+
+
+def downgrade() -> None:
+    for column_name in ['win_count'] + [column_name for column_name, _ in AVERAGE_COLUMNS]:
+        op.drop_index(op.f(f'ix_vendor_performance_{column_name}'), table_name='vendor_performance')
+    op.drop_table('vendor_performance')
@@ -3,16 +3,129 @@ from typing import Optional
 
 class Settings(BaseSettings):
     database_url: str
+    database_replica_urls: str = ""
+    replica_max_lag_seconds: float = 5.0
+    replica_health_check_interval_seconds: float = 10.0
+    read_your_writes_window_seconds: float = 10.0
     
     port: int = 4200
     environment: str = "development"
+    # Comma-separated. Must be explicit: the frontend sends credentials, and browsers reject "*" for those.
+    cors_allowed_origins: str = "http://localhost:5173,http://127.0.0.1:5173"
     
     sendgrid_api_key: str
     sendgrid_from_email: str
     
-    groq_api_key: str
+    groq_api_key: Optional[str] = None
+    openai_api_key: Optional[str] = None
+    openai_base_url: Optional[str] = None
+    
+    llm_provider_order: str = "groq,openai"
+    llm_groq_small_model: str = "llama-3.1-8b-instant"
+    llm_groq_large_model: str = "llama-3.3-70b-versatile"
+    llm_openai_small_model: str = "gpt-4o-mini"
+    llm_openai_large_model: str = "gpt-4o"
+    llm_request_timeout_seconds: float = 60.0
+    llm_hedge_min_delay_seconds: float = 2.0
+    llm_rate_limit_per_second: float = 5.0
+    llm_rate_limit_burst: int = 10
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_reset_seconds: float = 30.0
+    
+    llm_prompt_token_budget: int = 8000
+    
+    vendor_parse_batch_size: int = 8
+    vendor_parse_batch_wait_ms: int = 50
+    vendor_parse_batch_concurrency: int = 4
+    
+    inbound_field_max_bytes: int = 2 * 1024 * 1024
+    attachment_max_count: int = 10
+    attachment_max_bytes: int = 10 * 1024 * 1024
+    attachment_max_total_bytes: int = 25 * 1024 * 1024
+    attachment_spool_memory_bytes: int = 1024 * 1024
+    attachment_max_extracted_chars: int = 20000
+    # Per DOCX/XLSX archive member, so a small zip bomb can't inflate in the extraction workers.
+    attachment_max_uncompressed_entry_bytes: int = 50 * 1024 * 1024
+    attachment_extract_workers: int = 2
+    # A worker stuck past this (pathological PDF) is killed and the pool recreated.
+    attachment_extract_timeout_seconds: float = 20.0
+    attachment_cache_size: int = 256
     
     webhook_secret: Optional[str] = None  
+    sendgrid_event_webhook_public_key: Optional[str] = None
+    sendgrid_event_webhook_max_age_seconds: int = 300
+    delivery_event_insert_chunk_size: int = 1000
+    
+    task_worker_count: int = 4
+    task_max_retries: int = 3
+    task_retry_backoff_seconds: float = 2.0
+    rfp_parse_wait_seconds: float = 10.0
+    evaluation_max_attempts: int = 2
+    # Each waiter holds a pool connection while it waits for another worker's evaluation of the same RFP.
+    evaluation_lock_wait_seconds: float = 120.0
+    
+    event_bus_backend: str = "memory"
+    event_subscriber_queue_size: int = 100
+    event_stream_keepalive_seconds: float = 15.0
+    
+    text_blob_compression_level: int = 3
+    text_blob_archive_compression_level: int = 19
+    text_blob_cache_size: int = 256
+    
+    email_template_cache_size: int = 128
+    email_reply_token_secret: Optional[str] = None
+    
+    # LLM + DB concurrency stays below AnyIO's 40 worker threads so cheap routes always get one.
+    admission_control_enabled: bool = True
+    admission_llm_max_concurrent: int = 8
+    admission_llm_max_queue: int = 16
+    admission_llm_queue_timeout_seconds: float = 5.0
+    admission_llm_client_rate_per_second: float = 1.0
+    admission_llm_client_burst: int = 5
+    admission_db_max_concurrent: int = 24
+    admission_db_max_queue: int = 64
+    admission_db_queue_timeout_seconds: float = 2.0
+    admission_db_client_rate_per_second: float = 20.0
+    admission_db_client_burst: int = 40
+    # Per-tenant quotas on top of the per-client ones, so one tenant's bulk traffic can't fill a pool.
+    admission_llm_tenant_rate_per_second: float = 4.0
+    admission_llm_tenant_burst: int = 16
+    admission_db_tenant_rate_per_second: float = 50.0
+    admission_db_tenant_burst: int = 100
+    admission_cheap_max_concurrent: int = 64
+    admission_cheap_max_queue: int = 64
+    admission_cheap_queue_timeout_seconds: float = 1.0
+    # Shared by all provider webhook deliveries (SendGrid inbound + events), which skip per-client buckets.
+    admission_webhook_rate_per_second: float = 50.0
+    admission_webhook_burst: int = 200
+    admission_max_tracked_clients: int = 10000
+    admission_trust_forwarded_for: bool = False
+    
+    server_timing_enabled: bool = True
+    profiling_admin_token: Optional[str] = None
+    profiling_sample_rate: float = 0.0
+    profiling_sample_interval_ms: float = 5.0
+    profiling_output_dir: str = "profiles"
+    profiling_tracemalloc_top: int = 25
+    
+    backfill_batch_size: int = 100
+    backfill_concurrency: int = 4
+    
+    # Tenants come from the X-Tenant-ID header, which a trusted gateway is expected to set.
+    tenant_header_required: bool = False
+    default_tenant_id: str = "default"
+    # In-process caches (text blobs, email templates, attachments) keep their total size; one tenant may fill at most this share.
+    tenant_cache_max_share: float = 0.5
+    # Read by the tenancy migration: hash-partition vendor_rfp_response by tenant on Postgres.
+    tenant_response_hash_partitions: int = 0
+    
+    # Deleted RFPs/vendors are hidden at once; `python -m app.jobs.purge` removes their rows after this long.
+    purge_deleted_after_hours: float = 24.0
+    purge_batch_size: int = 500
+    purge_batch_pause_seconds: float = 0.05
+    purge_blob_min_idle_hours: float = 1.0
+    # 0 keeps raw vendor emails forever; parsed fields are always kept.
+    retention_email_raw_text_days: int = 0
     
     class Config:
         env_file = ".env"
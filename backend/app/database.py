@@ -1,9 +1,19 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from itertools import count
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.config import settings
 
+PRIMARY_STICKY_COOKIE = "rfp_primary_until"
+
 database_engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
@@ -14,9 +24,123 @@ DatabaseSession = sessionmaker(autocommit=False, autoflush=False, bind=database_
 
 BaseModel = declarative_base()
 
+
+class ReadOnlySession(Session):
+    """Session bound to a replica; flushing from it is always a bug."""
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def reject_replica_writes(session, flush_context, instances):
+    raise RuntimeError("Attempted to write through a read-replica session")
+
+
+class ReplicaRouter:
+    """Round-robins reads across healthy replicas.
+
+    A background thread health-checks replicas every
+    ``health_check_interval_seconds``, so requests never wait on a probe; a
+    replica is skipped while it is unreachable or lagging more than
+    ``max_lag_seconds`` behind the primary.
+    """
+
+    def __init__(self, replica_urls: List[str], max_lag_seconds: float, health_check_interval_seconds: float):
+        self.replica_engines = [
+            create_engine(url, pool_pre_ping=True, echo=settings.environment == "development")
+            for url in replica_urls
+        ]
+        self.max_lag_seconds = max_lag_seconds
+        self.health_check_interval_seconds = health_check_interval_seconds
+        self._healthy_engines: List[Engine] = list(self.replica_engines)
+        self._round_robin = count()
+        self._health_check_thread: Optional[threading.Thread] = None
+        self._stop_health_checks = threading.Event()
+
+    def start(self):
+        if not self.replica_engines or self._health_check_thread is not None:
+            return
+        self._stop_health_checks.clear()
+        self._health_check_thread = threading.Thread(
+            target=self._check_health_periodically, name="replica-health-check", daemon=True
+        )
+        self._health_check_thread.start()
+
+    def stop(self):
+        self._stop_health_checks.set()
+        self._health_check_thread = None
+
+    def pick_engine(self) -> Optional[Engine]:
+        if not self.replica_engines:
+            return None
+        healthy_engines = self._healthy_engines
+        if not healthy_engines:
+            return None
+        return healthy_engines[next(self._round_robin) % len(healthy_engines)]
+
+    def _check_health_periodically(self):
+        while not self._stop_health_checks.is_set():
+            self._healthy_engines = [engine for engine in self.replica_engines if self._is_healthy(engine)]
+            self._stop_health_checks.wait(self.health_check_interval_seconds)
+
+    def _is_healthy(self, engine: Engine) -> bool:
+        try:
+            with engine.connect() as connection:
+                if engine.dialect.name != "postgresql":
+                    connection.execute(text("SELECT 1"))
+                    return True
+                lag_seconds = connection.execute(text(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                )).scalar()
+                return lag_seconds is None or lag_seconds <= self.max_lag_seconds
+        except Exception:
+            return False
+
+
+replica_router = ReplicaRouter(
+    replica_urls=[url.strip() for url in settings.database_replica_urls.split(",") if url.strip()],
+    max_lag_seconds=settings.replica_max_lag_seconds,
+    health_check_interval_seconds=settings.replica_health_check_interval_seconds
+)
+
+ReadReplicaSession = sessionmaker(class_=ReadOnlySession, autocommit=False, autoflush=False)
+
+
 def get_database_session():
     database_session = DatabaseSession()
     try:
         yield database_session
     finally:
         database_session.close()
+
+
+def get_read_database_session(incoming_request: Request):
+    """Session for read-only endpoints: a healthy replica, or the primary.
+
+    Clients that wrote recently carry a sticky cookie and keep reading from
+    the primary until it expires, so they always see their own writes.
+    """
+    replica_engine = None
+    try:
+        primary_until = float(incoming_request.cookies.get(PRIMARY_STICKY_COOKIE, 0))
+    except ValueError:
+        primary_until = 0
+    if primary_until < time.time():
+        replica_engine = replica_router.pick_engine()
+
+    database_session = (
+        ReadReplicaSession(bind=replica_engine) if replica_engine is not None else DatabaseSession()
+    )
+    try:
+        yield database_session
+    finally:
+        database_session.close()
+
+
+def dialect_insert(session: Session, model):
+    """INSERT construct supporting ON CONFLICT for the session's database (Postgres or SQLite)."""
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return postgresql.insert(model)
+    if dialect_name == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"ON CONFLICT inserts are not supported on {dialect_name}")
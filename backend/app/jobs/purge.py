@@ -0,0 +1,218 @@
+"""Purge soft-deleted RFPs and vendors and apply retention policies.
+
+Deleting an RFP or vendor through the API only stamps ``*_deleted_at``. This
+job removes them once the grace period has passed: children first
+(responses, delivery state, performance totals), then the parents, each as a
+set-based ``DELETE ... WHERE id IN (...)`` of at most ``--batch-size`` rows
+in its own short transaction, with a pause between batches so the hot tables
+never see long locks. It then expires raw vendor emails older than
+``RETENTION_EMAIL_RAW_TEXT_DAYS`` and deletes text blobs nothing refers to.
+Surviving vendors' performance totals are left alone: they describe each
+vendor's history, including RFPs purged since. Every step is idempotent, so an
+interrupted run is simply re-run.
+
+    python -m app.jobs.purge
+    python -m app.jobs.purge --email-text-days 180 --batch-size 200
+"""
+import argparse
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import DatabaseSession
+from app.models.models import RfpInfo, RfpVendorDeliveryState, VendorInfo, VendorPerformance, VendorRfpResponse
+from app.models.text_blob import ArchivedTextBlob, TextBlob
+from app.services.single_flight import AdvisoryLockTimeout, advisory_lock
+
+logger = logging.getLogger(__name__)
+
+PURGE_LOCK_NAMESPACE = 7302
+
+
+class RetentionPurge:
+    def __init__(self, batch_size: int, batch_pause_seconds: float, deleted_after: timedelta,
+                 blob_min_idle: timedelta, email_text_retention: Optional[timedelta] = None):
+        self.batch_size = batch_size
+        self.batch_pause_seconds = batch_pause_seconds
+        self.deleted_after = deleted_after
+        self.blob_min_idle = blob_min_idle
+        self.email_text_retention = email_text_retention
+        self.totals: Dict[str, int] = {}
+
+    def run(self) -> Dict[str, int]:
+        self.totals = {
+            "rfps": 0, "vendors": 0, "responses": 0, "delivery_states": 0,
+            "performance_rows": 0, "email_texts_expired": 0, "blobs": 0
+        }
+        # Overlapping runs would only fight over the same rows; the later one just exits.
+        with advisory_lock(PURGE_LOCK_NAMESPACE, 0, timeout_seconds=0):
+            db = DatabaseSession()
+            try:
+                self._purge_deleted_rfps(db)
+                self._purge_deleted_vendors(db)
+                if self.email_text_retention is not None:
+                    self._expire_email_texts(db)
+                self._collect_unreferenced_blobs(db)
+                return self.totals
+            finally:
+                db.close()
+
+    def _purge_deleted_rfps(self, db: Session):
+        cutoff = datetime.utcnow() - self.deleted_after
+        while True:
+            rfp_ids = db.execute(
+                select(RfpInfo.rfp_id).where(RfpInfo.rfp_deleted_at <= cutoff).order_by(RfpInfo.rfp_id)
+                .limit(self.batch_size)
+            ).scalars().all()
+            if not rfp_ids:
+                return
+            self.totals["responses"] += self._delete_in_batches(
+                db, VendorRfpResponse, [VendorRfpResponse.id], VendorRfpResponse.fk_rfp_id.in_(rfp_ids)
+            )
+            self.totals["delivery_states"] += self._delete_in_batches(
+                db, RfpVendorDeliveryState, [RfpVendorDeliveryState.rfp_id, RfpVendorDeliveryState.vendor_id],
+                RfpVendorDeliveryState.rfp_id.in_(rfp_ids)
+            )
+            db.execute(delete(RfpInfo.__table__).where(RfpInfo.rfp_id.in_(rfp_ids)))
+            db.commit()
+            self.totals["rfps"] += len(rfp_ids)
+            logger.info("Purged %d deleted RFPs through id %s", len(rfp_ids), rfp_ids[-1])
+            self._pause()
+
+    def _purge_deleted_vendors(self, db: Session):
+        cutoff = datetime.utcnow() - self.deleted_after
+        while True:
+            vendor_ids = db.execute(
+                select(VendorInfo.vendor_id).where(VendorInfo.vendor_deleted_at <= cutoff)
+                .order_by(VendorInfo.vendor_id).limit(self.batch_size)
+            ).scalars().all()
+            if not vendor_ids:
+                return
+            self.totals["responses"] += self._delete_in_batches(
+                db, VendorRfpResponse, [VendorRfpResponse.id], VendorRfpResponse.fk_vendor_id.in_(vendor_ids)
+            )
+            self.totals["delivery_states"] += self._delete_in_batches(
+                db, RfpVendorDeliveryState, [RfpVendorDeliveryState.rfp_id, RfpVendorDeliveryState.vendor_id],
+                RfpVendorDeliveryState.vendor_id.in_(vendor_ids)
+            )
+            # One performance row per vendor, so this is bounded by the batch already.
+            self.totals["performance_rows"] += db.execute(
+                delete(VendorPerformance.__table__).where(VendorPerformance.vendor_id.in_(vendor_ids))
+            ).rowcount
+            db.execute(delete(VendorInfo.__table__).where(VendorInfo.vendor_id.in_(vendor_ids)))
+            db.commit()
+            self.totals["vendors"] += len(vendor_ids)
+            logger.info("Purged %d deleted vendors through id %s", len(vendor_ids), vendor_ids[-1])
+            self._pause()
+
+    def _expire_email_texts(self, db: Session):
+        """Drop the raw-text reference of old responses; the blobs go in the unreferenced-blob sweep."""
+        cutoff = datetime.utcnow() - self.email_text_retention
+        while True:
+            response_ids = db.execute(
+                select(VendorRfpResponse.id).where(
+                    VendorRfpResponse.email_raw_text_hash.isnot(None),
+                    VendorRfpResponse.response_created_at <= cutoff
+                ).limit(self.batch_size)
+            ).scalars().all()
+            if not response_ids:
+                return
+            db.execute(
+                update(VendorRfpResponse.__table__).where(VendorRfpResponse.id.in_(response_ids))
+                .values(email_raw_text_hash=None)
+            )
+            db.commit()
+            self.totals["email_texts_expired"] += len(response_ids)
+            self._pause()
+
+    def _collect_unreferenced_blobs(self, db: Session):
+        """Delete blobs (hot and archived) no RFP or response points at any more.
+
+        Only blobs idle for ``blob_min_idle`` are candidates, and the DELETE
+        re-checks ``blob_used_at``: a write that reuses a blob touches that
+        column first, so it either blocks the DELETE or is seen by it.
+        """
+        cutoff = datetime.utcnow() - self.blob_min_idle
+        for blob_table in (TextBlob, ArchivedTextBlob):
+            last_hash = ""
+            while True:
+                blob_hashes = db.execute(
+                    select(blob_table.blob_hash).where(
+                        blob_table.blob_hash > last_hash, blob_table.blob_used_at <= cutoff
+                    ).order_by(blob_table.blob_hash).limit(self.batch_size)
+                ).scalars().all()
+                if not blob_hashes:
+                    break
+                last_hash = blob_hashes[-1]
+
+                referenced_hashes = set(db.execute(
+                    select(RfpInfo.rfp_raw_text_hash).where(RfpInfo.rfp_raw_text_hash.in_(blob_hashes))
+                ).scalars()) | set(db.execute(
+                    select(VendorRfpResponse.email_raw_text_hash)
+                    .where(VendorRfpResponse.email_raw_text_hash.in_(blob_hashes))
+                ).scalars())
+                unreferenced_hashes = [blob_hash for blob_hash in blob_hashes if blob_hash not in referenced_hashes]
+                if unreferenced_hashes:
+                    self.totals["blobs"] += db.execute(
+                        delete(blob_table.__table__).where(
+                            blob_table.blob_hash.in_(unreferenced_hashes), blob_table.blob_used_at <= cutoff
+                        )
+                    ).rowcount
+                db.commit()
+                if unreferenced_hashes:
+                    self._pause()
+
+    def _delete_in_batches(self, db: Session, model, key_columns: List, criteria) -> int:
+        """Delete rows matching ``criteria`` by primary key, one bounded batch per transaction."""
+        key_expression = key_columns[0] if len(key_columns) == 1 else tuple_(*key_columns)
+        deleted_count = 0
+        while True:
+            keys = db.execute(select(*key_columns).where(criteria).limit(self.batch_size)).all()
+            if not keys:
+                return deleted_count
+            key_values = [key[0] for key in keys] if len(key_columns) == 1 else [tuple(key) for key in keys]
+            db.execute(delete(model.__table__).where(key_expression.in_(key_values)))
+            db.commit()
+            deleted_count += len(keys)
+            self._pause()
+
+    def _pause(self):
+        if self.batch_pause_seconds > 0:
+            time.sleep(self.batch_pause_seconds)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Purge soft-deleted RFPs/vendors and apply retention policies.")
+    parser.add_argument("--batch-size", type=int, default=settings.purge_batch_size)
+    parser.add_argument("--pause", type=float, default=settings.purge_batch_pause_seconds,
+                        help="Seconds to sleep between batches")
+    parser.add_argument("--deleted-after-hours", type=float, default=settings.purge_deleted_after_hours,
+                        help="Only purge rows soft-deleted at least this long ago")
+    parser.add_argument("--email-text-days", type=int, default=settings.retention_email_raw_text_days,
+                        help="Expire raw vendor emails older than this; 0 keeps them")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        totals = RetentionPurge(
+            batch_size=max(1, args.batch_size),
+            batch_pause_seconds=max(0.0, args.pause),
+            deleted_after=timedelta(hours=args.deleted_after_hours),
+            blob_min_idle=timedelta(hours=settings.purge_blob_min_idle_hours),
+            email_text_retention=timedelta(days=args.email_text_days) if args.email_text_days > 0 else None
+        ).run()
+    except AdvisoryLockTimeout:
+        logger.info("Another purge is already running; nothing to do")
+        return 0
+    logger.info("Purge finished: %s", totals)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
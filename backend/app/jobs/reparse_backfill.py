@@ -0,0 +1,309 @@
+"""Re-parse stored RFPs or vendor responses with the current AIService prompts.
+
+Rows are walked in primary-key order in keyset batches, so memory stays flat
+however large the table is. Each batch's texts are parsed concurrently, the
+changed rows are written with one executemany UPDATE, and their RFPs' stored
+evaluation fingerprints are cleared and the checkpoint advanced in the same
+transaction, so a crashed run resumes after the last committed batch. Vendor
+price-to-budget aggregates are adjusted in that transaction too, and RFPs
+stuck in PARSE_FAILED that now parse move to DRAFT. Rows the LLM fails on
+are logged and counted, not retried; a ``--restart`` run picks them up, and
+a completed job does nothing without it. ``--dry-run`` writes nothing and
+prints a per-field diff.
+
+    python -m app.jobs.reparse_backfill responses --concurrency 4
+    python -m app.jobs.reparse_backfill rfps --dry-run --diff-output rfp_diff.jsonl
+"""
+import argparse
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+from sqlalchemy import Column, and_, bindparam, case, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import DatabaseSession
+from app.models.models import BackfillCheckpoint, RfpInfo, VendorRfpResponse
+from app.models.text_blob import load_blob_texts
+from app.services.ai_service import ai_service
+from app.services.vendor_performance_service import VendorPerformanceService
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillTarget:
+    """A table whose parsed columns are derived from a blob-stored raw text.
+
+    ``rfp_id_column`` names the RFP whose stored evaluation was computed from the row,
+    and ``response_link_column`` the ``VendorRfpResponse`` column holding the row's id,
+    selecting the responses whose price-to-budget samples it feeds.
+    ``recovered_status`` is (status column, failed value, value once a re-parse succeeds).
+    """
+
+    def __init__(self, name: str, model, id_column: Column, text_hash_column: Column, rfp_id_column: Column,
+                 response_link_column: Column, parse: Callable[[str], Dict[str, Any]],
+                 parsed_values: Callable[[Dict[str, Any]], Dict[str, Any]], skip_criteria=None,
+                 recovered_status: Optional[Tuple[Column, str, str]] = None):
+        self.name = name
+        self.model = model
+        self.id_column = id_column
+        self.text_hash_column = text_hash_column
+        self.rfp_id_column = rfp_id_column
+        self.response_link_column = response_link_column
+        self.parse = parse
+        self.parsed_values = parsed_values
+        self.skip_criteria = skip_criteria
+        self.recovered_status = recovered_status
+
+    @property
+    def parsed_columns(self) -> List[str]:
+        return list(self.parsed_values({}))
+
+
+def _response_values(parsed_response: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "email_parsed_json": parsed_response or None,
+        "total_price": parsed_response.get("total_price"),
+        "delivery_days": parsed_response.get("delivery_days"),
+        "warranty_years": parsed_response.get("warranty_years"),
+        "payment_terms": parsed_response.get("payment_terms")
+    }
+
+
+BACKFILL_TARGETS = {
+    "responses": BackfillTarget(
+        "responses", VendorRfpResponse, VendorRfpResponse.id, VendorRfpResponse.email_raw_text_hash,
+        VendorRfpResponse.fk_rfp_id, VendorRfpResponse.id,
+        parse=lambda email_text: ai_service.parse_vendor_response(email_text),
+        parsed_values=_response_values,
+        # Raw email past its retention period is gone; keep the stored parse.
+        skip_criteria=VendorRfpResponse.email_raw_text_hash.is_(None)
+    ),
+    "rfps": BackfillTarget(
+        "rfps", RfpInfo, RfpInfo.rfp_id, RfpInfo.rfp_raw_text_hash, RfpInfo.rfp_id, VendorRfpResponse.fk_rfp_id,
+        parse=lambda raw_text: ai_service.parse_rfp_text(raw_text),
+        parsed_values=lambda structured_json: {"rfp_structured_json": structured_json or None},
+        # Rows still PARSING belong to the background parser; it writes the same column.
+        skip_criteria=or_(RfpInfo.rfp_status == "PARSING", RfpInfo.rfp_deleted_at.isnot(None)),
+        recovered_status=(RfpInfo.rfp_status, "PARSE_FAILED", "DRAFT")
+    ),
+}
+
+
+class ReparseBackfill:
+    def __init__(self, target: BackfillTarget, job_name: str, batch_size: int, concurrency: int,
+                 dry_run: bool = False, max_rows: Optional[int] = None, diff_output: TextIO = sys.stdout):
+        self.target = target
+        self.job_name = job_name
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.dry_run = dry_run
+        self.max_rows = max_rows
+        self.diff_output = diff_output
+        self.update_statement = self._build_update_statement()
+
+    def run(self, restart: bool = False) -> Dict[str, int]:
+        db = DatabaseSession()
+        try:
+            checkpoint = self._load_checkpoint(db, restart)
+            totals = {"processed": 0, "changed": 0, "failed": 0}
+            if checkpoint.job_status == "COMPLETED":
+                logger.info("Backfill %s already completed; pass --restart to run it again", self.job_name)
+                return totals
+            last_processed_id = checkpoint.last_processed_id
+            logger.info("Backfill %s starting after %s id %s", self.job_name, self.target.name, last_processed_id)
+
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="reparse") as executor:
+                while self.max_rows is None or totals["processed"] < self.max_rows:
+                    batch_limit = self.batch_size if self.max_rows is None else min(
+                        self.batch_size, self.max_rows - totals["processed"]
+                    )
+                    rows = self._fetch_batch(db, last_processed_id, batch_limit)
+                    if not rows:
+                        checkpoint.job_status = "COMPLETED"
+                        break
+                    texts = load_blob_texts(db, [row["text_hash"] for row in rows], tenant_id=None)
+                    # Nothing is held open while the LLM works through the batch.
+                    db.rollback()
+
+                    parse_results = list(executor.map(
+                        self._parse_row, rows, [texts.get(row["text_hash"]) for row in rows]
+                    ))
+                    changed_rows = [(row, new_values) for row, new_values in zip(rows, parse_results)
+                                    if new_values is not None and self._changed_fields(row, new_values)]
+                    batch_failed = sum(1 for new_values in parse_results if new_values is None)
+
+                    last_processed_id = rows[-1]["row_id"]
+                    totals["processed"] += len(rows)
+                    totals["changed"] += len(changed_rows)
+                    totals["failed"] += batch_failed
+
+                    if self.dry_run:
+                        self._write_diffs(changed_rows)
+                        continue
+                    if changed_rows:
+                        # Re-parsed prices (or RFP budgets) move vendors' price-to-budget averages.
+                        changed_ids = [row["row_id"] for row, _ in changed_rows]
+                        response_filter = self.target.response_link_column.in_(changed_ids)
+                        previous_price_samples = VendorPerformanceService.price_samples(db, response_filter)
+                        db.execute(self.update_statement, [
+                            {
+                                "b_row_id": row["row_id"],
+                                "b_text_hash": row["text_hash"],
+                                **{f"b_{column_name}": new_values[column_name]
+                                   for column_name in self.target.parsed_columns}
+                            }
+                            for row, new_values in changed_rows
+                        ])
+                        VendorPerformanceService.record_price_changes(
+                            db, previous_price_samples, VendorPerformanceService.price_samples(db, response_filter)
+                        )
+                        # Evaluations of these RFPs were made from the old values; force the next one to re-run.
+                        db.execute(
+                            update(RfpInfo.__table__)
+                            .where(RfpInfo.rfp_id.in_({row["rfp_id"] for row, _ in changed_rows}))
+                            .values(rfp_evaluation_fingerprint=None)
+                        )
+                    self._advance_checkpoint(checkpoint, last_processed_id, len(rows), len(changed_rows), batch_failed)
+                    db.commit()
+                    logger.info("Backfill %s: through id %s, %s", self.job_name, last_processed_id, totals)
+
+            if not self.dry_run:
+                checkpoint.job_updated_at = datetime.utcnow()
+                db.commit()
+            return totals
+        finally:
+            db.close()
+
+    def _load_checkpoint(self, db: Session, restart: bool) -> BackfillCheckpoint:
+        checkpoint = db.get(BackfillCheckpoint, self.job_name)
+        if checkpoint is not None and checkpoint.job_target != self.target.name:
+            raise ValueError(f"Job {self.job_name} was started for {checkpoint.job_target}, not {self.target.name}")
+        if checkpoint is None or restart:
+            checkpoint = BackfillCheckpoint(
+                job_name=self.job_name,
+                job_target=self.target.name,
+                last_processed_id=0,
+                processed_count=0,
+                changed_count=0,
+                failed_count=0,
+                job_status="RUNNING",
+                job_started_at=datetime.utcnow(),
+                job_updated_at=datetime.utcnow()
+            )
+            if not self.dry_run:
+                checkpoint = db.merge(checkpoint)
+                db.commit()
+        return checkpoint
+
+    def _fetch_batch(self, db: Session, after_id: int, limit: int) -> List[Dict[str, Any]]:
+        target = self.target
+        parsed_columns = [getattr(target.model, column_name) for column_name in target.parsed_columns]
+        if target.recovered_status is not None:
+            parsed_columns.append(target.recovered_status[0])
+        batch_query = select(
+            target.id_column.label("row_id"), target.text_hash_column.label("text_hash"),
+            target.rfp_id_column.label("rfp_id"), *parsed_columns
+        ).where(target.id_column > after_id).order_by(target.id_column).limit(limit)
+        if target.skip_criteria is not None:
+            batch_query = batch_query.where(~target.skip_criteria)
+        return [dict(row) for row in db.execute(batch_query).mappings()]
+
+    def _parse_row(self, row: Dict[str, Any], raw_text: Optional[str]) -> Optional[Dict[str, Any]]:
+        if raw_text is None:
+            logger.warning("Backfill %s: no stored text for %s id %s", self.job_name, self.target.name, row["row_id"])
+            return None
+        try:
+            new_values = self.target.parsed_values(self.target.parse(raw_text))
+        except Exception as error:
+            logger.warning("Backfill %s: re-parse failed for %s id %s: %s",
+                           self.job_name, self.target.name, row["row_id"], error)
+            return None
+        if self.target.recovered_status is not None:
+            status_column, failed_status, recovered_status = self.target.recovered_status
+            if row[status_column.key] == failed_status:
+                new_values[status_column.key] = recovered_status
+        return new_values
+
+    @staticmethod
+    def _changed_fields(row: Dict[str, Any], new_values: Dict[str, Any]) -> List[str]:
+        return [field for field, value in new_values.items() if row[field] != value]
+
+    def _write_diffs(self, changed_rows):
+        for row, new_values in changed_rows:
+            self.diff_output.write(json.dumps({
+                "target": self.target.name,
+                "id": row["row_id"],
+                "changes": {
+                    field: {"old": row[field], "new": new_values[field]}
+                    for field in self._changed_fields(row, new_values)
+                }
+            }, default=str) + "\n")
+        self.diff_output.flush()
+
+    def _build_update_statement(self):
+        """UPDATE by primary key that skips rows whose raw text changed since they were read."""
+        table = self.target.model.__table__
+        new_values = {
+            column_name: bindparam(f"b_{column_name}", type_=table.c[column_name].type)
+            for column_name in self.target.parsed_columns
+        }
+        if self.target.recovered_status is not None:
+            # Decided in SQL, so a status changed since the batch was read is left alone.
+            status_column, failed_status, recovered_status = self.target.recovered_status
+            status = table.c[status_column.key]
+            new_values[status_column.key] = case((status == failed_status, recovered_status), else_=status)
+        return update(table).where(and_(
+            table.c[self.target.id_column.key] == bindparam("b_row_id"),
+            table.c[self.target.text_hash_column.key] == bindparam("b_text_hash")
+        )).values(new_values)
+
+    @staticmethod
+    def _advance_checkpoint(checkpoint: BackfillCheckpoint, last_processed_id: int,
+                            processed: int, changed: int, failed: int):
+        checkpoint.last_processed_id = last_processed_id
+        checkpoint.processed_count += processed
+        checkpoint.changed_count += changed
+        checkpoint.failed_count += failed
+        checkpoint.job_status = "RUNNING"
+        checkpoint.job_updated_at = datetime.utcnow()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-parse stored RFPs or vendor responses with the current prompts.")
+    parser.add_argument("target", choices=sorted(BACKFILL_TARGETS))
+    parser.add_argument("--job-name", help="Checkpoint name; defaults to reparse-<target>")
+    parser.add_argument("--batch-size", type=int, default=settings.backfill_batch_size)
+    parser.add_argument("--concurrency", type=int, default=settings.backfill_concurrency,
+                        help="Parallel LLM calls per batch")
+    parser.add_argument("--limit", type=int, help="Stop after this many rows")
+    parser.add_argument("--restart", action="store_true", help="Ignore the saved checkpoint and start from the top")
+    parser.add_argument("--dry-run", action="store_true", help="Write nothing; print what would change")
+    parser.add_argument("--diff-output", help="File for the dry-run diff (JSON lines); defaults to stdout")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    diff_output = open(args.diff_output, "w") if args.diff_output else sys.stdout
+    try:
+        totals = ReparseBackfill(
+            BACKFILL_TARGETS[args.target],
+            job_name=args.job_name or f"reparse-{args.target}",
+            batch_size=max(1, args.batch_size),
+            concurrency=max(1, args.concurrency),
+            dry_run=args.dry_run,
+            max_rows=args.limit,
+            diff_output=diff_output
+        ).run(restart=args.restart or args.dry_run)
+    finally:
+        if diff_output is not sys.stdout:
+            diff_output.close()
+    logger.info("Backfill finished: %s", totals)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
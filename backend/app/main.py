@@ -1,9 +1,16 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.database import database_engine, BaseModel
-from app.routers import vendors,rfps, webhooks
+from app.database import database_engine, BaseModel, PRIMARY_STICKY_COOKIE, replica_router
+from app.middleware import AdmissionControlMiddleware, ProfilingMiddleware
+from app.routers import vendors,rfps, webhooks, events
+from app.services.attachment_service import attachment_service
+from app.services.delivery_tracking_service import DeliveryTrackingService
+from app.services.event_bus import event_bus
+from app.services.rfp_service import RfpService
+from app.services.task_runner import task_runner
 
 BaseModel.metadata.create_all(bind=database_engine)
 
@@ -15,17 +22,56 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Innermost, so queueing in admission control is not billed to the request's own work.
+app.add_middleware(ProfilingMiddleware)
+
+if settings.admission_control_enabled:
+    # Added before CORS so shed requests still carry CORS headers.
+    app.add_middleware(AdmissionControlMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  
+    allow_origins=[origin.strip() for origin in settings.cors_allowed_origins.split(",") if origin.strip()],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def keep_recent_writers_on_primary(incoming_request: Request, call_next):
+    response = await call_next(incoming_request)
+    if incoming_request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        window_seconds = settings.read_your_writes_window_seconds
+        response.set_cookie(
+            PRIMARY_STICKY_COOKIE,
+            str(time.time() + window_seconds),
+            max_age=int(window_seconds) + 1,
+            httponly=True,
+            samesite="lax"
+        )
+    return response
+
+
 app.include_router(vendors.router)
 app.include_router(rfps.router) 
 app.include_router(webhooks.router)
+app.include_router(events.router)
+
+
+@app.on_event("startup")
+def resume_background_tasks():
+    event_bus.start()
+    replica_router.start()
+    DeliveryTrackingService.ensure_event_partitions()
+    RfpService.resume_pending_rfp_parsing()
+
+
+@app.on_event("shutdown")
+def stop_background_tasks():
+    event_bus.stop()
+    replica_router.stop()
+    task_runner.shutdown()
+    attachment_service.shutdown()
 
 
 @app.get("/")
@@ -0,0 +1,5 @@
+"""ASGI middleware package"""
+from app.middleware.admission_control import AdmissionControlMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+
+__all__ = ["AdmissionControlMiddleware", "ProfilingMiddleware"]
@@ -0,0 +1,251 @@
+import asyncio
+import hmac
+import json
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from typing import List, Optional, Pattern, Tuple
+from urllib.parse import parse_qs
+
+from app.config import settings
+from app.utils.tenancy import scope_tenant_id
+from app.utils.token_bucket import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+LLM_POOL = "llm"
+DB_POOL = "db"
+CHEAP_POOL = "cheap"
+EXEMPT = None
+
+# (method or None for any, path pattern, pool). First match wins; everything else is DB-bound.
+ROUTE_POOLS: List[Tuple[Optional[str], Pattern, Optional[str]]] = [
+    (None, re.compile(r"^/rfp_management/events(/|$)"), EXEMPT),
+    ("POST", re.compile(r"^/rfp_management/rfps/\d+/(evaluate|parse)/?$"), LLM_POOL),
+    ("POST", re.compile(r"^/vendor_management/webhooks/sendgrid/inbound/?$"), LLM_POOL),
+    (None, re.compile(r"^/(health|docs|redoc|openapi\.json)?/?$"), CHEAP_POOL),
+]
+# Provider webhooks arrive from a handful of provider IPs and carry no tenant header, so per-client
+# and per-tenant buckets don't fit them; they share one generous bucket instead.
+PROVIDER_WEBHOOK_PATH = re.compile(r"^/vendor_management/webhooks/")
+INBOUND_WEBHOOK_PATH = re.compile(r"^/vendor_management/webhooks/sendgrid/inbound/?$")
+
+
+class ClientBuckets:
+    """Per-client token buckets, keeping only the most recently seen clients."""
+
+    def __init__(self, rate: float, burst: float, max_clients: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def try_acquire(self, client_id: str) -> Tuple[bool, float]:
+        """Returns (admitted, seconds until the client may retry)."""
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+            self._buckets[client_id] = bucket
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client_id)
+
+        if bucket.try_acquire():
+            return True, 0.0
+        return False, bucket.seconds_until_available()
+
+
+class AdmissionPool:
+    """Concurrency limit with a bounded wait queue and optional per-client and per-tenant rate limits."""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout_seconds: float,
+                 client_rate_per_second: float = 0.0, client_burst: int = 0, max_clients: int = 10000,
+                 tenant_rate_per_second: float = 0.0, tenant_burst: int = 0):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.client_buckets = (
+            ClientBuckets(client_rate_per_second, client_burst, max_clients)
+            if client_rate_per_second > 0 else None
+        )
+        self.tenant_buckets = (
+            ClientBuckets(tenant_rate_per_second, tenant_burst, max_clients)
+            if tenant_rate_per_second > 0 else None
+        )
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._average_service_seconds = 1.0
+
+    async def acquire(self) -> bool:
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        return True
+
+    def release(self, service_seconds: float):
+        self.in_flight -= 1
+        self._semaphore.release()
+        self._average_service_seconds += 0.1 * (service_seconds - self._average_service_seconds)
+
+    def retry_after_seconds(self) -> int:
+        """Rough time for the current backlog to drain."""
+        backlog = (self.waiting + 1) / self.max_concurrent
+        return max(1, math.ceil(backlog * self._average_service_seconds))
+
+
+class AdmissionControlMiddleware:
+    """Sheds load before it reaches worker threads.
+
+    Requests are classified into LLM-bound, DB-bound and cheap pools, each
+    with its own concurrency limit and bounded queue, so saturated AI work
+    cannot take the threads reads and health checks need. Clients over their
+    token bucket, or whose tenant is over its quota, get 429; full or
+    timed-out queues get 503. Both carry ``Retry-After``. Server-Sent Event
+    streams are exempt. Provider webhooks skip the client and tenant buckets
+    and share a single webhook bucket; inbound-parse posts with a bad
+    ``?token=`` get 403 before they are charged to it.
+    """
+
+    def __init__(self, app, pools: Optional[dict] = None):
+        self.app = app
+        self.pools = pools if pools is not None else build_admission_pools()
+        self.webhook_bucket = (
+            TokenBucket(settings.admission_webhook_rate_per_second, settings.admission_webhook_burst)
+            if settings.admission_webhook_rate_per_second > 0 else None
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        pool = self.pools.get(classify_request(scope["method"], scope["path"]))
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+
+        if PROVIDER_WEBHOOK_PATH.match(scope["path"]):
+            if INBOUND_WEBHOOK_PATH.match(scope["path"]) and not has_valid_webhook_token(scope):
+                await send_json_response(send, 403, "Invalid webhook token")
+                return
+            if self.webhook_bucket is not None and not self.webhook_bucket.try_acquire():
+                await send_rejection(
+                    send, 429, "Too many webhook deliveries, slow down", self.webhook_bucket.seconds_until_available()
+                )
+                return
+        else:
+            if pool.client_buckets is not None:
+                admitted, retry_after = pool.client_buckets.try_acquire(client_id(scope))
+                if not admitted:
+                    await send_rejection(send, 429, "Too many requests, slow down", retry_after)
+                    return
+
+            tenant_id = scope_tenant_id(scope)
+            if pool.tenant_buckets is not None and tenant_id is not None:
+                # Invalid tenant headers (tenant_id None) are rejected later by the tenant dependency.
+                admitted, retry_after = pool.tenant_buckets.try_acquire(tenant_id)
+                if not admitted:
+                    await send_rejection(send, 429, "Tenant request quota exceeded, slow down", retry_after)
+                    return
+
+        if not await pool.acquire():
+            logger.warning("Shedding %s %s: %s pool saturated", scope["method"], scope["path"], pool.name)
+            await send_rejection(send, 503, "Server busy, try again shortly", pool.retry_after_seconds())
+            return
+
+        started_at = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pool.release(time.monotonic() - started_at)
+
+
+def classify_request(method: str, path: str) -> Optional[str]:
+    for route_method, path_pattern, pool_name in ROUTE_POOLS:
+        if (route_method is None or route_method == method) and path_pattern.match(path):
+            return pool_name
+    return DB_POOL
+
+
+def client_id(scope) -> str:
+    if settings.admission_trust_forwarded_for:
+        for header_name, header_value in scope.get("headers", []):
+            if header_name == b"x-forwarded-for":
+                return header_value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def has_valid_webhook_token(scope) -> bool:
+    """Mirrors the inbound handler's ``?token=`` check so forged posts can't drain the webhook bucket."""
+    if not settings.webhook_secret:
+        return True
+    query_parameters = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    token = query_parameters.get("token", [""])[0]
+    return hmac.compare_digest(token.encode(), settings.webhook_secret.encode())
+
+
+async def send_rejection(send, status_code: int, message: str, retry_after_seconds: float):
+    await send_json_response(
+        send, status_code, message,
+        extra_headers=[(b"retry-after", str(max(1, math.ceil(retry_after_seconds))).encode())]
+    )
+
+
+async def send_json_response(send, status_code: int, message: str, extra_headers: Optional[list] = None):
+    body = json.dumps({"success": False, "message": message}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *(extra_headers or []),
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def build_admission_pools() -> dict:
+    return {
+        LLM_POOL: AdmissionPool(
+            LLM_POOL,
+            max_concurrent=settings.admission_llm_max_concurrent,
+            max_queue=settings.admission_llm_max_queue,
+            queue_timeout_seconds=settings.admission_llm_queue_timeout_seconds,
+            client_rate_per_second=settings.admission_llm_client_rate_per_second,
+            client_burst=settings.admission_llm_client_burst,
+            max_clients=settings.admission_max_tracked_clients,
+            tenant_rate_per_second=settings.admission_llm_tenant_rate_per_second,
+            tenant_burst=settings.admission_llm_tenant_burst
+        ),
+        DB_POOL: AdmissionPool(
+            DB_POOL,
+            max_concurrent=settings.admission_db_max_concurrent,
+            max_queue=settings.admission_db_max_queue,
+            queue_timeout_seconds=settings.admission_db_queue_timeout_seconds,
+            client_rate_per_second=settings.admission_db_client_rate_per_second,
+            client_burst=settings.admission_db_client_burst,
+            max_clients=settings.admission_max_tracked_clients,
+            tenant_rate_per_second=settings.admission_db_tenant_rate_per_second,
+            tenant_burst=settings.admission_db_tenant_burst
+        ),
+        CHEAP_POOL: AdmissionPool(
+            CHEAP_POOL,
+            max_concurrent=settings.admission_cheap_max_concurrent,
+            max_queue=settings.admission_cheap_max_queue,
+            queue_timeout_seconds=settings.admission_cheap_queue_timeout_seconds
+        ),
+    }
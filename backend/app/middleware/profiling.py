@@ -0,0 +1,215 @@
+import asyncio
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+from app.config import settings
+from app.utils.request_timing import current_request_timings, finish_request_timing, start_request_timing
+
+logger = logging.getLogger(__name__)
+
+PROFILE_QUERY_PARAM = "__profile"
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+APP_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.dirname(APP_PACKAGE_DIR)
+TIMING_CATEGORIES = ("ai", "ai_queue", "email")
+
+# tracemalloc and the sampler are process-wide, so only one request is profiled at a time.
+_profile_lock = threading.Lock()
+
+
+class StackSampler:
+    """Statistical CPU profiler: samples thread stacks on a timer into folded-stack counts.
+
+    Only stacks running code from the app package are kept, which drops idle
+    workers and the event loop while it waits. Requests running concurrently
+    in other threads can show up in the profile too.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.folded_stacks: Counter = Counter()
+        self.sample_count = 0
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+
+    def _run(self):
+        own_thread_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval_seconds):
+            self.sample_count += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                stack = []
+                runs_app_code = False
+                while frame is not None:
+                    filename = frame.f_code.co_filename
+                    runs_app_code = runs_app_code or filename.startswith(APP_PACKAGE_DIR)
+                    stack.append(f"{frame.f_code.co_name} ({_short_path(filename)}:{frame.f_code.co_firstlineno})")
+                    frame = frame.f_back
+                if runs_app_code:
+                    self.folded_stacks[";".join(reversed(stack))] += 1
+
+    def folded_output(self) -> str:
+        """Brendan Gregg's folded format, readable by flamegraph.pl and speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.folded_stacks.most_common())
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(PROJECT_DIR):
+        return os.path.relpath(filename, PROJECT_DIR)
+    return re.sub(r"^.*[/\\]site-packages[/\\]", "", filename)
+
+
+class ProfilingMiddleware:
+    """Per-request timing, with opt-in CPU and memory profiling.
+
+    Every response gets a ``Server-Timing`` header splitting wall time into
+    AIService, EmailService and local compute. A request is profiled when it
+    carries ``?__profile=1`` with a valid ``X-Profile-Token`` header, or is
+    picked by ``profiling_sample_rate``. Its folded CPU stacks, top
+    tracemalloc allocations and timing summary are written under
+    ``profiling_output_dir``. Event streams are never profiled: they stay
+    open indefinitely and would hold the process-wide profiler.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        should_profile = self._should_profile(scope) and _profile_lock.acquire(blocking=False)
+        profiling = {"sampler": None}
+        if should_profile:
+            tracemalloc.start()
+            profiling["sampler"] = StackSampler(settings.profiling_sample_interval_ms / 1000)
+            profiling["sampler"].start()
+
+        timing_token = start_request_timing()
+        started_at = time.perf_counter()
+        response_status = {"code": None}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                response_status["code"] = message["status"]
+                if profiling["sampler"] is not None and _is_event_stream(message):
+                    _abandon_profile(profiling)
+                if settings.server_timing_enabled:
+                    timings = _timing_breakdown(time.perf_counter() - started_at)
+                    message = dict(message, headers=[
+                        *message.get("headers", []),
+                        (b"server-timing", _server_timing_header(timings).encode())
+                    ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            timings = _timing_breakdown(time.perf_counter() - started_at)
+            finish_request_timing(timing_token)
+            sampler = profiling["sampler"]
+            if sampler is not None:
+                try:
+                    sampler.stop()
+                    memory_snapshot = tracemalloc.take_snapshot()
+                    _, peak_memory_bytes = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                finally:
+                    _profile_lock.release()
+                await asyncio.to_thread(
+                    write_profile, scope, response_status["code"], timings, sampler, memory_snapshot, peak_memory_bytes
+                )
+
+    @staticmethod
+    def _should_profile(scope) -> bool:
+        if settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate:
+            return True
+        if not settings.profiling_admin_token:
+            return False
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if query.get(PROFILE_QUERY_PARAM, [""])[0] not in ("1", "true"):
+            return False
+        provided_token = dict(scope.get("headers", [])).get(PROFILE_TOKEN_HEADER, b"").decode("latin-1")
+        return hmac.compare_digest(provided_token, settings.profiling_admin_token)
+
+
+def _is_event_stream(response_start) -> bool:
+    content_type = dict(response_start.get("headers", [])).get(b"content-type", b"")
+    return content_type.split(b";")[0].strip().lower() == b"text/event-stream"
+
+
+def _abandon_profile(profiling: Dict[str, Optional[StackSampler]]):
+    try:
+        profiling["sampler"].stop()
+        tracemalloc.stop()
+    finally:
+        profiling["sampler"] = None
+        _profile_lock.release()
+
+
+def _timing_breakdown(total_seconds: float) -> Dict[str, float]:
+    recorded = current_request_timings() or {}
+    timings = {category: recorded.get(category, 0.0) for category in TIMING_CATEGORIES}
+    timings["app"] = max(0.0, total_seconds - sum(timings.values()))
+    timings["total"] = total_seconds
+    return timings
+
+
+def _server_timing_header(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{category};dur={seconds * 1000:.1f}" for category, seconds in timings.items())
+
+
+def write_profile(scope, status_code: Optional[int], timings: Dict[str, float], sampler: StackSampler,
+                  memory_snapshot, peak_memory_bytes: int):
+    os.makedirs(settings.profiling_output_dir, exist_ok=True)
+    path_slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+    base_path = os.path.join(
+        settings.profiling_output_dir,
+        f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{scope['method']}-{path_slug}"
+    )
+
+    with open(f"{base_path}.folded", "w") as folded_file:
+        folded_file.write(sampler.folded_output())
+
+    top_allocations = memory_snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ]).statistics("lineno")[:settings.profiling_tracemalloc_top]
+    with open(f"{base_path}.alloc.txt", "w") as allocation_file:
+        allocation_file.write(f"peak traced memory: {peak_memory_bytes} bytes\n")
+        allocation_file.writelines(f"{statistic}\n" for statistic in top_allocations)
+
+    summary = {
+        "method": scope["method"],
+        "path": scope["path"],
+        "status_code": status_code,
+        "timings_ms": {category: round(seconds * 1000, 2) for category, seconds in timings.items()},
+        "cpu_samples": sampler.sample_count,
+        "sample_interval_ms": settings.profiling_sample_interval_ms,
+        "peak_memory_bytes": peak_memory_bytes
+    }
+    with open(f"{base_path}.json", "w") as summary_file:
+        json.dump(summary, summary_file, indent=2)
+    logger.info("Wrote request profile %s (%.1f ms)", base_path, timings["total"] * 1000)
@@ -1,3 +1,10 @@
-from app.models.models import VendorInfo, RfpInfo, VendorRfpResponse
+from app.models.models import (
+    VendorInfo, VendorPerformance, RfpInfo, VendorRfpResponse, EmailDeliveryEvent,
+    RfpVendorDeliveryState, BackfillCheckpoint
+)
+from app.models.text_blob import TextBlob, ArchivedTextBlob
 
-__all__ = ["VendorInfo", "RfpInfo", "VendorRfpResponse"]
+__all__ = [
+    "VendorInfo", "VendorPerformance", "RfpInfo", "VendorRfpResponse", "EmailDeliveryEvent",
+    "RfpVendorDeliveryState", "BackfillCheckpoint", "TextBlob", "ArchivedTextBlob"
+]
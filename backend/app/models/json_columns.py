@@ -0,0 +1,112 @@
+import json
+from typing import Any
+
+from sqlalchemy import Boolean, Float, Integer, String, bindparam, cast, exists, func, literal_column, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+from sqlalchemy.types import JSON
+
+# JSONB on Postgres (GIN-indexable, binary), plain JSON text everywhere else.
+JsonDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+class JsonScalarPath(ColumnElement):
+    """Typed scalar at ``path`` inside a JSON column, NULL unless it is a JSON number.
+
+    Used as the expression of generated columns, so it is compiled with
+    literal paths (immutable on Postgres, deterministic on SQLite).
+    """
+    inherit_cache = True
+    _traverse_internals = [
+        ("column_name", InternalTraversal.dp_string),
+        ("path", InternalTraversal.dp_string_list),
+        ("type", InternalTraversal.dp_type),
+    ]
+
+    def __init__(self, column_name: str, path: tuple, type_=Float()):
+        self.column_name = column_name
+        self.path = path
+        self.type = type_
+
+
+@compiles(JsonScalarPath)
+def _compile_json_scalar_path(element, compiler, **kw):
+    json_path = "$." + ".".join(element.path)
+    sql_type = "INTEGER" if isinstance(element.type, Integer) else "REAL"
+    return (
+        f"CASE WHEN json_type({element.column_name}, '{json_path}') IN ('integer', 'real') "
+        f"THEN CAST(json_extract({element.column_name}, '{json_path}') AS {sql_type}) END"
+    )
+
+
+@compiles(JsonScalarPath, "postgresql")
+def _compile_json_scalar_path_postgresql(element, compiler, **kw):
+    json_path = "{" + ",".join(element.path) + "}"
+    sql_type = "integer" if isinstance(element.type, Integer) else "double precision"
+    return (
+        f"CASE WHEN jsonb_typeof({element.column_name} #> '{json_path}') = 'number' "
+        f"THEN ({element.column_name} #>> '{json_path}')::numeric::{sql_type} END"
+    )
+
+
+def json_number(column_name: str, *path: str) -> JsonScalarPath:
+    return JsonScalarPath(column_name, path)
+
+
+def json_integer(column_name: str, *path: str) -> JsonScalarPath:
+    return JsonScalarPath(column_name, path, Integer())
+
+
+class _DialectChoice(ColumnElement):
+    """Boolean test built once per dialect family, the compiler picking one.
+
+    Building both up front keeps every bound value in the statement's cache
+    key, so cached statements are reused with fresh parameters.
+    """
+    type = Boolean()
+    inherit_cache = True
+    _traverse_internals = [
+        ("default_clause", InternalTraversal.dp_clauseelement),
+        ("postgresql_clause", InternalTraversal.dp_clauseelement),
+    ]
+
+
+@compiles(_DialectChoice)
+def _compile_dialect_choice(element, compiler, **kw):
+    return compiler.process(element.default_clause, **kw)
+
+
+@compiles(_DialectChoice, "postgresql")
+def _compile_dialect_choice_postgresql(element, compiler, **kw):
+    return compiler.process(element.postgresql_clause, **kw)
+
+
+def _jsonb_contains(column, document: Any):
+    return column.op("@>")(cast(bindparam(None, json.dumps(document), String()), JSONB))
+
+
+class JsonArrayContains(_DialectChoice):
+    """``document[key]`` is an array containing ``value``."""
+    inherit_cache = True
+
+    def __init__(self, column, key: str, value: Any):
+        array_items = func.json_each(column, bindparam(None, f"$.{key}", String())).table_valued("value")
+        self.default_clause = exists(
+            select(literal_column("1")).select_from(array_items).where(array_items.c.value == value)
+        )
+        self.postgresql_clause = _jsonb_contains(column, {key: [value]})
+
+
+class JsonFieldEquals(_DialectChoice):
+    """``document[key] == value`` (top-level key, scalar value)."""
+    inherit_cache = True
+
+    def __init__(self, column, key: str, value: Any):
+        # json_extract hands containers back as JSON text, which a bound dict/list can't be compared to.
+        if isinstance(value, (dict, list)):
+            raise ValueError("JsonFieldEquals only compares JSON scalars")
+        self.default_clause = func.json_extract(column, bindparam(None, f"$.{key}", String())) == value
+        # Containment rather than ->> so the GIN index can answer it.
+        self.postgresql_clause = _jsonb_contains(column, {key: value})
@@ -1,55 +1,198 @@
 from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, String, Text, JSON, Float, 
-    Boolean, DateTime, ForeignKey, UniqueConstraint
+    Column, Integer, String, Float, 
+    Boolean, DateTime, ForeignKey, UniqueConstraint, Computed, Index, PrimaryKeyConstraint, text
 )
 from sqlalchemy.orm import relationship
 from app.database import BaseModel
+from app.models.json_columns import JsonDocument, json_integer, json_number
+from app.models.text_blob import BlobText
 
 class VendorInfo(BaseModel):
     __tablename__ = "vendor_info"
     
     vendor_id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(String(64), nullable=False)
     vendor_name = Column(String(255), nullable=False)
-    vendor_email = Column(String(255), unique=True, nullable=False, index=True)
+    # Unique per tenant only; the plain index serves inbound-email sender lookups across tenants.
+    vendor_email = Column(String(255), nullable=False, index=True)
     vendor_rating = Column(Float, nullable=True)
     vendor_created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Soft delete: hidden from the API at once, rows removed later by the purge job.
+    vendor_deleted_at = Column(DateTime, nullable=True, index=True)
     
     responses = relationship("VendorRfpResponse", back_populates="vendor")
+    performance = relationship(
+        "VendorPerformance", uselist=False, back_populates="vendor", cascade="all, delete-orphan"
+    )
+    
+    __table_args__ = (
+        # Deleted vendors don't hold on to their email until they are purged.
+        Index(
+            "uq_vendor_info_tenant_email", "tenant_id", "vendor_email", unique=True,
+            postgresql_where=text("vendor_deleted_at IS NULL"), sqlite_where=text("vendor_deleted_at IS NULL")
+        ),
+        Index("ix_vendor_info_tenant_created", "tenant_id", "vendor_created_at"),
+    )
+
+
+def _average(total_column: str, samples_column: str, scale: str = "") -> str:
+    return f"CASE WHEN {samples_column} > 0 THEN {total_column} * 1.0 / {samples_column}{scale} END"
+
+
+class VendorPerformance(BaseModel):
+    """Running totals of a vendor's RFP history, bumped in O(1) as sends, replies and evaluations happen.
+
+    The averages are generated columns so vendor listings can sort on them by index.
+    """
+    __tablename__ = "vendor_performance"
+    
+    vendor_id = Column(Integer, ForeignKey("vendor_info.vendor_id"), primary_key=True)
+    rfps_invited = Column(Integer, default=0, nullable=False)
+    responses_received = Column(Integer, default=0, nullable=False)
+    reply_seconds_total = Column(Float, default=0.0, nullable=False)
+    reply_samples = Column(Integer, default=0, nullable=False)
+    ai_score_total = Column(Float, default=0.0, nullable=False)
+    ai_score_samples = Column(Integer, default=0, nullable=False)
+    win_count = Column(Integer, default=0, nullable=False, index=True)
+    price_to_budget_total = Column(Float, default=0.0, nullable=False)
+    price_to_budget_samples = Column(Integer, default=0, nullable=False)
+    performance_updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    response_rate = Column(Float, Computed(_average("responses_received", "rfps_invited")), index=True)
+    average_reply_hours = Column(
+        Float, Computed(_average("reply_seconds_total", "reply_samples", " / 3600.0")), index=True
+    )
+    average_ai_score = Column(Float, Computed(_average("ai_score_total", "ai_score_samples")), index=True)
+    average_price_to_budget = Column(
+        Float, Computed(_average("price_to_budget_total", "price_to_budget_samples")), index=True
+    )
+    
+    vendor = relationship("VendorInfo", back_populates="performance")
 
 
 class RfpInfo(BaseModel):
     __tablename__ = "rfp_info"
     
     rfp_id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(String(64), nullable=False)
     rfp_title = Column(String(500), nullable=False)
-    rfp_raw_text = Column(Text, nullable=False)
-    rfp_structured_json = Column(JSON, nullable=True)
+    rfp_raw_text_hash = Column(String(64), nullable=False, index=True)
+    rfp_structured_json = Column(JsonDocument, nullable=True)
+    rfp_budget_min = Column(Float, Computed(json_number("rfp_structured_json", "budget_range", "min")), index=True)
+    rfp_budget_max = Column(Float, Computed(json_number("rfp_structured_json", "budget_range", "max")), index=True)
+    rfp_timeline_days = Column(Integer, Computed(json_integer("rfp_structured_json", "timeline_days")), index=True)
     rfp_status = Column(String(50), default="DRAFT", nullable=False)
+    rfp_evaluation_json = Column(JsonDocument, nullable=True)
+    rfp_evaluation_fingerprint = Column(String(64), nullable=True)
     rfp_created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    rfp_deleted_at = Column(DateTime, nullable=True, index=True)
     
     responses = relationship("VendorRfpResponse", back_populates="rfp")
+    
+    rfp_raw_text = BlobText("rfp_raw_text_hash")
+    
+    __table_args__ = (
+        Index("ix_rfp_info_tenant_created", "tenant_id", "rfp_created_at"),
+        Index("ix_rfp_info_tenant_status", "tenant_id", "rfp_status"),
+        Index("ix_rfp_info_tenant_title", "tenant_id", "rfp_title"),
+        Index(
+            "ix_rfp_info_rfp_structured_json", rfp_structured_json,
+            postgresql_using="gin", postgresql_ops={"rfp_structured_json": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
 
 class VendorRfpResponse(BaseModel):
+    """A vendor's reply to an RFP; tenant_id is copied from the RFP so the table can be partitioned by it.
+
+    When hash-partitioned (``tenant_response_hash_partitions``), the database
+    primary key is (id, tenant_id); ``id`` stays unique and is the ORM identity.
+    """
     __tablename__ = "vendor_rfp_response"
     
     id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(String(64), nullable=False)
     fk_rfp_id = Column(Integer, ForeignKey("rfp_info.rfp_id"), nullable=False)
     fk_vendor_id = Column(Integer, ForeignKey("vendor_info.vendor_id"), nullable=False)
-    email_raw_text = Column(Text, nullable=False)
-    email_parsed_json = Column(JSON, nullable=True)
+    # NULL once the raw email has aged out under RETENTION_EMAIL_RAW_TEXT_DAYS.
+    email_raw_text_hash = Column(String(64), nullable=True, index=True)
+    email_parsed_json = Column(JsonDocument, nullable=True)
     total_price = Column(Float, nullable=True)
     delivery_days = Column(Integer, nullable=True)
     warranty_years = Column(Float, nullable=True)
     payment_terms = Column(String(255), nullable=True)
     ai_score = Column(Float, nullable=True)
     ai_recommended = Column(Boolean, default=False, nullable=False)
-    response_created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    response_created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     
     rfp = relationship("RfpInfo", back_populates="responses")
     vendor = relationship("VendorInfo", back_populates="responses")
     
+    email_raw_text = BlobText("email_raw_text_hash")
+    
+    __table_args__ = (
+        UniqueConstraint('tenant_id', 'fk_rfp_id', 'fk_vendor_id', name='unique_rfp_vendor'),
+        Index("ix_vendor_rfp_response_tenant_vendor", "tenant_id", "fk_vendor_id"),
+        # Evaluation, fingerprinting and the purge look responses up by RFP alone.
+        Index("ix_vendor_rfp_response_fk_rfp_id", "fk_rfp_id"),
+        Index(
+            "ix_vendor_rfp_response_email_parsed_json", email_parsed_json,
+            postgresql_using="gin", postgresql_ops={"email_parsed_json": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+class EmailDeliveryEvent(BaseModel):
+    """Append-only SendGrid event log, range-partitioned by month on Postgres."""
+    __tablename__ = "email_delivery_event"
+    
+    event_timestamp = Column(DateTime, nullable=False)
+    sg_event_id = Column(String(100), nullable=False)
+    event_type = Column(String(32), nullable=False)
+    rfp_id = Column(Integer, nullable=True)
+    vendor_id = Column(Integer, nullable=True)
+    email = Column(String(255), nullable=True)
+    sg_message_id = Column(String(255), nullable=True)
+    event_payload = Column(JsonDocument, nullable=True)
+    event_received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
     __table_args__ = (
-        UniqueConstraint('fk_rfp_id', 'fk_vendor_id', name='unique_rfp_vendor'),
-    )
\ No newline at end of file
+        # Partitioned tables need the partition key in every unique constraint.
+        PrimaryKeyConstraint('event_timestamp', 'sg_event_id', name='pk_email_delivery_event'),
+        Index('ix_email_delivery_event_rfp_vendor', 'rfp_id', 'vendor_id', 'event_timestamp'),
+        {"postgresql_partition_by": "RANGE (event_timestamp)"},
+    )
+
+
+class RfpVendorDeliveryState(BaseModel):
+    """Delivery status per RFP email, rolled up incrementally from delivery events."""
+    __tablename__ = "rfp_vendor_delivery_state"
+    
+    # No foreign keys: events carry caller-supplied IDs and may outlive the RFP.
+    rfp_id = Column(Integer, primary_key=True)
+    vendor_id = Column(Integer, primary_key=True)
+    delivery_status = Column(String(32), nullable=False)
+    delivery_status_rank = Column(Integer, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+    delivered_at = Column(DateTime, nullable=True)
+    first_opened_at = Column(DateTime, nullable=True)
+    open_count = Column(Integer, default=0, nullable=False)
+    click_count = Column(Integer, default=0, nullable=False)
+    failure_reason = Column(String(500), nullable=True)
+    last_event_at = Column(DateTime, nullable=True)
+
+
+class BackfillCheckpoint(BaseModel):
+    """Progress of a resumable bulk job; keyset cursor is the last primary key fully processed."""
+    __tablename__ = "backfill_checkpoint"
+    
+    job_name = Column(String(100), primary_key=True)
+    job_target = Column(String(50), nullable=False)
+    last_processed_id = Column(Integer, default=0, nullable=False)
+    processed_count = Column(Integer, default=0, nullable=False)
+    changed_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    job_status = Column(String(20), default="RUNNING", nullable=False)
+    job_started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    job_updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,159 @@
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, event, select, update
+from sqlalchemy.orm import Session, object_session
+
+from app.config import settings
+from app.database import BaseModel, DatabaseSession, dialect_insert
+from app.utils.compression import compress_text, content_hash, decompress_text
+from app.utils.tenant_cache import TenantLRUCache
+
+
+class TextBlob(BaseModel):
+    """Content-addressed, compressed raw text (RFP bodies, vendor emails)."""
+    __tablename__ = "text_blob"
+
+    blob_hash = Column(String(64), primary_key=True)
+    blob_codec = Column(String(10), nullable=False)
+    blob_data = Column(LargeBinary, nullable=False)
+    blob_size = Column(Integer, nullable=False)
+    blob_created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Bumped whenever a write reuses the blob, so the purge job never collects text that just gained a reference.
+    blob_used_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ArchivedTextBlob(BaseModel):
+    """Archive tier for text only referenced by evaluated RFPs, recompressed harder."""
+    __tablename__ = "text_blob_archive"
+
+    blob_hash = Column(String(64), primary_key=True)
+    blob_codec = Column(String(10), nullable=False)
+    blob_data = Column(LargeBinary, nullable=False)
+    blob_size = Column(Integer, nullable=False)
+    blob_created_at = Column(DateTime, nullable=False)
+    blob_used_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    blob_archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Decompressed text per tenant; blobs are immutable so entries never go stale.
+text_blob_cache = TenantLRUCache(
+    settings.text_blob_cache_size, int(settings.text_blob_cache_size * settings.tenant_cache_max_share)
+)
+
+
+def load_blob_texts(session: Session, blob_hashes: Iterable[str], tenant_id: Optional[str]) -> Dict[str, str]:
+    """Fetch several blobs at once (hot tier first, then archive), via the tenant's cache.
+
+    Bulk jobs pass ``tenant_id=None`` to bypass the cache entirely.
+    """
+    texts = {}
+    missing_hashes = set()
+    for blob_hash in blob_hashes:
+        if blob_hash is None:
+            continue
+        cached_text = text_blob_cache.get(tenant_id, blob_hash) if tenant_id is not None else None
+        if cached_text is None:
+            missing_hashes.add(blob_hash)
+        else:
+            texts[blob_hash] = cached_text
+
+    for blob_table in (TextBlob, ArchivedTextBlob):
+        if not missing_hashes:
+            break
+        rows = session.execute(
+            select(blob_table.blob_hash, blob_table.blob_codec, blob_table.blob_data)
+            .where(blob_table.blob_hash.in_(missing_hashes))
+        ).all()
+        for blob_hash, blob_codec, blob_data in rows:
+            texts[blob_hash] = decompress_text(blob_codec, blob_data)
+            if tenant_id is not None:
+                text_blob_cache.put(tenant_id, blob_hash, texts[blob_hash])
+            missing_hashes.discard(blob_hash)
+    return texts
+
+
+def load_blob_text(session: Optional[Session], blob_hash: str, tenant_id: Optional[str]) -> Optional[str]:
+    if session is not None:
+        return load_blob_texts(session, [blob_hash], tenant_id).get(blob_hash)
+    detached_session = DatabaseSession()
+    try:
+        return load_blob_texts(detached_session, [blob_hash], tenant_id).get(blob_hash)
+    finally:
+        detached_session.close()
+
+
+def insert_ignoring_duplicates(session: Session, table, rows: list):
+    """INSERT rows, skipping primary keys that already exist (concurrent writers may race)."""
+    if rows:
+        session.execute(dialect_insert(session, table).on_conflict_do_nothing(), rows)
+
+
+def store_blob_text(session: Session, text: str, tenant_id: Optional[str]) -> str:
+    blob_hash = content_hash(text)
+    if tenant_id is not None:
+        text_blob_cache.put(tenant_id, blob_hash, text)
+    # Touching (not just reading) an existing blob row locks it against a concurrent purge.
+    already_stored = any(
+        session.execute(
+            update(blob_table).where(blob_table.blob_hash == blob_hash).values(blob_used_at=datetime.utcnow())
+        ).rowcount
+        for blob_table in (TextBlob, ArchivedTextBlob)
+    )
+    if not already_stored:
+        blob_codec, blob_data = compress_text(text, settings.text_blob_compression_level)
+        insert_ignoring_duplicates(session, TextBlob, [{
+            "blob_hash": blob_hash,
+            "blob_codec": blob_codec,
+            "blob_data": blob_data,
+            "blob_size": len(text),
+            "blob_created_at": datetime.utcnow(),
+            "blob_used_at": datetime.utcnow()
+        }])
+    return blob_hash
+
+
+class BlobText:
+    """Model attribute whose text lives in the blob store; the row keeps only its hash.
+
+    Reading loads (and caches) the text on first access, so queries on the
+    owning table never pull raw bodies. Assigning sets the hash right away
+    and the blob itself is written when the session flushes; assigning None
+    clears the hash.
+    """
+
+    def __init__(self, hash_attribute: str):
+        self.hash_attribute = hash_attribute
+
+    def __set_name__(self, owner, name):
+        self.pending_key = f"_pending_{name}"
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        pending_text = instance.__dict__.get(self.pending_key)
+        if pending_text is not None:
+            return pending_text
+        blob_hash = getattr(instance, self.hash_attribute)
+        if blob_hash is None:
+            return None
+        return load_blob_text(object_session(instance), blob_hash, getattr(instance, "tenant_id", None))
+
+    def __set__(self, instance, text: Optional[str]):
+        if text is None:
+            # Clears the reference; whether the hash column may be NULL is up to the table.
+            instance.__dict__.pop(self.pending_key, None)
+            setattr(instance, self.hash_attribute, None)
+            return
+        instance.__dict__[self.pending_key] = text
+        setattr(instance, self.hash_attribute, content_hash(text))
+
+
+@event.listens_for(Session, "before_flush")
+def store_pending_blob_texts(session, flush_context, instances):
+    for instance in list(session.new) + list(session.dirty):
+        for attribute in type(instance).__dict__.values():
+            if isinstance(attribute, BlobText) and attribute.pending_key in instance.__dict__:
+                store_blob_text(
+                    session, instance.__dict__.pop(attribute.pending_key), getattr(instance, "tenant_id", None)
+                )
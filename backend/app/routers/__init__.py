@@ -1,3 +1,3 @@
-from app.routers import vendors, rfps, webhooks
+from app.routers import vendors, rfps, webhooks, events
 
-__all__ = ["vendors", "rfps", "webhooks"]
\ No newline at end of file
+__all__ = ["vendors", "rfps", "webhooks", "events"]
\ No newline at end of file
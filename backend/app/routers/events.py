@@ -0,0 +1,66 @@
+"""Server-Sent Events API routes"""
+import asyncio
+import json
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_database_session
+from app.services.event_bus import event_bus, rfp_topic, tenant_topic
+from app.services.rfp_service import RfpService
+from app.utils.tenancy import get_tenant_id
+
+router = APIRouter(prefix="/rfp_management/events", tags=["event_management"])
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no"
+}
+
+
+async def stream_topic_events(incoming_request: Request, topic: str):
+    subscription = event_bus.subscribe(topic)
+    try:
+        yield "retry: 3000\n\n"
+        while not await incoming_request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=settings.event_stream_keepalive_seconds
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+    finally:
+        event_bus.unsubscribe(subscription)
+
+
+class EventController:
+    @staticmethod
+    @router.get("")
+    async def stream_all_rfp_events(incoming_request: Request, tenant_id: str = Depends(get_tenant_id)):
+        return StreamingResponse(
+            stream_topic_events(incoming_request, tenant_topic(tenant_id)),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS
+        )
+
+    @staticmethod
+    @router.get("/rfps/{rfp_id}")
+    async def stream_specific_rfp_events(
+        rfp_id: int,
+        incoming_request: Request,
+        tenant_id: str = Depends(get_tenant_id),
+        database_session: Session = Depends(get_database_session)
+    ):
+        # Primary, not replica: EventSource sends no read-your-writes cookie, so a lagging replica would 404 a just-created RFP.
+        RfpService.get_rfp_by_id(database_session, tenant_id, rfp_id)
+        return StreamingResponse(
+            stream_topic_events(incoming_request, rfp_topic(rfp_id)),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS
+        )
@@ -2,10 +2,14 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.database import get_database_session
-from app.schemas.rfp import RfpCreate, RfpUpdate, RfpResponse, RfpSendRequest, RfpEvaluateResponse, VendorRfpResponseSchema
+from app.database import get_database_session, get_read_database_session
+from app.schemas.rfp import (
+    RfpCreate, RfpUpdate, RfpResponse, RfpSendRequest, RfpEvaluateResponse, VendorRfpResponseSchema,
+    RfpListFilters, ResponseListFilters
+)
 from app.services.rfp_service import RfpService
 from app.utils.responses import success_response, error_response
+from app.utils.tenancy import get_tenant_id
 
 router = APIRouter(prefix="/rfp_management/rfps", tags=["rfp_management"])
 
@@ -14,22 +18,25 @@ class RfpController:
     @router.post("", status_code=201)
     def create_new_rfp(
         rfp_details: RfpCreate,
+        tenant_id: str = Depends(get_tenant_id),
         database_session: Session = Depends(get_database_session)
     ):
-        new_rfp = RfpService.create_rfp(database_session, rfp_details)
+        new_rfp = RfpService.create_rfp(database_session, tenant_id, rfp_details)
         rfp_data = RfpResponse.from_orm(new_rfp).model_dump(mode='json')
         return success_response(
             data=rfp_data,
-            message="RFP created successfully",
+            message="RFP created successfully, parsing in progress",
             status_code=201
         )
 
     @staticmethod
     @router.get("")
     def get_all_system_rfps(
-        database_session: Session = Depends(get_database_session)
+        filters: RfpListFilters = Depends(),
+        tenant_id: str = Depends(get_tenant_id),
+        database_session: Session = Depends(get_read_database_session)
     ):
-        all_rfps = RfpService.get_all_rfps(database_session)
+        all_rfps = RfpService.get_all_rfps(database_session, tenant_id, filters)
         rfps_data = [RfpResponse.from_orm(rfp).model_dump(mode='json') for rfp in all_rfps]
         return success_response(
             data=rfps_data,
@@ -40,22 +47,52 @@ class RfpController:
     @router.get("/{rfp_id}")
     def get_specific_rfp(
         rfp_id: int,
-        database_session: Session = Depends(get_database_session)
+        tenant_id: str = Depends(get_tenant_id),
+        database_session: Session = Depends(get_read_database_session)
     ):
-        rfp_info = RfpService.get_rfp_by_id(database_session, rfp_id)
+        rfp_info = RfpService.get_rfp_by_id(database_session, tenant_id, rfp_id)
         rfp_data = RfpResponse.from_orm(rfp_info).model_dump(mode='json')
         return success_response(
             data=rfp_data,
             message="RFP retrieved successfully"
         )
 
+    @staticmethod
+    @router.get("/{rfp_id}/status")
+    def get_rfp_parsing_status(
+        rfp_id: int,
+        tenant_id: str = Depends(get_tenant_id),
+        database_session: Session = Depends(get_database_session)
+    ):
+        rfp_status = RfpService.get_rfp_status(database_session, tenant_id, rfp_id)
+        return success_response(
+            data=rfp_status,
+            message="RFP status retrieved successfully"
+        )
+
+    @staticmethod
+    @router.post("/{rfp_id}/parse", status_code=202)
+    def retry_rfp_parsing(
+        rfp_id: int,
+        tenant_id: str = Depends(get_tenant_id),
+        database_session: Session = Depends(get_database_session)
+    ):
+        rfp_info = RfpService.retry_rfp_parsing(database_session, tenant_id, rfp_id)
+        rfp_data = RfpResponse.from_orm(rfp_info).model_dump(mode='json')
+        return success_response(
+            data=rfp_data,
+            message="RFP parsing queued",
+            status_code=202
+        )
+
     @staticmethod
     @router.delete("/{rfp_id}", status_code=204)
     def remove_rfp_from_system(
         rfp_id: int,
+        tenant_id: str = Depends(get_tenant_id),
         database_session: Session = Depends(get_database_session)
     ):
-        RfpService.delete_rfp(database_session, rfp_id)
+        RfpService.delete_rfp(database_session, tenant_id, rfp_id)
         return None
 
     @staticmethod
@@ -63,9 +100,10 @@ class RfpController:
     def send_rfp_to_vendors(
         rfp_id: int,
         send_request: RfpSendRequest,
+        tenant_id: str = Depends(get_tenant_id),
         database_session: Session = Depends(get_database_session)
     ):
-        RfpService.send_rfp_to_vendors(database_session, rfp_id, send_request.vendor_ids)
+        RfpService.send_rfp_to_vendors(database_session, tenant_id, rfp_id, send_request.vendor_ids)
         return success_response(
             data=None,
             message="RFP sent to vendors successfully"
@@ -75,21 +113,37 @@ class RfpController:
     @router.post("/{rfp_id}/evaluate")
     def evaluate_rfp_responses(
         rfp_id: int,
+        tenant_id: str = Depends(get_tenant_id),
         database_session: Session = Depends(get_database_session)
     ):
-        evaluation = RfpService.evaluate_rfp_responses(database_session, rfp_id)
+        evaluation = RfpService.evaluate_rfp_responses(database_session, tenant_id, rfp_id)
         return success_response(
             data=evaluation,
             message="RFP evaluation completed"
         )
 
+    @staticmethod
+    @router.get("/{rfp_id}/deliveries")
+    def get_rfp_deliveries(
+        rfp_id: int,
+        tenant_id: str = Depends(get_tenant_id),
+        database_session: Session = Depends(get_read_database_session)
+    ):
+        deliveries = RfpService.get_rfp_deliveries(database_session, tenant_id, rfp_id)
+        return success_response(
+            data=deliveries,
+            message="RFP delivery status retrieved successfully"
+        )
+
     @staticmethod
     @router.get("/{rfp_id}/responses")
     def get_rfp_responses(
         rfp_id: int,
-        database_session: Session = Depends(get_database_session)
+        filters: ResponseListFilters = Depends(),
+        tenant_id: str = Depends(get_tenant_id),
+        database_session: Session = Depends(get_read_database_session)
     ):
-        responses = RfpService.get_rfp_responses(database_session, rfp_id)
+        responses = RfpService.get_rfp_responses(database_session, tenant_id, rfp_id, filters)
         return success_response(
             data=responses,
             message="RFP responses retrieved successfully"
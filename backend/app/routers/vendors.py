@@ -2,9 +2,10 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.database import get_database_session
-from app.schemas import VendorCreate, VendorUpdate, VendorResponse
+from app.database import get_database_session, get_read_database_session
+from app.schemas import VendorCreate, VendorUpdate, VendorResponse, VendorListParams
 from app.services import VendorService
+from app.utils.tenancy import get_tenant_id
 from app.utils.responses import success_response, error_response
 
 router = APIRouter(prefix="/vendor_management/vendors", tags=["vendor_management"])
@@ -14,9 +15,10 @@ class VendorController:
     @router.post("", status_code=201)
     def create_new_vendor(
         vendor_details: VendorCreate,
+        tenant_id: str = Depends(get_tenant_id),
         database_session: Session = Depends(get_database_session)
     ):
-        new_vendor = VendorService.create_vendor(database_session, vendor_details)
+        new_vendor = VendorService.create_vendor(database_session, tenant_id, vendor_details)
         vendor_data = VendorResponse.from_orm(new_vendor).model_dump(mode='json')
         return success_response(
             data=vendor_data,
@@ -27,9 +29,11 @@ class VendorController:
     @staticmethod
     @router.get("")
     def get_all_system_vendors(
-        database_session: Session = Depends(get_database_session)
+        list_params: VendorListParams = Depends(),
+        tenant_id: str = Depends(get_tenant_id),
+        database_session: Session = Depends(get_read_database_session)
     ):
-        all_vendors = VendorService.get_all_vendors(database_session)
+        all_vendors = VendorService.get_all_vendors(database_session, tenant_id, list_params)
         vendors_data = [VendorResponse.from_orm(vendor).model_dump(mode='json') for vendor in all_vendors]
         return success_response(
             data=vendors_data,
@@ -40,9 +44,10 @@ class VendorController:
     @router.get("/{vendor_id}")
     def get_specific_vendor(
         vendor_id: int,
-        database_session: Session = Depends(get_database_session)
+        tenant_id: str = Depends(get_tenant_id),
+        database_session: Session = Depends(get_read_database_session)
     ):
-        vendor_info = VendorService.get_vendor_by_id(database_session, vendor_id)
+        vendor_info = VendorService.get_vendor_by_id(database_session, tenant_id, vendor_id)
         vendor_data = VendorResponse.from_orm(vendor_info).model_dump(mode='json')
         return success_response(
             data=vendor_data,
@@ -54,10 +59,11 @@ class VendorController:
     def update_existing_vendor(
         vendor_id: int,
         vendor_updates: VendorUpdate,
+        tenant_id: str = Depends(get_tenant_id),
         database_session: Session = Depends(get_database_session)
     ):
         updated_vendor = VendorService.update_vendor(
-            database_session, vendor_id, vendor_updates
+            database_session, tenant_id, vendor_id, vendor_updates
         )
         vendor_data = VendorResponse.from_orm(updated_vendor).model_dump(mode='json')
         return success_response(
@@ -69,9 +75,10 @@ class VendorController:
     @router.delete("/{vendor_id}", status_code=204)
     def remove_vendor_from_system(
         vendor_id: int,
+        tenant_id: str = Depends(get_tenant_id),
         database_session: Session = Depends(get_database_session)
     ):
-        VendorService.delete_vendor(database_session, vendor_id)
+        VendorService.delete_vendor(database_session, tenant_id, vendor_id)
         return success_response(
             data=None,
             message="Vendor deleted successfully"
@@ -1,69 +1,166 @@
 """Webhook API routes"""
+import asyncio
+import hmac
+import json
+import time
 from datetime import datetime
 from fastapi import APIRouter, Request, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from sendgrid.helpers.eventwebhook import EventWebhookHeader
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.database import get_database_session
 from app.models.models import VendorInfo, RfpInfo, VendorRfpResponse
+from app.services.attachment_service import attachment_service
+from app.services.delivery_tracking_service import DeliveryTrackingService
 from app.services.email_service import email_service
-from app.services.ai_service import ai_service
+from app.services.vendor_parse_batcher import vendor_parse_batcher
+from app.services.vendor_performance_service import VendorPerformanceService
+from app.services.event_bus import event_bus
+from app.utils.reply_tokens import find_reply_reference, strip_reply_tags
+from app.utils.request_timing import record_timing
 
 router = APIRouter(prefix="/vendor_management/webhooks", tags=["webhook_management"])
 
 
 class WebhookController:
+    @staticmethod
+    @router.post("/sendgrid/events")
+    async def process_sendgrid_delivery_events(incoming_request: Request):
+        payload = await incoming_request.body()
+        DeliveryTrackingService.verify_signature(
+            payload,
+            incoming_request.headers.get(EventWebhookHeader.SIGNATURE),
+            incoming_request.headers.get(EventWebhookHeader.TIMESTAMP)
+        )
+        try:
+            events = json.loads(payload)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Event payload is not valid JSON")
+        if not isinstance(events, list):
+            raise HTTPException(status_code=400, detail="Event payload must be a JSON array")
+
+        ingest_summary = await run_in_threadpool(DeliveryTrackingService.ingest_events, events)
+        return {
+            "status": "success",
+            "message": "Delivery events processed",
+            "data": ingest_summary
+        }
+
     @staticmethod
     @router.post("/sendgrid/inbound")
     async def process_incoming_vendor_email(
         incoming_request: Request,
         db: Session = Depends(get_database_session)
     ):
+        # Inbound Parse can't sign requests; the configured URL carries ?token=<WEBHOOK_SECRET> instead.
+        if settings.webhook_secret and not hmac.compare_digest(
+            incoming_request.query_params.get("token", ""), settings.webhook_secret
+        ):
+            raise HTTPException(status_code=403, detail="Invalid webhook token")
+        inbound_form = None
         try:
-            try:
-                email_data = await incoming_request.json()
-            except:
-                form_data = await incoming_request.form()
+            content_type = incoming_request.headers.get("content-type", "")
+            if content_type.startswith("multipart/form-data"):
+                # Stream the form so large attachments are spooled, never buffered whole.
+                inbound_form = await attachment_service.read_inbound_form(incoming_request)
                 email_data = {
-                    "from": form_data.get("from"),
-                    "to": form_data.get("to"),
-                    "subject": form_data.get("subject"),
-                    "text": form_data.get("text"),
-                    "html": form_data.get("html")
+                    "from": inbound_form.fields.get("from"),
+                    "to": inbound_form.fields.get("to"),
+                    "subject": inbound_form.fields.get("subject"),
+                    "text": inbound_form.fields.get("text"),
+                    "html": inbound_form.fields.get("html"),
+                    "attachments": inbound_form.attachments
                 }
+            else:
+                try:
+                    email_data = await incoming_request.json()
+                except:
+                    form_data = await incoming_request.form()
+                    email_data = {
+                        "from": form_data.get("from"),
+                        "to": form_data.get("to"),
+                        "subject": form_data.get("subject"),
+                        "text": form_data.get("text"),
+                        "html": form_data.get("html")
+                    }
             
             parsed_email = email_service.parse_inbound_email(email_data)
             
-            vendor = db.query(VendorInfo).filter(
-                VendorInfo.vendor_email == parsed_email["from_email"]
-            ).first()
-            
-            if not vendor:
-                return {"status": "error", "message": "Vendor email not recognized"}
+            subject = parsed_email["subject"] or ""
+            reply_reference = find_reply_reference(f"{subject}\n{parsed_email['body'] or ''}")
             
-            subject = parsed_email["subject"]
-            if "Re: RFP: " in subject:
-                rfp_title = subject.replace("Re: RFP: ", "").strip()
-            elif "RFP: " in subject:
-                rfp_title = subject.replace("RFP: ", "").strip()
+            if reply_reference:
+                # Signed reply token from our outgoing email: no need to trust sender or title.
+                rfp_id, vendor_id = reply_reference
+                vendor = db.query(VendorInfo).filter(
+                    VendorInfo.vendor_id == vendor_id, VendorInfo.vendor_deleted_at.is_(None)
+                ).first()
+                rfp = db.query(RfpInfo).filter(RfpInfo.rfp_id == rfp_id, RfpInfo.rfp_deleted_at.is_(None)).first()
+                if vendor and rfp and vendor.tenant_id != rfp.tenant_id:
+                    rfp = None
             else:
-                rfp_title = subject.strip()
+                # The same vendor email may exist in several tenants; the RFP title picks the tenant.
+                vendors_by_tenant = {
+                    sender.tenant_id: sender for sender in db.query(VendorInfo).filter(
+                        VendorInfo.vendor_email == parsed_email["from_email"], VendorInfo.vendor_deleted_at.is_(None)
+                    ).all()
+                }
+                
+                subject = strip_reply_tags(subject)
+                if "Re: RFP: " in subject:
+                    rfp_title = subject.replace("Re: RFP: ", "").strip()
+                elif "RFP: " in subject:
+                    rfp_title = subject.replace("RFP: ", "").strip()
+                else:
+                    rfp_title = subject.strip()
+                
+                rfp = db.query(RfpInfo).filter(
+                    RfpInfo.tenant_id.in_(vendors_by_tenant),
+                    RfpInfo.rfp_title == rfp_title,
+                    RfpInfo.rfp_deleted_at.is_(None)
+                ).order_by(RfpInfo.rfp_created_at.desc()).first() if vendors_by_tenant else None
+                vendor = vendors_by_tenant.get(rfp.tenant_id) if rfp else next(iter(vendors_by_tenant.values()), None)
             
-            rfp = db.query(RfpInfo).filter(RfpInfo.rfp_title == rfp_title).first()
+            if not vendor:
+                return {"status": "error", "message": "Vendor email not recognized"}
             
             if not rfp:
                 return {"status": "error", "message": "RFP not found"}
             
-            email_body = parsed_email["body"]
+            email_body = parsed_email["body"] or ""
+            attachments_text = ""
+            if inbound_form is not None and inbound_form.attachments:
+                attachments_text = await attachment_service.extract_attachments_text(
+                    inbound_form.attachments, rfp.tenant_id
+                )
+            email_text = f"{email_body}\n\n{attachments_text}".strip()
             
-            parsed_response = ai_service.parse_vendor_response(email_body)
+            parse_started_at = time.perf_counter()
+            # Passed apart so the prompt budget can trim attachments but never the message itself.
+            parse_result = vendor_parse_batcher.submit(email_body, attachments_text)
+            try:
+                parsed_response = await asyncio.wrap_future(parse_result)
+            finally:
+                # Only the LLM calls count as ai; waiting for a batch or a free worker is reported apart.
+                record_timing("ai", parse_result.llm_seconds)
+                record_timing(
+                    "ai_queue", max(0.0, time.perf_counter() - parse_started_at - parse_result.llm_seconds)
+                )
             
             existing_response = db.query(VendorRfpResponse).filter(
+                VendorRfpResponse.tenant_id == rfp.tenant_id,
                 VendorRfpResponse.fk_rfp_id == rfp.rfp_id,
                 VendorRfpResponse.fk_vendor_id == vendor.vendor_id
             ).first()
             
             if existing_response:
-                existing_response.email_raw_text = email_body
+                VendorPerformanceService.record_response(
+                    db, rfp, vendor.vendor_id, parsed_response.get("total_price"),
+                    previous_total_price=existing_response.total_price, is_new_response=False
+                )
+                existing_response.email_raw_text = email_text
                 existing_response.email_parsed_json = parsed_response
                 existing_response.total_price = parsed_response.get("total_price")
                 existing_response.delivery_days = parsed_response.get("delivery_days")
@@ -74,9 +171,10 @@ class WebhookController:
                 action = "updated"
             else:
                 vendor_response = VendorRfpResponse(
+                    tenant_id=rfp.tenant_id,
                     fk_rfp_id=rfp.rfp_id,
                     fk_vendor_id=vendor.vendor_id,
-                    email_raw_text=email_body,
+                    email_raw_text=email_text,
                     email_parsed_json=parsed_response,
                     total_price=parsed_response.get("total_price"),
                     delivery_days=parsed_response.get("delivery_days"),
@@ -84,10 +182,19 @@ class WebhookController:
                     payment_terms=parsed_response.get("payment_terms")
                 )
                 db.add(vendor_response)
+                VendorPerformanceService.record_response(
+                    db, rfp, vendor.vendor_id, parsed_response.get("total_price")
+                )
                 action = "saved"
             
             db.commit()
             db.refresh(vendor_response)
+
+            event_bus.publish("response.upserted", tenant_id=rfp.tenant_id, rfp_id=rfp.rfp_id, data={
+                "response_id": vendor_response.id,
+                "vendor_id": vendor.vendor_id,
+                "action": action
+            })
             
             return {
                 "status": "success",
@@ -104,3 +211,6 @@ class WebhookController:
             import traceback
             traceback.print_exc()
             return {"status": "error", "message": str(error)}
+        finally:
+            if inbound_form is not None:
+                inbound_form.close()
@@ -1,7 +1,13 @@
-from app.schemas.vendor import VendorCreate, VendorUpdate, VendorResponse
-from app.schemas.rfp import RfpCreate, RfpUpdate, RfpResponse, RfpSendRequest, RfpEvaluateResponse
+from app.schemas.vendor import (
+    VendorCreate, VendorUpdate, VendorResponse, VendorListParams, VendorPerformanceResponse
+)
+from app.schemas.rfp import (
+    RfpCreate, RfpUpdate, RfpResponse, RfpSendRequest, RfpEvaluateResponse,
+    RfpListFilters, ResponseListFilters
+)
 
 __all__ = [
-    "VendorCreate", "VendorUpdate", "VendorResponse",
-    "RfpCreate", "RfpUpdate", "RfpResponse", "RfpSendRequest", "RfpEvaluateResponse"
+    "VendorCreate", "VendorUpdate", "VendorResponse", "VendorListParams", "VendorPerformanceResponse",
+    "RfpCreate", "RfpUpdate", "RfpResponse", "RfpSendRequest", "RfpEvaluateResponse",
+    "RfpListFilters", "ResponseListFilters"
 ]
\ No newline at end of file
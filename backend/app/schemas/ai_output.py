@@ -0,0 +1,165 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel, ValidationInfo, field_validator, model_validator
+
+from app.utils.coercion import (
+    is_null_like, parse_amount, parse_duration_days, parse_duration_years, parse_number
+)
+
+
+def _string_list(value):
+    if is_null_like(value):
+        return []
+    if isinstance(value, str):
+        return [item.strip(" -•\t") for item in value.splitlines() if item.strip(" -•\t")]
+    return value
+
+
+def _optional_text(value):
+    if is_null_like(value):
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+
+class BudgetRangeOutput(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+    @field_validator("min", "max", mode="before")
+    @classmethod
+    def coerce_amount(cls, value):
+        return parse_amount(value)
+
+
+class RfpStructuredOutput(BaseModel):
+    title: Optional[str] = None
+    requirements: List[str] = []
+    budget_range: BudgetRangeOutput = BudgetRangeOutput()
+    timeline: Optional[str] = None
+    timeline_days: Optional[int] = None
+    delivery_location: Optional[str] = None
+    evaluation_criteria: List[str] = []
+
+    @field_validator("requirements", "evaluation_criteria", mode="before")
+    @classmethod
+    def coerce_string_list(cls, value):
+        return _string_list(value)
+
+    @field_validator("budget_range", mode="before")
+    @classmethod
+    def coerce_budget_range(cls, value):
+        if is_null_like(value):
+            return {}
+        if isinstance(value, (int, float, str)):
+            return {"min": None, "max": value}
+        return value
+
+    @field_validator("title", "timeline", "delivery_location", mode="before")
+    @classmethod
+    def coerce_text(cls, value):
+        return _optional_text(value)
+
+    @field_validator("timeline_days", mode="before")
+    @classmethod
+    def coerce_timeline_days(cls, value):
+        return parse_duration_days(value)
+
+    @model_validator(mode="after")
+    def require_title_or_requirements(self):
+        if not self.title and not self.requirements:
+            raise ValueError("an RFP needs at least a title or requirements")
+        return self
+
+    @model_validator(mode="after")
+    def derive_timeline_days(self):
+        if self.timeline_days is None and self.timeline:
+            try:
+                self.timeline_days = parse_duration_days(self.timeline)
+            except ValueError:
+                pass
+        return self
+
+
+class VendorQuoteOutput(BaseModel):
+    total_price: Optional[float] = None
+    delivery_days: Optional[int] = None
+    warranty_years: Optional[float] = None
+    payment_terms: Optional[str] = None
+    additional_notes: Optional[str] = None
+
+    @field_validator("total_price", mode="before")
+    @classmethod
+    def coerce_total_price(cls, value):
+        return parse_amount(value)
+
+    @field_validator("delivery_days", mode="before")
+    @classmethod
+    def coerce_delivery_days(cls, value):
+        return parse_duration_days(value)
+
+    @field_validator("warranty_years", mode="before")
+    @classmethod
+    def coerce_warranty_years(cls, value):
+        return parse_duration_years(value)
+
+    @field_validator("payment_terms", "additional_notes", mode="before")
+    @classmethod
+    def coerce_text(cls, value):
+        return _optional_text(value)
+
+
+class VendorEvaluationOutput(BaseModel):
+    """Validated with ``context={"vendor_ids": [...]}``, the vendors that were submitted for scoring."""
+    recommendations: Dict[int, float]
+    best_vendor_id: Optional[int] = None
+    reasoning: str = ""
+
+    @field_validator("recommendations", mode="before")
+    @classmethod
+    def coerce_recommendations(cls, value):
+        if isinstance(value, list):
+            # [{"vendor_id": 3, "score": 80}, ...]
+            value = {
+                item.get("vendor_id"): item.get("score")
+                for item in value if isinstance(item, dict)
+            }
+        if not isinstance(value, dict):
+            return value
+        recommendations = {}
+        for vendor_key, score in value.items():
+            vendor_id = parse_number(vendor_key)
+            if vendor_id is None:
+                raise ValueError(f"missing vendor id for score {score!r}")
+            recommendations[int(vendor_id)] = parse_number(score)
+        return recommendations
+
+    @field_validator("recommendations")
+    @classmethod
+    def cover_submitted_vendors(cls, value: Dict[int, float], info: ValidationInfo):
+        vendor_ids = (info.context or {}).get("vendor_ids")
+        if vendor_ids is not None:
+            missing_vendor_ids = set(vendor_ids) - set(value)
+            if missing_vendor_ids:
+                raise ValueError(f"no score for vendor ids {sorted(missing_vendor_ids)}")
+            value = {vendor_id: score for vendor_id, score in value.items() if vendor_id in vendor_ids}
+        if not value:
+            raise ValueError("no vendor scores")
+        return value
+
+    @field_validator("best_vendor_id", mode="before")
+    @classmethod
+    def coerce_best_vendor_id(cls, value):
+        vendor_id = parse_number(value)
+        return None if vendor_id is None else int(vendor_id)
+
+    @field_validator("reasoning", mode="before")
+    @classmethod
+    def coerce_reasoning(cls, value):
+        return _optional_text(value) or ""
+
+    @model_validator(mode="after")
+    def derive_best_vendor_id(self):
+        if self.best_vendor_id not in self.recommendations:
+            self.best_vendor_id = max(self.recommendations, key=self.recommendations.get)
+        return self
@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 
 class RfpCreate(BaseModel):
@@ -25,6 +25,21 @@ class RfpResponse(BaseModel):
             datetime: lambda v: v.isoformat()
         }
 
+class RfpListFilters(BaseModel):
+    rfp_status: Optional[str] = None
+    min_budget: Optional[float] = Field(None, description="Budget range reaches at least this amount")
+    max_budget: Optional[float] = Field(None, description="Budget range starts at or below this amount")
+    max_timeline_days: Optional[int] = None
+    requirement: Optional[str] = Field(None, description="Exact requirement text listed by the RFP")
+
+class ResponseListFilters(BaseModel):
+    min_total_price: Optional[float] = None
+    max_total_price: Optional[float] = None
+    max_delivery_days: Optional[int] = None
+    min_warranty_years: Optional[float] = None
+    parsed_field: Optional[str] = Field(None, description="Top-level key in email_parsed_json")
+    parsed_value: Optional[str] = Field(None, description="Value parsed_field must equal (JSON literal or plain text)")
+
 class RfpSendRequest(BaseModel):
     vendor_ids: List[int]
 
@@ -37,7 +52,8 @@ class VendorRfpResponseSchema(BaseModel):
     id: int
     fk_rfp_id: int
     fk_vendor_id: int
-    email_raw_text: str
+    # None once the raw email has passed RETENTION_EMAIL_RAW_TEXT_DAYS.
+    email_raw_text: Optional[str] = None
     email_parsed_json: Optional[dict] = None
     total_price: Optional[float] = None
     delivery_days: Optional[int] = None
@@ -1,5 +1,6 @@
 from datetime import datetime
-from pydantic import BaseModel, EmailStr
+from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
 
 class VendorCreate(BaseModel):
     vendor_name: str
@@ -11,12 +12,34 @@ class VendorUpdate(BaseModel):
     vendor_email: EmailStr = None
     vendor_rating: float = None
 
+class VendorListParams(BaseModel):
+    sort_by: Optional[str] = Field(
+        None,
+        description="vendor_created_at (default), vendor_rating, response_rate, average_reply_hours, "
+                    "average_ai_score, win_count or average_price_to_budget"
+    )
+    sort_order: str = Field("desc", description="asc or desc; vendors without data sort last either way")
+
+class VendorPerformanceResponse(BaseModel):
+    rfps_invited: int
+    responses_received: int
+    response_rate: Optional[float] = None
+    average_reply_hours: Optional[float] = None
+    average_ai_score: Optional[float] = None
+    win_count: int
+    average_price_to_budget: Optional[float] = None
+    performance_updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
 class VendorResponse(BaseModel):
     vendor_id: int
     vendor_name: str
     vendor_email: EmailStr
     vendor_rating: float = None
     vendor_created_at: datetime
+    performance: Optional[VendorPerformanceResponse] = None
 
     class Config:
         from_attributes = True
@@ -1,126 +1,277 @@
-from typing import Dict, Any, List
-from groq import Groq
+import json
+import logging
+from typing import Dict, Any, List, Optional, Set, Tuple, Type
+from pydantic import BaseModel, ValidationError
 
-from app.config import settings
 from app.models.models import RfpInfo, VendorRfpResponse
+from app.schemas.ai_output import RfpStructuredOutput, VendorQuoteOutput, VendorEvaluationOutput
+from app.services.llm_router import LLMRouter, LLMUnavailableError, llm_router
+from app.services.prompt_builder import PromptBuilder
+from app.utils.request_timing import timed_call
+
+logger = logging.getLogger(__name__)
+
+# Model size tier per task: extraction from short emails runs on the small,
+# fast model; structuring RFPs and comparing vendors need the large one.
+TASK_MODEL_TIERS = {
+    "parse_rfp_text": "large",
+    "parse_vendor_response": "small",
+    "parse_vendor_responses_batch": "small",
+    "evaluate_vendor_responses": "large",
+    "repair_output": "small"
+}
+
+VENDOR_RESPONSE_FIELDS = {"total_price", "delivery_days", "warranty_years", "payment_terms"}
+VENDOR_QUOTE_FIELD_INSTRUCTIONS = """
+- total_price: number (quoted price, null if not found)
+- delivery_days: number (delivery timeline in days, null if not found)
+- warranty_years: number (warranty period in years, null if not found)
+- payment_terms: string (payment terms description)
+- additional_notes: string (any other relevant information)
+""".strip()
+VENDOR_TABLE_COLUMNS = ["vendor_id", "total_price", "delivery_days", "warranty_years", "payment_terms"]
+VENDOR_NOTES_COLUMNS = ["vendor_id", "notes"]
+
+
+class InvalidLLMOutputError(LLMUnavailableError):
+    """The model answered, but nothing usable could be salvaged from the output."""
 
 
 class AIService:
     
-    def __init__(self):
-        self.groq_client = Groq(api_key=settings.groq_api_key)
-    
-    def parse_rfp_text(self, raw_text: str) -> Dict[str, Any]:
-        
-        prompt = f"""
-        Parse the following RFP text into structured JSON with these exact fields:
-        - title: string (project title)
-        - requirements: array of strings (key requirements)
-        - budget_range: object with min and max (numbers, null if not specified)
-        - timeline: string (project timeline description)
-        - delivery_location: string (where work should be done)
-        - evaluation_criteria: array of strings (how vendors will be evaluated)
-        
-        Output only valid JSON, no other text.
-        
-        RFP Text:
-        {raw_text}
+    def __init__(self, router: LLMRouter = llm_router):
+        self.llm_router = router
+
+    def _complete_json(self, task: str, prompt: str) -> Dict[str, Any]:
+        content = self.llm_router.complete_json(prompt, tier=TASK_MODEL_TIERS[task])
+        return json.loads(content)
+
+    def _complete_validated(
+        self,
+        task: str,
+        prompt: str,
+        output_model: Type[BaseModel],
+        validation_context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        try:
+            raw_output = self._complete_json(task, prompt)
+        except json.JSONDecodeError as error:
+            raise InvalidLLMOutputError(f"{task} output is not JSON: {error}") from error
+        if not isinstance(raw_output, dict):
+            raise InvalidLLMOutputError(f"{task} output is a {type(raw_output).__name__}, not a JSON object")
+        return self._validate_output(
+            raw_output, output_model, allow_repair=True, validation_context=validation_context
+        )
+
+    def _validate_output(
+        self,
+        raw_output: Any,
+        output_model: Type[BaseModel],
+        allow_repair: bool = False,
+        validation_context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Validate LLM output locally, repairing only the fields that fail.
+
+        Cheap coercion (currency strings, "6 weeks" -> days) happens in the
+        output model. Fields that still fail get one targeted repair prompt;
+        anything the repair cannot fix falls back to the field default, or
+        raises ``InvalidLLMOutputError`` when the field is required.
         """
-        
-        response = self.groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-            temperature=0  
+        output = raw_output if isinstance(raw_output, dict) else {}
+        try:
+            return output_model.model_validate(output, context=validation_context).model_dump()
+        except ValidationError as error:
+            validation_error = error
+
+        if allow_repair:
+            output = {**output, **self._repair_fields(output, output_model, validation_error)}
+            try:
+                return output_model.model_validate(output, context=validation_context).model_dump()
+            except ValidationError as error:
+                validation_error = error
+
+        failed_fields = self._failed_fields(validation_error)
+        logger.warning("Dropping invalid %s fields: %s", output_model.__name__, sorted(failed_fields))
+        salvaged_output = {field: value for field, value in output.items() if field not in failed_fields}
+        try:
+            return output_model.model_validate(salvaged_output, context=validation_context).model_dump()
+        except ValidationError as error:
+            raise InvalidLLMOutputError(f"Unusable {output_model.__name__} from LLM: {error}") from error
+
+    def _repair_fields(
+        self,
+        output: Dict[str, Any],
+        output_model: Type[BaseModel],
+        validation_error: ValidationError
+    ) -> Dict[str, Any]:
+        failed_fields = self._failed_fields(validation_error)
+        if not failed_fields:
+            # Whole-object problems (e.g. an RFP with neither title nor requirements) have no field to repair.
+            return {}
+        field_problems = []
+        for error in validation_error.errors():
+            field = str(error["loc"][0]) if error["loc"] else None
+            if field not in failed_fields:
+                continue
+            expected_type = str(output_model.model_fields[field].annotation).replace("typing.", "")
+            field_problems.append(
+                f"- {field}: got {json.dumps(output.get(field), default=str)} "
+                f"({error['msg']}); expected {expected_type}"
+            )
+
+        prompt = (
+            "These fields of a JSON extraction failed validation. Return a JSON object containing "
+            "only these fields with corrected values (use null if the value cannot be determined).\n"
+            + "\n".join(field_problems)
         )
-        
-        import json
-        return json.loads(response.choices[0].message.content)
+        try:
+            repaired_output = self._complete_json("repair_output", prompt)
+        except Exception:
+            logger.exception("Repair prompt for %s failed", output_model.__name__)
+            return {}
+        if not isinstance(repaired_output, dict):
+            return {}
+        return {field: value for field, value in repaired_output.items() if field in failed_fields}
+
+    @staticmethod
+    def _failed_fields(validation_error: ValidationError) -> Set[str]:
+        return {str(error["loc"][0]) for error in validation_error.errors() if error["loc"]}
     
-    def parse_vendor_response(self, email_text: str) -> Dict[str, Any]:
-        
-        prompt = f"""
-        Parse the following vendor email response into structured JSON with these exact fields:
-        - total_price: number (quoted price, null if not found)
-        - delivery_days: number (delivery timeline in days, null if not found)
-        - warranty_years: number (warranty period in years, null if not found)
-        - payment_terms: string (payment terms description)
-        - additional_notes: string (any other relevant information)
-        
-        Output only valid JSON, no other text.
-        
-        Email Text:
-        {email_text}
+    @timed_call("ai")
+    def parse_rfp_text(self, raw_text: str) -> Dict[str, Any]:
+        prompt = PromptBuilder("parse_rfp_text", """
+            Parse the following RFP text into structured JSON with these exact fields:
+            - title: string (project title)
+            - requirements: array of strings (key requirements)
+            - budget_range: object with min and max (numbers, null if not specified)
+            - timeline: string (project timeline description)
+            - delivery_location: string (where work should be done)
+            - evaluation_criteria: array of strings (how vendors will be evaluated)
+            Output only valid JSON, no other text.
+        """).add_text("RFP Text", raw_text).build()
+
+        return self._complete_validated("parse_rfp_text", prompt.text, RfpStructuredOutput)
+    
+    @timed_call("ai")
+    def parse_vendor_response(self, email_text: str, attachments_text: Optional[str] = None) -> Dict[str, Any]:
+        prompt = PromptBuilder("parse_vendor_response", f"""
+            Parse the following vendor email response into structured JSON with these exact fields:
+            {VENDOR_QUOTE_FIELD_INSTRUCTIONS}
+            Output only valid JSON, no other text.
+        """).add_text("Email Text", email_text).add_text(
+            "Attachments", attachments_text, required=False
+        ).build()
+
+        return self._complete_validated("parse_vendor_response", prompt.text, VendorQuoteOutput)
+
+    @timed_call("ai")
+    def parse_vendor_responses_batch(self, emails: List[Tuple[str, Optional[str]]]) -> List[Optional[Dict[str, Any]]]:
+        """Parse several vendor emails, given as (body, attachments text), with one shared instruction prompt.
+
+        Returns one entry per input email, in order; entries the model left
+        out or returned malformed are None so the caller can retry them singly.
+        Attachments are trimmed to fit the token budget, email bodies never
+        are, so a batch whose bodies alone are over budget is split in halves.
         """
-        
-        response = self.groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-            temperature=0
-        )
-        
-        import json
-        return json.loads(response.choices[0].message.content)
+        return self._parse_vendor_batch(emails)
+
+    def _parse_vendor_batch(self, emails: List[Tuple[str, Optional[str]]]) -> List[Optional[Dict[str, Any]]]:
+        prompt_builder = PromptBuilder("parse_vendor_responses_batch", f"""
+            Parse each of the following vendor email responses into structured JSON.
+            For every email, extract these exact fields:
+            {VENDOR_QUOTE_FIELD_INSTRUCTIONS}
+            Output only valid JSON of the form {{"results": [{{"index": <email number>, ...fields}}]}},
+            with exactly one result per email. Do not mix information between emails.
+        """)
+        for index, (email_text, attachments_text) in enumerate(emails):
+            prompt_builder.add_text(f"Email {index}", email_text)
+            prompt_builder.add_text(f"Email {index} Attachments", attachments_text, required=False)
+        prompt = prompt_builder.build()
+        if prompt.over_budget and len(emails) > 1:
+            middle = len(emails) // 2
+            return self._parse_vendor_batch(emails[:middle]) + self._parse_vendor_batch(emails[middle:])
+
+        batch_result = self._complete_json("parse_vendor_responses_batch", prompt.text)
+
+        parsed_responses: List[Optional[Dict[str, Any]]] = [None] * len(emails)
+        results = batch_result.get("results") if isinstance(batch_result, dict) else None
+        for result in results if isinstance(results, list) else []:
+            if not isinstance(result, dict):
+                continue
+            index = result.pop("index", None)
+            if not isinstance(index, int) or not 0 <= index < len(emails):
+                continue
+            if parsed_responses[index] is not None or not VENDOR_RESPONSE_FIELDS.issubset(result):
+                continue
+            try:
+                parsed_responses[index] = VendorQuoteOutput.model_validate(result).model_dump()
+            except ValidationError:
+                # Left as None: the single-email path has the repair prompt.
+                continue
+        return parsed_responses
     
+    @timed_call("ai")
     def evaluate_vendor_responses(self, rfp: RfpInfo, responses: List[VendorRfpResponse]) -> Dict[str, Any]:
     
+        structured_json = rfp.rfp_structured_json or {}
         rfp_data = {
             "title": rfp.rfp_title,
-            "requirements": rfp.rfp_structured_json.get("requirements", []),
-            "budget_range": rfp.rfp_structured_json.get("budget_range"),
-            "timeline": rfp.rfp_structured_json.get("timeline"),
-            "evaluation_criteria": rfp.rfp_structured_json.get("evaluation_criteria", [])
+            "budget_range": structured_json.get("budget_range"),
+            "timeline": structured_json.get("timeline")
+        }
+        # The long lists are what the token budget trims first.
+        rfp_lists = {
+            "requirements": structured_json.get("requirements", []),
+            "evaluation_criteria": structured_json.get("evaluation_criteria", [])
         }
         
         vendors_data = []
+        vendor_notes = []
         for resp in responses:
+            # Price/delivery/warranty/terms are already promoted to columns; only
+            # the free-text notes from the parsed email add information.
+            parsed_email = resp.email_parsed_json or {}
             vendors_data.append({
                 "vendor_id": resp.fk_vendor_id,
                 "total_price": resp.total_price,
                 "delivery_days": resp.delivery_days,
                 "warranty_years": resp.warranty_years,
-                "payment_terms": resp.payment_terms,
-                "email_parsed": resp.email_parsed_json
+                "payment_terms": resp.payment_terms
             })
+            if parsed_email.get("additional_notes"):
+                vendor_notes.append({"vendor_id": resp.fk_vendor_id, "notes": parsed_email["additional_notes"]})
         
-        prompt = f"""
-        Evaluate the following vendor responses for the RFP and recommend the best vendor.
-        
-        RFP Details:
-        {rfp_data}
-        
-        Vendor Responses:
-        {vendors_data}
+        prompt = PromptBuilder("evaluate_vendor_responses", """
+            Evaluate the following vendor responses for the RFP and recommend the best vendor.
+            For each vendor, calculate an AI score (0-100) based on:
+            - Price competitiveness (within budget)
+            - Delivery timeline (meets requirements)
+            - Warranty coverage
+            - Payment terms favorability
+            - Overall fit to requirements
+            Output JSON with:
+            - recommendations: object with vendor_id as key, score as value
+            - best_vendor_id: number (vendor with highest score)
+            - reasoning: string (explanation of recommendation)
+            Output only valid JSON, no other text.
+        """).add_json(
+            "RFP Details", rfp_data
+        ).add_json(
+            "RFP Requirements", rfp_lists, priority=1, required=False
+        ).add_table(
+            "Vendor Responses", vendors_data, VENDOR_TABLE_COLUMNS
+        ).add_table(
+            "Vendor Notes", vendor_notes, VENDOR_NOTES_COLUMNS, required=False
+        ).build()
         
-        For each vendor, calculate an AI score (0-100) based on:
-        - Price competitiveness (within budget)
-        - Delivery timeline (meets requirements)
-        - Warranty coverage
-        - Payment terms favorability
-        - Overall fit to requirements
-        
-        Output JSON with:
-        - recommendations: object with vendor_id as key, score as value
-        - best_vendor_id: number (vendor with highest score)
-        - reasoning: string (explanation of recommendation)
-        
-        Output only valid JSON, no other text.
-        """
-        
-        response = self.groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-            temperature=0
+        result = self._complete_validated(
+            "evaluate_vendor_responses", prompt.text, VendorEvaluationOutput,
+            validation_context={"vendor_ids": [resp.fk_vendor_id for resp in responses]}
         )
         
-        import json
-        result = json.loads(response.choices[0].message.content)
-        
         for resp in responses:
-            if str(resp.fk_vendor_id) in result["recommendations"]:
-                resp.ai_score = result["recommendations"][str(resp.fk_vendor_id)]
+            if resp.fk_vendor_id in result["recommendations"]:
+                resp.ai_score = result["recommendations"][resp.fk_vendor_id]
                 resp.ai_recommended = (resp.fk_vendor_id == result["best_vendor_id"])
         
         return result
@@ -0,0 +1,368 @@
+import asyncio
+import csv
+import hashlib
+import io
+import logging
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from tempfile import SpooledTemporaryFile
+from threading import Lock
+from typing import Dict, List, Optional
+from xml.etree import ElementTree
+
+from fastapi import Request
+from multipart.multipart import MultipartParser, parse_options_header
+
+from app.config import settings
+from app.utils.tenant_cache import TenantLRUCache
+
+logger = logging.getLogger(__name__)
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+SHEET_NAMESPACE = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+class AttachmentExtractionError(Exception):
+    pass
+
+
+class InboundAttachment:
+    def __init__(self, filename: str, content_type: str):
+        self.filename = filename
+        self.content_type = content_type
+        self.file = SpooledTemporaryFile(max_size=settings.attachment_spool_memory_bytes)
+        self.size = 0
+        self.content_hash = ""
+        self._hasher = hashlib.sha256()
+
+    def write(self, data: bytes):
+        self.file.write(data)
+        self._hasher.update(data)
+        self.size += len(data)
+
+    def finish(self):
+        self.content_hash = self._hasher.hexdigest()
+        self.file.seek(0)
+
+    def read_bytes(self) -> bytes:
+        self.file.seek(0)
+        return self.file.read()
+
+    def close(self):
+        self.file.close()
+
+
+class InboundEmailForm:
+    """SendGrid Inbound Parse form, parsed incrementally from the request stream.
+
+    Attachments are spooled to temp files as they arrive (in memory up to
+    ``attachment_spool_memory_bytes``, on disk beyond). Oversized attachments
+    and anything past the count/total caps are discarded and noted in
+    ``skipped_attachments`` instead of failing the whole email; text fields
+    are cut at ``inbound_field_max_bytes`` and noted in ``truncated_fields``.
+    """
+
+    def __init__(self, boundary: bytes):
+        self.fields: Dict[str, str] = {}
+        self.attachments: List[InboundAttachment] = []
+        self.skipped_attachments: List[str] = []
+        self.truncated_fields: List[str] = []
+        self._total_attachment_bytes = 0
+        self._reset_part()
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._reset_part,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end
+        })
+
+    def write(self, chunk: bytes):
+        self._parser.write(chunk)
+
+    def finalize(self):
+        self._parser.finalize()
+
+    def close(self):
+        for attachment in self.attachments:
+            attachment.close()
+
+    def _reset_part(self):
+        self._header_name = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._field_name: Optional[str] = None
+        self._field_value = bytearray()
+        self._field_truncated = False
+        self._attachment: Optional[InboundAttachment] = None
+        self._discard_part = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._field_name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" not in options:
+            return
+
+        filename = options[b"filename"].decode("utf-8", "replace")
+        if len(self.attachments) >= settings.attachment_max_count:
+            self.skipped_attachments.append(filename)
+            self._discard_part = True
+            return
+        content_type = self._headers.get(b"content-type", b"application/octet-stream").decode("latin-1")
+        self._attachment = InboundAttachment(filename, content_type)
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._discard_part:
+            return
+        chunk = data[start:end]
+
+        if self._attachment is None:
+            if self._field_truncated:
+                return
+            remaining_bytes = settings.inbound_field_max_bytes - len(self._field_value)
+            if len(chunk) > remaining_bytes:
+                # Keep the prefix that fits and drop everything after it, not just this chunk.
+                chunk = chunk[:remaining_bytes]
+                self._field_truncated = True
+                self.truncated_fields.append(self._field_name or "")
+            self._field_value += chunk
+            return
+
+        over_attachment_cap = self._attachment.size + len(chunk) > settings.attachment_max_bytes
+        over_total_cap = self._total_attachment_bytes + len(chunk) > settings.attachment_max_total_bytes
+        if over_attachment_cap or over_total_cap:
+            self.skipped_attachments.append(self._attachment.filename)
+            self._total_attachment_bytes -= self._attachment.size
+            self._attachment.close()
+            self._attachment = None
+            self._discard_part = True
+            return
+        self._attachment.write(chunk)
+        self._total_attachment_bytes += len(chunk)
+
+    def _on_part_end(self):
+        if self._discard_part:
+            return
+        if self._attachment is not None:
+            self._attachment.finish()
+            self.attachments.append(self._attachment)
+        elif self._field_name:
+            self.fields[self._field_name] = self._field_value.decode("utf-8", "replace")
+
+
+def _read_zip_entry(archive: zipfile.ZipFile, name: str, max_bytes: int) -> bytes:
+    """Read one archive member, refusing anything that inflates past ``max_bytes``."""
+    if archive.getinfo(name).file_size > max_bytes:
+        raise ValueError(f"{name} is larger than {max_bytes} bytes uncompressed")
+    # The declared size can lie, so the read itself is capped too.
+    with archive.open(name) as entry:
+        data = entry.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise ValueError(f"{name} is larger than {max_bytes} bytes uncompressed")
+    return data
+
+
+def _extract_docx_text(content: bytes, max_entry_bytes: int) -> str:
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        document = ElementTree.fromstring(_read_zip_entry(archive, "word/document.xml", max_entry_bytes))
+
+    lines = []
+    body = document.find(f"{WORD_NAMESPACE}body")
+    for block in body if body is not None else []:
+        if block.tag == f"{WORD_NAMESPACE}p":
+            lines.append("".join(node.text or "" for node in block.iter(f"{WORD_NAMESPACE}t")))
+        elif block.tag == f"{WORD_NAMESPACE}tbl":
+            for row in block.iter(f"{WORD_NAMESPACE}tr"):
+                cells = [
+                    "".join(node.text or "" for node in cell.iter(f"{WORD_NAMESPACE}t")).strip()
+                    for cell in row.iter(f"{WORD_NAMESPACE}tc")
+                ]
+                lines.append(" | ".join(cells))
+    return "\n".join(line for line in lines if line.strip())
+
+
+def _extract_xlsx_text(content: bytes, max_entry_bytes: int) -> str:
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        shared_strings = []
+        if "xl/sharedStrings.xml" in archive.namelist():
+            strings_root = ElementTree.fromstring(
+                _read_zip_entry(archive, "xl/sharedStrings.xml", max_entry_bytes)
+            )
+            shared_strings = [
+                "".join(node.text or "" for node in item.iter(f"{SHEET_NAMESPACE}t"))
+                for item in strings_root.iter(f"{SHEET_NAMESPACE}si")
+            ]
+
+        sheet_names = sorted(
+            name for name in archive.namelist()
+            if name.startswith("xl/worksheets/sheet") and name.endswith(".xml")
+        )
+        lines = []
+        for sheet_name in sheet_names:
+            lines.append(f"[{sheet_name.rsplit('/', 1)[-1][:-4]}]")
+            sheet_root = ElementTree.fromstring(_read_zip_entry(archive, sheet_name, max_entry_bytes))
+            for row in sheet_root.iter(f"{SHEET_NAMESPACE}row"):
+                cells = []
+                for cell in row.iter(f"{SHEET_NAMESPACE}c"):
+                    cell_type = cell.get("t")
+                    value_node = cell.find(f"{SHEET_NAMESPACE}v")
+                    if cell_type == "s" and value_node is not None:
+                        cells.append(shared_strings[int(value_node.text)])
+                    elif cell_type == "inlineStr":
+                        cells.append("".join(node.text or "" for node in cell.iter(f"{SHEET_NAMESPACE}t")))
+                    else:
+                        cells.append(value_node.text if value_node is not None and value_node.text else "")
+                if any(cells):
+                    lines.append(" | ".join(cells))
+    return "\n".join(lines)
+
+
+def _extract_pdf_text(content: bytes) -> str:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        logger.warning("pypdf is not installed, skipping PDF attachment")
+        return ""
+    reader = PdfReader(io.BytesIO(content))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _extract_csv_text(content: bytes) -> str:
+    rows = csv.reader(io.StringIO(content.decode("utf-8", "replace")))
+    return "\n".join(" | ".join(row) for row in rows if any(row))
+
+
+def extract_text(filename: str, content_type: str, content: bytes, max_chars: int, max_entry_bytes: int) -> str:
+    """Extract plain text from an attachment. Runs inside the extraction process pool."""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    try:
+        if extension == "pdf" or content_type == "application/pdf":
+            text = _extract_pdf_text(content)
+        elif extension == "docx":
+            text = _extract_docx_text(content, max_entry_bytes)
+        elif extension in ("xlsx", "xlsm"):
+            text = _extract_xlsx_text(content, max_entry_bytes)
+        elif extension == "csv" or content_type == "text/csv":
+            text = _extract_csv_text(content)
+        elif extension in ("txt", "text") or content_type.startswith("text/plain"):
+            text = content.decode("utf-8", "replace")
+        else:
+            return ""
+    except Exception as error:
+        # Re-raised as a plain message so it pickles back from the worker whatever the parser raised.
+        raise AttachmentExtractionError(f"could not extract {filename}: {error}") from None
+    return text.strip()[:max_chars]
+
+
+class AttachmentService:
+    def __init__(self, max_workers: int, cache_size: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache = TenantLRUCache(cache_size, int(cache_size * settings.tenant_cache_max_share))
+        self._lock = Lock()
+
+    async def read_inbound_form(self, incoming_request: Request) -> InboundEmailForm:
+        _, params = parse_options_header(incoming_request.headers.get("content-type", ""))
+        inbound_form = InboundEmailForm(params[b"boundary"])
+        try:
+            async for chunk in incoming_request.stream():
+                inbound_form.write(chunk)
+            inbound_form.finalize()
+        except Exception:
+            inbound_form.close()
+            raise
+        if inbound_form.skipped_attachments:
+            logger.warning("Skipped inbound attachments over limits: %s", inbound_form.skipped_attachments)
+        if inbound_form.truncated_fields:
+            logger.warning("Truncated inbound fields over limit: %s", inbound_form.truncated_fields)
+        return inbound_form
+
+    async def extract_attachments_text(self, attachments: List[InboundAttachment], tenant_id: str) -> str:
+        extracted_sections = await asyncio.gather(*[
+            self._extract_cached(attachment, tenant_id) for attachment in attachments
+        ])
+        return "\n\n".join(
+            f"--- Attachment: {attachment.filename} ---\n{text}"
+            for attachment, text in zip(attachments, extracted_sections) if text
+        )
+
+    async def _extract_cached(self, attachment: InboundAttachment, tenant_id: str) -> str:
+        # Same bytes under another name or type can extract differently (or not at all).
+        cache_key = (attachment.content_hash, attachment.filename, attachment.content_type)
+        cached_text = self._cache.get(tenant_id, cache_key)
+        if cached_text is not None:
+            return cached_text
+
+        executor = self._get_executor()
+        try:
+            text = await asyncio.wait_for(
+                asyncio.wrap_future(executor.submit(
+                    extract_text,
+                    attachment.filename,
+                    attachment.content_type,
+                    attachment.read_bytes(),
+                    settings.attachment_max_extracted_chars,
+                    settings.attachment_max_uncompressed_entry_bytes
+                )),
+                timeout=settings.attachment_extract_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Extracting %s timed out, recycling extraction workers", attachment.filename)
+            self._recycle_executor(executor)
+            return f"(could not extract {attachment.filename}: timed out)"
+        except BrokenProcessPool:
+            # Another extraction timed out and killed the pool this one was queued on.
+            self._recycle_executor(executor)
+            return f"(could not extract {attachment.filename}: extraction worker restarted)"
+        except AttachmentExtractionError as error:
+            # Failures aren't cached: the next delivery of the same file gets a fresh attempt.
+            return f"({error})"
+
+        self._cache.put(tenant_id, cache_key, text)
+        return text
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _recycle_executor(self, executor: ProcessPoolExecutor):
+        """Kill ``executor``'s workers and let the next call start a fresh pool.
+
+        ``shutdown`` alone leaves a stuck worker running, so the processes are
+        terminated directly. A no-op if the pool was already replaced.
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        for worker_process in list((executor._processes or {}).values()):
+            worker_process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+attachment_service = AttachmentService(
+    max_workers=settings.attachment_extract_workers,
+    cache_size=settings.attachment_cache_size
+)
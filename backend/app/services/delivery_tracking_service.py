@@ -0,0 +1,302 @@
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sendgrid.helpers.eventwebhook import EventWebhook
+from sqlalchemy import case, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import DatabaseSession, database_engine, dialect_insert
+from app.models.models import EmailDeliveryEvent, RfpVendorDeliveryState
+
+logger = logging.getLogger(__name__)
+
+# Higher rank wins when rolling up; "sent" is recorded by us before SendGrid reports anything,
+# "not_sent" for vendors that replied to an RFP they were never emailed.
+DELIVERY_STATUS_RANKS = {
+    "not_sent": -1,
+    "sent": 0,
+    "processed": 1,
+    "deferred": 2,
+    "delivered": 3,
+    "open": 4,
+    "click": 5,
+    "bounce": 6,
+    "dropped": 6,
+    "spamreport": 7,
+    "unsubscribe": 7,
+    "group_unsubscribe": 7,
+}
+FAILURE_EVENT_TYPES = {"bounce", "dropped", "deferred"}
+
+_event_webhook = EventWebhook()
+_event_webhook_public_key = None
+_known_event_partitions: Set[str] = set()
+_partition_lock = Lock()
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _earliest(current, incoming):
+    return case((current.is_(None), incoming), (incoming < current, incoming), else_=current)
+
+
+def _latest(current, incoming):
+    return case((current.is_(None), incoming), (incoming > current, incoming), else_=current)
+
+
+class DeliveryTrackingService:
+    @staticmethod
+    def verify_signature(payload: bytes, signature: Optional[str], timestamp: Optional[str]):
+        global _event_webhook_public_key
+        if not settings.sendgrid_event_webhook_public_key:
+            raise HTTPException(status_code=503, detail="Event webhook verification key is not configured")
+        if not signature or not timestamp:
+            raise HTTPException(status_code=403, detail="Missing event webhook signature")
+        if abs(time.time() - (_optional_int(timestamp) or 0)) > settings.sendgrid_event_webhook_max_age_seconds:
+            raise HTTPException(status_code=403, detail="Event webhook timestamp outside the allowed window")
+
+        if _event_webhook_public_key is None:
+            _event_webhook_public_key = _event_webhook.convert_public_key_to_ecdsa(
+                settings.sendgrid_event_webhook_public_key
+            )
+        try:
+            is_valid = _event_webhook.verify_signature(
+                payload.decode("utf-8"), signature, timestamp, _event_webhook_public_key
+            )
+        except Exception:
+            is_valid = False
+        if not is_valid:
+            raise HTTPException(status_code=403, detail="Invalid event webhook signature")
+
+    @staticmethod
+    def ingest_events(events: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Append a SendGrid event batch to the log and roll new events into delivery state.
+
+        Events are written in chunks with ON CONFLICT DO NOTHING, so SendGrid's
+        retries are idempotent; only rows actually inserted feed the rollup.
+        """
+        event_rows = [row for row in (DeliveryTrackingService._event_row(event) for event in events) if row]
+        # One row per key: RETURNING can't tell two copies of an event in one INSERT apart.
+        unique_rows: Dict[Tuple[datetime, str], Dict[str, Any]] = {}
+        for row in event_rows:
+            unique_rows.setdefault((row["event_timestamp"], row["sg_event_id"]), row)
+        unique_event_rows = list(unique_rows.values())
+        DeliveryTrackingService.ensure_event_partitions(row["event_timestamp"] for row in unique_event_rows)
+
+        chunk_size = settings.delivery_event_insert_chunk_size
+        inserted_count = 0
+        db = DatabaseSession()
+        try:
+            for chunk_start in range(0, len(unique_event_rows), chunk_size):
+                chunk = unique_event_rows[chunk_start:chunk_start + chunk_size]
+                inserted_keys = set(db.execute(
+                    dialect_insert(db, EmailDeliveryEvent)
+                    .on_conflict_do_nothing(index_elements=["event_timestamp", "sg_event_id"])
+                    .returning(EmailDeliveryEvent.event_timestamp, EmailDeliveryEvent.sg_event_id),
+                    chunk
+                ).all())
+                new_rows = [row for row in chunk if (row["event_timestamp"], row["sg_event_id"]) in inserted_keys]
+                DeliveryTrackingService._roll_up(db, new_rows)
+                db.commit()
+                inserted_count += len(new_rows)
+        finally:
+            db.close()
+
+        return {
+            "received": len(events),
+            "inserted": inserted_count,
+            "duplicates": len(event_rows) - inserted_count,
+            "skipped": len(events) - len(event_rows)
+        }
+
+    @staticmethod
+    def _event_row(event: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(event, dict) or not event.get("event"):
+            return None
+        event_timestamp = datetime.utcfromtimestamp(_optional_int(event.get("timestamp")) or int(time.time()))
+        sg_event_id = event.get("sg_event_id") or hashlib.sha256(
+            json.dumps(event, sort_keys=True, default=str).encode()
+        ).hexdigest()[:40]
+        return {
+            "event_timestamp": event_timestamp,
+            "sg_event_id": str(sg_event_id)[:100],
+            "event_type": str(event["event"])[:32],
+            "rfp_id": _optional_int(event.get("rfp_id")),
+            "vendor_id": _optional_int(event.get("vendor_id")),
+            "email": (event.get("email") or None) and str(event["email"])[:255],
+            "sg_message_id": (event.get("sg_message_id") or None) and str(event["sg_message_id"])[:255],
+            "event_payload": event
+        }
+
+    @staticmethod
+    def _roll_up(db: Session, event_rows: List[Dict[str, Any]]):
+        """Fold a chunk of new events into one upsert per (rfp_id, vendor_id)."""
+        states: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        for row in sorted(event_rows, key=lambda row: row["event_timestamp"]):
+            status_rank = DELIVERY_STATUS_RANKS.get(row["event_type"])
+            if row["rfp_id"] is None or row["vendor_id"] is None or status_rank is None:
+                continue
+            state = states.setdefault((row["rfp_id"], row["vendor_id"]), {
+                "rfp_id": row["rfp_id"],
+                "vendor_id": row["vendor_id"],
+                "delivery_status": row["event_type"],
+                "delivery_status_rank": status_rank,
+                "sent_at": None,
+                "delivered_at": None,
+                "first_opened_at": None,
+                "open_count": 0,
+                "click_count": 0,
+                "failure_reason": None,
+                "last_event_at": None
+            })
+            if status_rank >= state["delivery_status_rank"]:
+                state["delivery_status"] = row["event_type"]
+                state["delivery_status_rank"] = status_rank
+            if row["event_type"] == "delivered" and state["delivered_at"] is None:
+                state["delivered_at"] = row["event_timestamp"]
+            elif row["event_type"] == "open":
+                state["open_count"] += 1
+                state["first_opened_at"] = state["first_opened_at"] or row["event_timestamp"]
+            elif row["event_type"] == "click":
+                state["click_count"] += 1
+            elif row["event_type"] in FAILURE_EVENT_TYPES:
+                payload = row["event_payload"]
+                state["failure_reason"] = str(payload.get("reason") or payload.get("response") or row["event_type"])[:500]
+            state["last_event_at"] = row["event_timestamp"]
+
+        if not states:
+            return
+        insert_statement = dialect_insert(db, RfpVendorDeliveryState)
+        incoming = insert_statement.excluded
+        current = RfpVendorDeliveryState.__table__.c
+        incoming_wins = incoming.delivery_status_rank >= current.delivery_status_rank
+        db.execute(insert_statement.on_conflict_do_update(
+            index_elements=["rfp_id", "vendor_id"],
+            set_={
+                "delivery_status": case((incoming_wins, incoming.delivery_status), else_=current.delivery_status),
+                "delivery_status_rank": case((incoming_wins, incoming.delivery_status_rank), else_=current.delivery_status_rank),
+                "delivered_at": _earliest(current.delivered_at, incoming.delivered_at),
+                "first_opened_at": _earliest(current.first_opened_at, incoming.first_opened_at),
+                "open_count": current.open_count + incoming.open_count,
+                "click_count": current.click_count + incoming.click_count,
+                "failure_reason": case(
+                    (incoming.failure_reason.is_(None), current.failure_reason), else_=incoming.failure_reason
+                ),
+                "last_event_at": _latest(current.last_event_at, incoming.last_event_at)
+            }
+        ), list(states.values()))
+
+    @staticmethod
+    def record_sent(db: Session, rfp_id: int, vendor_ids: List[int]):
+        """Mark emails as sent; a re-send resets status so new events start from a clean slate."""
+        if not vendor_ids:
+            return
+        sent_at = datetime.utcnow()
+        insert_statement = dialect_insert(db, RfpVendorDeliveryState)
+        db.execute(insert_statement.on_conflict_do_update(
+            index_elements=["rfp_id", "vendor_id"],
+            set_={
+                "delivery_status": insert_statement.excluded.delivery_status,
+                "delivery_status_rank": insert_statement.excluded.delivery_status_rank,
+                "sent_at": insert_statement.excluded.sent_at,
+                "delivered_at": None,
+                "first_opened_at": None,
+                "open_count": 0,
+                "click_count": 0,
+                "failure_reason": None,
+                "last_event_at": None
+            }
+        ), [{
+            "rfp_id": rfp_id,
+            "vendor_id": vendor_id,
+            "delivery_status": "sent",
+            "delivery_status_rank": DELIVERY_STATUS_RANKS["sent"],
+            "sent_at": sent_at,
+            "open_count": 0,
+            "click_count": 0
+        } for vendor_id in vendor_ids])
+
+    @staticmethod
+    def record_unsent(db: Session, rfp_id: int, vendor_id: int) -> bool:
+        """Track a vendor that replied without being emailed; False if it already had a delivery state."""
+        insert_statement = dialect_insert(db, RfpVendorDeliveryState)
+        inserted_row = db.execute(insert_statement.on_conflict_do_nothing(
+            index_elements=["rfp_id", "vendor_id"]
+        ).returning(RfpVendorDeliveryState.vendor_id), {
+            "rfp_id": rfp_id,
+            "vendor_id": vendor_id,
+            "delivery_status": "not_sent",
+            "delivery_status_rank": DELIVERY_STATUS_RANKS["not_sent"],
+            "open_count": 0,
+            "click_count": 0
+        }).first()
+        return inserted_row is not None
+
+    @staticmethod
+    def get_delivery_states(db: Session, rfp_id: int) -> List[Dict[str, Any]]:
+        states = db.query(RfpVendorDeliveryState).filter(
+            RfpVendorDeliveryState.rfp_id == rfp_id
+        ).order_by(RfpVendorDeliveryState.vendor_id).all()
+        return [{
+            "vendor_id": state.vendor_id,
+            "delivery_status": state.delivery_status,
+            "sent_at": state.sent_at.isoformat() if state.sent_at else None,
+            "delivered_at": state.delivered_at.isoformat() if state.delivered_at else None,
+            "first_opened_at": state.first_opened_at.isoformat() if state.first_opened_at else None,
+            "open_count": state.open_count,
+            "click_count": state.click_count,
+            "failure_reason": state.failure_reason,
+            "last_event_at": state.last_event_at.isoformat() if state.last_event_at else None
+        } for state in states]
+
+    @staticmethod
+    def ensure_event_partitions(event_timestamps: Iterable[datetime] = ()):
+        """Create monthly partitions (plus a default) for the given timestamps on Postgres.
+
+        Called with no timestamps at startup to pre-create this month and the next.
+        """
+        if database_engine.dialect.name != "postgresql":
+            return
+        now = datetime.utcnow()
+        months = {(now.year, now.month), (now.year + now.month // 12, now.month % 12 + 1)}
+        months.update((timestamp.year, timestamp.month) for timestamp in event_timestamps)
+
+        partition_statements = {"email_delivery_event_default": (
+            "CREATE TABLE IF NOT EXISTS email_delivery_event_default PARTITION OF email_delivery_event DEFAULT"
+        )}
+        for year, month in months:
+            next_year, next_month = year + month // 12, month % 12 + 1
+            partition_statements[f"email_delivery_event_{year}_{month:02d}"] = (
+                f"CREATE TABLE IF NOT EXISTS email_delivery_event_{year}_{month:02d} "
+                f"PARTITION OF email_delivery_event "
+                f"FOR VALUES FROM ('{year}-{month:02d}-01') TO ('{next_year}-{next_month:02d}-01')"
+            )
+
+        with _partition_lock:
+            missing_partitions = {
+                name: statement for name, statement in partition_statements.items()
+                if name not in _known_event_partitions
+            }
+            if not missing_partitions:
+                return
+            with database_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                for partition_name, statement in missing_partitions.items():
+                    try:
+                        connection.execute(text(statement))
+                        _known_event_partitions.add(partition_name)
+                    except DBAPIError as error:
+                        # Another worker won the race, or rows for that month already sit in the default partition.
+                        logger.warning("Could not create partition %s: %s", partition_name, error)
@@ -1,9 +1,11 @@
 from typing import List, Dict, Any
 from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Email, To, Content, CustomArg
+from sendgrid.helpers.mail import Mail, Email, To, CustomArg
 
 from app.config import settings
 from app.models.models import RfpInfo, VendorInfo
+from app.services.email_templates import rfp_email_renderer
+from app.utils.request_timing import timed_call
 
 
 class EmailService:
@@ -11,60 +13,18 @@ class EmailService:
         self.client = SendGridAPIClient(api_key=settings.sendgrid_api_key)
         self.from_email = settings.sendgrid_from_email
     
-    def send_rfp_emails(self, rfp: RfpInfo, vendors: List[VendorInfo]):
+    @timed_call("email")
+    def send_rfp_emails(self, rfp: RfpInfo, vendors: List[VendorInfo]) -> List[int]:
+        """Send the RFP to each vendor; returns the IDs of vendors SendGrid accepted."""
         from_email = Email(self.from_email)
-        subject = f"RFP: {rfp.rfp_title}"
-        
-        structured_data = rfp.rfp_structured_json or {}
-        requirements = structured_data.get('requirements', [])
-        budget = structured_data.get('budget_range', {})
-        timeline = structured_data.get('timeline', 'Not specified')
-        delivery_location = structured_data.get('delivery_location', 'Not specified')
-        
-        email_body = f"""
-Dear Vendor,
-
-Please review the following Request for Proposal (RFP) and submit your proposal.
-
-═══════════════════════════════════════════════════════
-RFP DETAILS
-═══════════════════════════════════════════════════════
-
-Title: {rfp.rfp_title}
-
-Description:
-{rfp.rfp_raw_text}
-
---- Structured Requirements ---
-
-Requirements:
-{''.join([f'• {req}\n' for req in requirements])}
-
-Budget Range: ${budget.get('min', 'N/A')} - ${budget.get('max', 'N/A')}
-Timeline: {timeline}
-Delivery Location: {delivery_location}
-
-═══════════════════════════════════════════════════════
-HOW TO RESPOND
-═══════════════════════════════════════════════════════
-
-Please reply to this email with your proposal including:
-• Total price
-• Delivery timeline (in days)
-• Warranty information (in years)
-• Payment terms
-• Any additional notes
-
-Best regards,
-RFP Management Team
-        """
-        
-        content = Content("text/plain", email_body)
+        rendered_email = rfp_email_renderer.render_rfp(rfp)
+        sent_vendor_ids = []
         
         for vendor in vendors:
             try:
+                subject, text_body, html_body = rendered_email.for_vendor(rfp.rfp_id, vendor)
                 to_email = To(vendor.vendor_email)
-                mail = Mail(from_email, to_email, subject, content)
+                mail = Mail(from_email, to_email, subject, plain_text_content=text_body, html_content=html_body)
                 
                 # Add custom args for tracking
                 mail.add_custom_arg(CustomArg('rfp_id', str(rfp.rfp_id)))
@@ -72,9 +32,12 @@ RFP Management Team
                 
                 response = self.client.send(mail)
                 print(f"✓ Email sent to {vendor.vendor_email}: Status {response.status_code}")
+                sent_vendor_ids.append(vendor.vendor_id)
                 
             except Exception as e:
                 print(f"✗ Failed to send email to {vendor.vendor_email}: {str(e)}")
+        
+        return sent_vendor_ids
     
     def parse_inbound_email(self, email_data: Dict[str, Any]) -> Dict[str, Any]:
         return {
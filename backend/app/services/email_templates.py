@@ -0,0 +1,195 @@
+import hashlib
+import html
+import json
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from app.config import settings
+from app.models.models import RfpInfo, VendorInfo
+from app.utils.reply_tokens import make_reply_token, reply_tag
+from app.utils.tenant_cache import TenantLRUCache
+
+SLOT_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+
+class MergeTemplate:
+    """Template pre-split into literal text and ``{{slot}}`` names.
+
+    ``bind`` folds some slots into the literals and returns a smaller
+    template; ``merge`` fills the rest with a single join. Values are never
+    re-scanned for slots, so user text containing ``{{...}}`` is inert.
+    """
+
+    def __init__(self, literals: List[str], slots: List[str]):
+        self.literals = literals
+        self.slots = slots
+
+    @classmethod
+    def compile(cls, source: str) -> "MergeTemplate":
+        parts = SLOT_PATTERN.split(source)
+        return cls(parts[0::2], parts[1::2])
+
+    def bind(self, values: Dict[str, str]) -> "MergeTemplate":
+        literals = [self.literals[0]]
+        slots = []
+        for slot, literal in zip(self.slots, self.literals[1:]):
+            if slot in values:
+                literals[-1] += values[slot] + literal
+            else:
+                slots.append(slot)
+                literals.append(literal)
+        return MergeTemplate(literals, slots)
+
+    def merge(self, values: Dict[str, str]) -> str:
+        merged = [self.literals[0]]
+        for slot, literal in zip(self.slots, self.literals[1:]):
+            merged.append(values[slot])
+            merged.append(literal)
+        return "".join(merged)
+
+
+SUBJECT_TEMPLATE = MergeTemplate.compile("RFP: {{title}} {{reply_tag}}")
+
+TEXT_TEMPLATE = MergeTemplate.compile("""Dear {{vendor_name}},
+
+Please review the following Request for Proposal (RFP) and submit your proposal.
+
+═══════════════════════════════════════════════════════
+RFP DETAILS
+═══════════════════════════════════════════════════════
+
+Title: {{title}}
+
+Description:
+{{description}}
+
+--- Structured Requirements ---
+
+Requirements:
+{{requirements}}
+
+Budget Range: ${{budget_min}} - ${{budget_max}}
+Timeline: {{timeline}}
+Delivery Location: {{delivery_location}}
+
+═══════════════════════════════════════════════════════
+HOW TO RESPOND
+═══════════════════════════════════════════════════════
+
+Please reply to this email with your proposal including:
+• Total price
+• Delivery timeline (in days)
+• Warranty information (in years)
+• Payment terms
+• Any additional notes
+
+Please keep this reference in your reply: {{reply_tag}}
+
+Best regards,
+RFP Management Team
+""")
+
+HTML_TEMPLATE = MergeTemplate.compile("""<p>Dear {{vendor_name}},</p>
+<p>Please review the following Request for Proposal (RFP) and submit your proposal.</p>
+<h2>RFP Details</h2>
+<p><strong>Title:</strong> {{title}}</p>
+<h3>Description</h3>
+<p style="white-space: pre-wrap">{{description}}</p>
+<h3>Requirements</h3>
+<ul>{{requirements}}</ul>
+<p>
+<strong>Budget Range:</strong> ${{budget_min}} - ${{budget_max}}<br>
+<strong>Timeline:</strong> {{timeline}}<br>
+<strong>Delivery Location:</strong> {{delivery_location}}
+</p>
+<h2>How to Respond</h2>
+<p>Please reply to this email with your proposal including:</p>
+<ul>
+<li>Total price</li>
+<li>Delivery timeline (in days)</li>
+<li>Warranty information (in years)</li>
+<li>Payment terms</li>
+<li>Any additional notes</li>
+</ul>
+<p>Please keep this reference in your reply: {{reply_tag}}</p>
+<p>Best regards,<br>RFP Management Team</p>
+""")
+
+
+@dataclass
+class RenderedRfpEmail:
+    """One RFP's email with the RFP-level content bound; only vendor slots remain."""
+    subject: MergeTemplate
+    text: MergeTemplate
+    html: MergeTemplate
+
+    def for_vendor(self, rfp_id: int, vendor: VendorInfo) -> Tuple[str, str, str]:
+        tag = reply_tag(make_reply_token(rfp_id, vendor.vendor_id))
+        vendor_name = vendor.vendor_name or "Vendor"
+        return (
+            self.subject.merge({"reply_tag": tag}),
+            self.text.merge({"vendor_name": vendor_name, "reply_tag": tag}),
+            self.html.merge({"vendor_name": html.escape(vendor_name), "reply_tag": tag})
+        )
+
+
+def _display(value) -> str:
+    if value is None or value == "":
+        return "N/A"
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+class RfpEmailRenderer:
+    """Renders RFP emails in two stages.
+
+    The RFP-level content is bound into the text and HTML templates once per
+    RFP version and cached; each vendor then only costs a merge of their
+    name and reply token.
+    """
+
+    def __init__(self, cache_size: int):
+        self._cache = TenantLRUCache(cache_size, int(cache_size * settings.tenant_cache_max_share))
+
+    def render_rfp(self, rfp: RfpInfo) -> RenderedRfpEmail:
+        cache_key = (rfp.rfp_id, self.rfp_version(rfp))
+        rendered_email = self._cache.get(rfp.tenant_id, cache_key)
+        if rendered_email is None:
+            rendered_email = self._bind_rfp(rfp)
+            self._cache.put(rfp.tenant_id, cache_key, rendered_email)
+        return rendered_email
+
+    @staticmethod
+    def rfp_version(rfp: RfpInfo) -> str:
+        version_inputs = [rfp.rfp_title, rfp.rfp_raw_text_hash, rfp.rfp_structured_json]
+        return hashlib.sha256(json.dumps(version_inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def _bind_rfp(rfp: RfpInfo) -> RenderedRfpEmail:
+        structured_data = rfp.rfp_structured_json or {}
+        requirements = structured_data.get("requirements") or []
+        budget = structured_data.get("budget_range") or {}
+        text_values = {
+            "title": rfp.rfp_title,
+            "description": rfp.rfp_raw_text,
+            "budget_min": _display(budget.get("min")),
+            "budget_max": _display(budget.get("max")),
+            "timeline": _display(structured_data.get("timeline")),
+            "delivery_location": _display(structured_data.get("delivery_location"))
+        }
+        html_values = {key: html.escape(value) for key, value in text_values.items()}
+
+        text_values["requirements"] = "".join(f"• {requirement}\n" for requirement in requirements)
+        html_values["requirements"] = "".join(
+            f"<li>{html.escape(str(requirement))}</li>" for requirement in requirements
+        )
+        return RenderedRfpEmail(
+            subject=SUBJECT_TEMPLATE.bind({"title": rfp.rfp_title}),
+            text=TEXT_TEMPLATE.bind(text_values),
+            html=HTML_TEMPLATE.bind(html_values)
+        )
+
+
+rfp_email_renderer = RfpEmailRenderer(cache_size=settings.email_template_cache_size)
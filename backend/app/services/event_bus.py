@@ -0,0 +1,157 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from datetime import datetime
+from itertools import count
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import database_engine
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "rfp_events"
+
+
+def tenant_topic(tenant_id: str) -> str:
+    return f"tenant:{tenant_id}"
+
+
+def rfp_topic(rfp_id: int) -> str:
+    return f"rfp:{rfp_id}"
+
+
+class EventSubscription:
+    """A single SSE client's mailbox, owned by the event loop that serves it."""
+
+    def __init__(self, topic: str, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.topic = topic
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, event: Dict[str, Any]):
+        if self.queue.full():
+            # Slow consumer: drop the oldest event rather than blocking publishers.
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class EventBus:
+    """In-process pub/sub for RFP lifecycle events.
+
+    With ``event_bus_backend = "postgres"`` events are published through
+    ``pg_notify`` and every worker process delivers them from its own LISTEN
+    connection, so clients connected to any worker see every event.
+    """
+
+    def __init__(self, backend: str, queue_size: int):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._subscriptions: Dict[str, Set[EventSubscription]] = {}
+        self._lock = threading.Lock()
+        self._event_ids = count(1)
+        self._listener_thread: Optional[threading.Thread] = None
+        self._stop_listening = threading.Event()
+
+    def subscribe(self, topic: str) -> EventSubscription:
+        subscription = EventSubscription(topic, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: EventSubscription):
+        with self._lock:
+            topic_subscriptions = self._subscriptions.get(subscription.topic)
+            if topic_subscriptions is not None:
+                topic_subscriptions.discard(subscription)
+                if not topic_subscriptions:
+                    del self._subscriptions[subscription.topic]
+
+    def publish(self, event_type: str, tenant_id: str, rfp_id: Optional[int] = None,
+                data: Optional[Dict[str, Any]] = None):
+        event = {
+            "type": event_type,
+            "tenant_id": tenant_id,
+            "rfp_id": rfp_id,
+            "data": data or {},
+            "published_at": datetime.utcnow().isoformat()
+        }
+
+        if self.backend == "postgres":
+            try:
+                with database_engine.begin() as connection:
+                    connection.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": NOTIFY_CHANNEL, "payload": json.dumps(event, default=str)}
+                    )
+                return
+            except Exception:
+                logger.exception("pg_notify failed, delivering %s locally only", event_type)
+
+        self._dispatch(event)
+
+    def start(self):
+        if self.backend != "postgres" or self._listener_thread is not None:
+            return
+        self._stop_listening.clear()
+        self._listener_thread = threading.Thread(
+            target=self._listen_for_notifications, name="rfp-event-listener", daemon=True
+        )
+        self._listener_thread.start()
+
+    def stop(self):
+        self._stop_listening.set()
+        self._listener_thread = None
+
+    def _dispatch(self, event: Dict[str, Any]):
+        event["id"] = next(self._event_ids)
+        topics = [tenant_topic(event["tenant_id"])]
+        if event.get("rfp_id") is not None:
+            topics.append(rfp_topic(event["rfp_id"]))
+
+        with self._lock:
+            subscriptions = [
+                subscription
+                for topic in topics
+                for subscription in self._subscriptions.get(topic, ())
+            ]
+
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, event)
+            except RuntimeError:
+                # The subscriber's loop has already closed.
+                self.unsubscribe(subscription)
+
+    def _listen_for_notifications(self):
+        while not self._stop_listening.is_set():
+            raw_connection = None
+            try:
+                raw_connection = database_engine.raw_connection()
+                listen_connection = raw_connection.driver_connection
+                listen_connection.autocommit = True
+                listen_connection.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+
+                while not self._stop_listening.is_set():
+                    if select.select([listen_connection], [], [], 5.0) == ([], [], []):
+                        continue
+                    listen_connection.poll()
+                    while listen_connection.notifies:
+                        notification = listen_connection.notifies.pop(0)
+                        self._dispatch(json.loads(notification.payload))
+            except Exception:
+                logger.exception("Event listener connection lost, reconnecting")
+                self._stop_listening.wait(2.0)
+            finally:
+                if raw_connection is not None:
+                    raw_connection.invalidate()
+
+
+event_bus = EventBus(
+    backend=settings.event_bus_backend,
+    queue_size=settings.event_subscriber_queue_size
+)
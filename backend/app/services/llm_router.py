@@ -0,0 +1,296 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+from openai import OpenAI
+
+from app.config import settings
+from app.utils.token_bucket import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUnavailableError(Exception):
+    """Raised when no registered backend could serve a completion."""
+
+
+class LLMBackend(ABC):
+    """An OpenAI-style chat completion provider with a model per size tier."""
+
+    def __init__(self, name: str, models: Dict[str, str]):
+        self.name = name
+        self.models = models
+
+    def model_for(self, tier: str) -> str:
+        return self.models.get(tier) or self.models["large"]
+
+    @abstractmethod
+    def complete(self, model: str, messages: List[dict], timeout: float) -> str:
+        """Return the completion text for ``messages``."""
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    def __init__(self, name: str, models: Dict[str, str], api_key: str, base_url: Optional[str] = None):
+        super().__init__(name, models)
+        # Retries are handled by the router (fallback + hedging), not the client.
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+
+    def complete(self, model: str, messages: List[dict], timeout: float) -> str:
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            response_format={"type": "json_object"},
+            temperature=0,
+            timeout=timeout
+        )
+        return response.choices[0].message.content
+
+
+class MockLLMBackend(LLMBackend):
+    """Local backend for tests and offline development; never leaves the process."""
+
+    def __init__(
+        self,
+        name: str = "mock",
+        responder: Optional[Callable[[str, List[dict]], str]] = None,
+        latency_seconds: float = 0.0
+    ):
+        super().__init__(name, {"small": "mock-small", "large": "mock-large"})
+        self.responder = responder or (lambda model, messages: "{}")
+        self.latency_seconds = latency_seconds
+        self.calls: List[dict] = []
+
+    def complete(self, model: str, messages: List[dict], timeout: float) -> str:
+        self.calls.append({"model": model, "messages": messages})
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return self.responder(model, messages)
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets one probe through after a cool-down."""
+
+    def __init__(self, failure_threshold: int, reset_timeout_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout_seconds or self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def is_open(self) -> bool:
+        """Whether ``allow_request`` would refuse right now; unlike it, never claims the probe."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            return time.monotonic() - self._opened_at < self.reset_timeout_seconds or self._probe_in_flight
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is not None or self._consecutive_failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    def __init__(self, window_size: int = 200):
+        self._samples = deque(maxlen=window_size)
+        self._lock = Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < 20:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+
+class RegisteredBackend:
+    def __init__(self, backend: LLMBackend, rate_limiter: TokenBucket, circuit_breaker: CircuitBreaker):
+        self.backend = backend
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.latency = LatencyTracker()
+
+
+class LLMRouter:
+    """Routes JSON completions across backends in priority order.
+
+    A request goes to the first healthy backend. If it has not answered by
+    that backend's observed p95 latency, a hedged duplicate is sent to the
+    next backend and whichever succeeds first wins. Failures fall through
+    to the next backend immediately.
+    """
+
+    def __init__(
+        self,
+        request_timeout_seconds: float,
+        hedge_min_delay_seconds: float,
+        max_workers: int = 16
+    ):
+        self.request_timeout_seconds = request_timeout_seconds
+        self.hedge_min_delay_seconds = hedge_min_delay_seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self._backends: List[RegisteredBackend] = []
+
+    def register(self, backend: LLMBackend, rate_per_second: float, burst: int,
+                 failure_threshold: int, reset_timeout_seconds: float):
+        self._backends.append(RegisteredBackend(
+            backend,
+            TokenBucket(rate_per_second, burst),
+            CircuitBreaker(failure_threshold, reset_timeout_seconds)
+        ))
+
+    def clear(self):
+        self._backends = []
+
+    @property
+    def backends(self) -> List[LLMBackend]:
+        return [registered.backend for registered in self._backends]
+
+    def complete_json(self, prompt: str, tier: str = "large") -> str:
+        messages = [{"role": "user", "content": prompt}]
+        candidates = list(self._backends)
+        deadline = time.monotonic() + self.request_timeout_seconds
+        in_flight: Dict[Future, RegisteredBackend] = {}
+        last_error: Optional[Exception] = None
+
+        while True:
+            if not in_flight:
+                registered = self._next_candidate(candidates, deadline)
+                if registered is None:
+                    break
+                in_flight[self._submit(registered, tier, messages)] = registered
+
+            hedge_delay = self._hedge_delay(next(iter(in_flight.values()))) if candidates else None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            timeout = min(hedge_delay, remaining) if hedge_delay is not None else remaining
+
+            done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+            for finished in done:
+                in_flight.pop(finished)
+                try:
+                    return finished.result()
+                except Exception as error:
+                    last_error = error
+
+            if not done and candidates:
+                registered = self._next_candidate(candidates, deadline, block=False)
+                if registered is not None:
+                    logger.info("Hedging LLM request to %s", registered.backend.name)
+                    in_flight[self._submit(registered, tier, messages)] = registered
+
+        raise LLMUnavailableError(f"No LLM backend completed the request: {last_error}")
+
+    def _next_candidate(self, candidates: List[RegisteredBackend], deadline: float,
+                        block: bool = True) -> Optional[RegisteredBackend]:
+        while candidates:
+            # Drop open circuits first so they don't spend (or wait for) rate-limit tokens.
+            candidates[:] = [registered for registered in candidates if not registered.circuit_breaker.is_open()]
+            if not candidates:
+                return None
+            acquired = next(
+                (registered for registered in candidates if registered.rate_limiter.try_acquire()),
+                None
+            )
+            if acquired is None:
+                if not block:
+                    return None
+                # Every remaining backend is rate limited: wait for the first one to refill.
+                acquired = candidates[0]
+                if not acquired.rate_limiter.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                    return None
+
+            candidates.remove(acquired)
+            if acquired.circuit_breaker.allow_request():
+                return acquired
+        return None
+
+    def _hedge_delay(self, registered: RegisteredBackend) -> float:
+        observed_p95 = registered.latency.p95()
+        if observed_p95 is None:
+            return max(self.hedge_min_delay_seconds, self.request_timeout_seconds / 4)
+        return max(self.hedge_min_delay_seconds, observed_p95)
+
+    def _submit(self, registered: RegisteredBackend, tier: str, messages: List[dict]) -> Future:
+        return self.executor.submit(self._call_backend, registered, tier, messages)
+
+    def _call_backend(self, registered: RegisteredBackend, tier: str, messages: List[dict]) -> str:
+        backend = registered.backend
+        started_at = time.monotonic()
+        try:
+            content = backend.complete(backend.model_for(tier), messages, self.request_timeout_seconds)
+        except Exception as error:
+            registered.circuit_breaker.record_failure()
+            logger.warning("LLM backend %s failed: %s", backend.name, error)
+            raise
+        registered.circuit_breaker.record_success()
+        registered.latency.record(time.monotonic() - started_at)
+        return content
+
+
+def build_backend(provider_name: str) -> Optional[LLMBackend]:
+    if provider_name == "groq" and settings.groq_api_key:
+        return OpenAICompatibleBackend(
+            "groq",
+            {"small": settings.llm_groq_small_model, "large": settings.llm_groq_large_model},
+            api_key=settings.groq_api_key,
+            base_url="https://api.groq.com/openai/v1"
+        )
+    if provider_name == "openai" and settings.openai_api_key:
+        return OpenAICompatibleBackend(
+            "openai",
+            {"small": settings.llm_openai_small_model, "large": settings.llm_openai_large_model},
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url
+        )
+    if provider_name == "mock":
+        return MockLLMBackend()
+    return None
+
+
+def build_llm_router() -> LLMRouter:
+    router = LLMRouter(
+        request_timeout_seconds=settings.llm_request_timeout_seconds,
+        hedge_min_delay_seconds=settings.llm_hedge_min_delay_seconds
+    )
+    for provider_name in settings.llm_provider_order.split(","):
+        backend = build_backend(provider_name.strip())
+        if backend is not None:
+            router.register(
+                backend,
+                rate_per_second=settings.llm_rate_limit_per_second,
+                burst=settings.llm_rate_limit_burst,
+                failure_threshold=settings.llm_circuit_failure_threshold,
+                reset_timeout_seconds=settings.llm_circuit_reset_seconds
+            )
+    return router
+
+
+llm_router = build_llm_router()
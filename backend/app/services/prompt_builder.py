@@ -0,0 +1,198 @@
+import json
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+MAX_SHRINK_LEVEL = 6
+BASE_STRING_LIMIT = 800
+BASE_LIST_LIMIT = 32
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens locally: exact with tiktoken installed, ~4 chars/token otherwise."""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def compact_instructions(text: str) -> str:
+    """Strip the indentation and blank lines that triple-quoted prompts carry."""
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def prune_empty(value: Any) -> Any:
+    """Recursively drop None, empty strings and empty containers."""
+    if isinstance(value, dict):
+        pruned = {key: prune_empty(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if not _is_empty(item)}
+    if isinstance(value, (list, tuple)):
+        pruned = [prune_empty(item) for item in value]
+        return [item for item in pruned if not _is_empty(item)]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def minified_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _limit(value: Any, string_limit: Optional[int], list_limit: Optional[int]) -> Any:
+    if isinstance(value, str):
+        if string_limit is not None and len(value) > string_limit:
+            return value[:string_limit].rstrip() + "…"
+        return value
+    if isinstance(value, dict):
+        return {key: _limit(item, string_limit, list_limit) for key, item in value.items()}
+    if isinstance(value, list):
+        kept = value if list_limit is None else value[:list_limit]
+        limited = [_limit(item, string_limit, list_limit) for item in kept]
+        if len(kept) < len(value):
+            limited.append(f"(+{len(value) - len(kept)} more)")
+        return limited
+    return value
+
+
+def _table_cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+@dataclass
+class PromptSection:
+    label: str
+    content: Any
+    kind: str
+    priority: int
+    required: bool
+    columns: Sequence[str] = ()
+    shrink_level: int = 0
+
+    def render(self) -> Optional[str]:
+        if self.shrink_level > MAX_SHRINK_LEVEL or (not self.required and _is_empty(self.content)):
+            return None
+
+        if self.shrink_level == 0:
+            string_limit, list_limit = None, None
+        else:
+            string_limit = max(40, BASE_STRING_LIMIT >> (self.shrink_level - 1))
+            list_limit = max(1, BASE_LIST_LIMIT >> (self.shrink_level - 1))
+
+        if self.kind == "text":
+            # Documents keep their head; the budget is spent on what comes first.
+            text_limit = None if string_limit is None else string_limit * 8
+            return f"{self.label}:\n{_limit(self.content, text_limit, None)}"
+        if self.kind == "table":
+            rows = [
+                "|".join(_table_cell(_limit(row.get(column), string_limit, list_limit)) for column in self.columns)
+                for row in self.content
+            ]
+            return f"{self.label}:\n" + "\n".join(["|".join(self.columns), *rows])
+        return f"{self.label}:\n{minified_json(_limit(self.content, string_limit, list_limit))}"
+
+    def can_shrink(self) -> bool:
+        # Required sections are sent whole; optional ones shrink and are finally dropped.
+        return not self.required and self.shrink_level <= MAX_SHRINK_LEVEL
+
+
+@dataclass
+class BuiltPrompt:
+    task: str
+    text: str
+    token_count: int
+    baseline_token_count: int
+    over_budget: bool = False
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.baseline_token_count - self.token_count)
+
+
+class PromptBuilder:
+    """Builds compact prompts and keeps them within a token budget.
+
+    Context is serialized as minified JSON (or pipe tables for row data)
+    with empty fields removed. When the prompt is over budget, optional
+    sections are shrunk step by step, lowest priority first and in turn
+    among equal priorities (long strings and lists are truncated, then the
+    section is dropped) until it fits. Required sections are never cut; a
+    prompt they alone push over budget comes back with ``over_budget`` set.
+    """
+
+    def __init__(self, task: str, instructions: str, token_budget: Optional[int] = None):
+        self.task = task
+        self.instructions = compact_instructions(instructions)
+        self.token_budget = token_budget or settings.llm_prompt_token_budget
+        self.sections: List[PromptSection] = []
+        # What the same context costs as indented f-string reprs, for reporting savings.
+        self._baseline_parts: List[str] = [instructions]
+
+    def add_json(self, label: str, value: Any, priority: int = 0, required: bool = True) -> "PromptBuilder":
+        self._baseline_parts.append(str(value))
+        self.sections.append(PromptSection(label, prune_empty(value), "json", priority, required))
+        return self
+
+    def add_table(self, label: str, rows: List[Dict[str, Any]], columns: Sequence[str],
+                  priority: int = 0, required: bool = True) -> "PromptBuilder":
+        self._baseline_parts.append(str(rows))
+        pruned_rows = [prune_empty(row) for row in rows]
+        used_columns = [column for column in columns if any(column in row for row in pruned_rows)]
+        self.sections.append(PromptSection(label, pruned_rows, "table", priority, required, used_columns))
+        return self
+
+    def add_text(self, label: str, text: Optional[str], priority: int = 0, required: bool = True) -> "PromptBuilder":
+        self._baseline_parts.append(text or "")
+        self.sections.append(PromptSection(label, (text or "").strip(), "text", priority, required))
+        return self
+
+    def build(self) -> BuiltPrompt:
+        text = self._render()
+        token_count = count_tokens(text)
+
+        while token_count > self.token_budget:
+            shrinkable = [section for section in self.sections if section.can_shrink()]
+            if not shrinkable:
+                break
+            # Least-shrunk first within a priority, so equal sections give up text evenly.
+            min(shrinkable, key=lambda section: (section.priority, section.shrink_level)).shrink_level += 1
+            text = self._render()
+            token_count = count_tokens(text)
+
+        built_prompt = BuiltPrompt(
+            task=self.task,
+            text=text,
+            token_count=token_count,
+            baseline_token_count=count_tokens("\n".join(self._baseline_parts)),
+            over_budget=token_count > self.token_budget
+        )
+        logger.info(
+            "%s prompt: %d tokens (budget %d, saved %d)",
+            self.task, built_prompt.token_count, self.token_budget, built_prompt.tokens_saved
+        )
+        if built_prompt.over_budget:
+            logger.warning("%s prompt still over budget after shrinking", self.task)
+        return built_prompt
+
+    def _render(self) -> str:
+        rendered_sections = [section.render() for section in self.sections]
+        return "\n\n".join([self.instructions, *[part for part in rendered_sections if part is not None]])
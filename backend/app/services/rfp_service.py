@@ -1,43 +1,224 @@
-from sqlalchemy.orm import Session, joinedload
+import hashlib
+import json
+import logging
+import re
+from concurrent.futures import Future
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import Session, contains_eager
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 from typing import List, Optional
 
+from app.config import settings
+from app.database import DatabaseSession
+from app.models.json_columns import JsonArrayContains, JsonFieldEquals
 from app.models.models import RfpInfo, VendorInfo, VendorRfpResponse
-from app.schemas.rfp import RfpCreate, RfpUpdate, RfpResponse, RfpEvaluateResponse
+from app.models.text_blob import load_blob_texts
+from app.schemas.rfp import (
+    RfpCreate, RfpUpdate, RfpResponse, RfpEvaluateResponse, RfpListFilters, ResponseListFilters
+)
 from app.services.ai_service import ai_service
+from app.services.delivery_tracking_service import DeliveryTrackingService
 from app.services.email_service import email_service
+from app.services.event_bus import event_bus
+from app.services.llm_router import LLMUnavailableError
+from app.services.single_flight import AdvisoryLockTimeout, SingleFlight, advisory_lock
+from app.services.task_runner import task_runner
+from app.services.text_blob_service import TextBlobService
+from app.services.vendor_performance_service import VendorPerformanceService
+
+logger = logging.getLogger(__name__)
+
+EVALUATION_LOCK_NAMESPACE = 7301
+PARSE_LOCK_NAMESPACE = 7303
+PARSED_FIELD_PATTERN = re.compile(r"^\w+$")
+evaluation_single_flight = SingleFlight()
+
 
 class RfpService:
     @staticmethod
-    def create_rfp(db: Session, rfp_data: RfpCreate) -> RfpInfo:
-        structured_json = ai_service.parse_rfp_text(rfp_data.rfp_raw_text)
-        
+    def create_rfp(db: Session, tenant_id: str, rfp_data: RfpCreate) -> RfpInfo:
         new_rfp = RfpInfo(
+            tenant_id=tenant_id,
             rfp_title=rfp_data.rfp_title,
             rfp_raw_text=rfp_data.rfp_raw_text,
-            rfp_structured_json=structured_json,
-            rfp_status="DRAFT"
+            rfp_structured_json=None,
+            rfp_status="PARSING"
         )
         db.add(new_rfp)
         db.commit()
         db.refresh(new_rfp)
+
+        RfpService._publish_status_change(new_rfp)
+        RfpService.schedule_rfp_parsing(new_rfp.rfp_id)
         return new_rfp
 
     @staticmethod
-    def get_all_rfps(db: Session) -> List[RfpInfo]:
-        return db.query(RfpInfo).order_by(RfpInfo.rfp_created_at.desc()).all()
+    def schedule_rfp_parsing(rfp_id: int) -> Future:
+        return task_runner.submit(
+            ("parse_rfp", rfp_id),
+            RfpService._parse_rfp_in_background,
+            rfp_id,
+            on_failure=lambda error: RfpService._mark_rfp_parse_failed(rfp_id)
+        )
 
     @staticmethod
-    def get_rfp_by_id(db: Session, rfp_id: int) -> RfpInfo:
-        rfp = db.query(RfpInfo).filter(RfpInfo.rfp_id == rfp_id).first()
+    def retry_rfp_parsing(db: Session, tenant_id: str, rfp_id: int) -> RfpInfo:
+        rfp = RfpService.get_rfp_by_id(db, tenant_id, rfp_id)
+        if rfp.rfp_status not in ("PARSING", "PARSE_FAILED"):
+            raise HTTPException(status_code=409, detail="RFP has already been parsed")
+
+        rfp.rfp_status = "PARSING"
+        db.commit()
+        db.refresh(rfp)
+        RfpService._publish_status_change(rfp)
+
+        RfpService.schedule_rfp_parsing(rfp.rfp_id)
+        return rfp
+
+    @staticmethod
+    def resume_pending_rfp_parsing():
+        """Re-queue RFPs left PARSING by a restart. Runs in every worker; the parse lock dedupes them."""
+        db = DatabaseSession()
+        try:
+            pending_rfp_ids = [
+                rfp_id for (rfp_id,) in db.query(RfpInfo.rfp_id).filter(
+                    RfpInfo.rfp_status == "PARSING", RfpInfo.rfp_deleted_at.is_(None)
+                ).all()
+            ]
+        finally:
+            db.close()
+
+        for rfp_id in pending_rfp_ids:
+            RfpService.schedule_rfp_parsing(rfp_id)
+
+    @staticmethod
+    def get_rfp_status(db: Session, tenant_id: str, rfp_id: int) -> dict:
+        rfp = RfpService.get_rfp_by_id(db, tenant_id, rfp_id)
+        return {
+            "rfp_id": rfp.rfp_id,
+            "rfp_status": rfp.rfp_status,
+            "is_parsed": rfp.rfp_structured_json is not None,
+            "is_parsing": rfp.rfp_status == "PARSING"
+        }
+
+    @staticmethod
+    def _parse_rfp_in_background(rfp_id: int):
+        # One worker parses; the others skip, or find the RFP no longer PARSING once they get the lock.
+        # The lock's connection stays checked out for the LLM call.
+        try:
+            with advisory_lock(PARSE_LOCK_NAMESPACE, rfp_id, timeout_seconds=0):
+                RfpService._parse_rfp(rfp_id)
+        except AdvisoryLockTimeout:
+            logger.info("RFP %s is already being parsed by another worker", rfp_id)
+
+    @staticmethod
+    def _parse_rfp(rfp_id: int):
+        db = DatabaseSession()
+        try:
+            rfp = db.query(RfpInfo).filter(RfpInfo.rfp_id == rfp_id).first()
+            if not rfp or rfp.rfp_status != "PARSING" or rfp.rfp_deleted_at is not None:
+                return
+            raw_text = rfp.rfp_raw_text
+            # Release the connection while the LLM call is in flight.
+            db.rollback()
+
+            structured_json = ai_service.parse_rfp_text(raw_text)
+
+            rfp = db.query(RfpInfo).filter(RfpInfo.rfp_id == rfp_id).first()
+            if not rfp or rfp.rfp_status != "PARSING" or rfp.rfp_deleted_at is not None:
+                return
+            rfp.rfp_structured_json = structured_json
+            rfp.rfp_status = "DRAFT"
+            db.commit()
+            RfpService._publish_status_change(rfp)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _mark_rfp_parse_failed(rfp_id: int):
+        db = DatabaseSession()
+        try:
+            updated_rows = db.query(RfpInfo).filter(
+                RfpInfo.rfp_id == rfp_id,
+                RfpInfo.rfp_status == "PARSING"
+            ).update({RfpInfo.rfp_status: "PARSE_FAILED"}, synchronize_session=False)
+            tenant_id = db.query(RfpInfo.tenant_id).filter(RfpInfo.rfp_id == rfp_id).scalar()
+            db.commit()
+            if updated_rows:
+                event_bus.publish(
+                    "rfp.status_changed", tenant_id=tenant_id, rfp_id=rfp_id, data={"rfp_status": "PARSE_FAILED"}
+                )
+        finally:
+            db.close()
+
+    @staticmethod
+    def _publish_status_change(rfp: RfpInfo):
+        event_bus.publish(
+            "rfp.status_changed", tenant_id=rfp.tenant_id, rfp_id=rfp.rfp_id, data={"rfp_status": rfp.rfp_status}
+        )
+
+    @staticmethod
+    def _ensure_rfp_parsed(db: Session, rfp: RfpInfo):
+        if rfp.rfp_status == "PARSING":
+            pending_parse = task_runner.get(("parse_rfp", rfp.rfp_id))
+            if pending_parse is not None:
+                try:
+                    pending_parse.result(timeout=settings.rfp_parse_wait_seconds)
+                except Exception:
+                    # Timeouts and parse failures are reported from the refreshed status below.
+                    pass
+            db.refresh(rfp)
+
+        if rfp.rfp_status == "PARSING":
+            raise HTTPException(status_code=409, detail="RFP is still being parsed, please try again shortly")
+        if rfp.rfp_status == "PARSE_FAILED" or rfp.rfp_structured_json is None:
+            raise HTTPException(status_code=409, detail="RFP parsing failed, re-run parsing before continuing")
+
+    @staticmethod
+    def get_all_rfps(db: Session, tenant_id: str, filters: Optional[RfpListFilters] = None) -> List[RfpInfo]:
+        rfps_query = db.query(RfpInfo).filter(RfpInfo.tenant_id == tenant_id, RfpInfo.rfp_deleted_at.is_(None))
+        if filters is not None:
+            rfps_query = RfpService._apply_rfp_filters(rfps_query, filters)
+        rfps = rfps_query.order_by(RfpInfo.rfp_created_at.desc()).all()
+        # One blob query for the whole page instead of one per RFP.
+        load_blob_texts(db, [rfp.rfp_raw_text_hash for rfp in rfps], tenant_id)
+        return rfps
+
+    @staticmethod
+    def _apply_rfp_filters(rfps_query, filters: RfpListFilters):
+        if filters.rfp_status is not None:
+            rfps_query = rfps_query.filter(RfpInfo.rfp_status == filters.rfp_status)
+        if filters.min_budget is not None:
+            # An RFP with only a minimum budget is still in range if that minimum clears the bar.
+            rfps_query = rfps_query.filter(
+                func.coalesce(RfpInfo.rfp_budget_max, RfpInfo.rfp_budget_min) >= filters.min_budget
+            )
+        if filters.max_budget is not None:
+            rfps_query = rfps_query.filter(
+                func.coalesce(RfpInfo.rfp_budget_min, RfpInfo.rfp_budget_max) <= filters.max_budget
+            )
+        if filters.max_timeline_days is not None:
+            rfps_query = rfps_query.filter(RfpInfo.rfp_timeline_days <= filters.max_timeline_days)
+        if filters.requirement:
+            rfps_query = rfps_query.filter(
+                JsonArrayContains(RfpInfo.rfp_structured_json, "requirements", filters.requirement)
+            )
+        return rfps_query
+
+    @staticmethod
+    def get_rfp_by_id(db: Session, tenant_id: str, rfp_id: int) -> RfpInfo:
+        rfp = db.query(RfpInfo).filter(
+            RfpInfo.tenant_id == tenant_id, RfpInfo.rfp_id == rfp_id, RfpInfo.rfp_deleted_at.is_(None)
+        ).first()
         if not rfp:
             raise HTTPException(status_code=404, detail="RFP not found")
         return rfp
 
     @staticmethod
-    def update_rfp(db: Session, rfp_id: int, updates: RfpUpdate) -> RfpInfo:
-        rfp = RfpService.get_rfp_by_id(db, rfp_id)
+    def update_rfp(db: Session, tenant_id: str, rfp_id: int, updates: RfpUpdate) -> RfpInfo:
+        rfp = RfpService.get_rfp_by_id(db, tenant_id, rfp_id)
         for key, value in updates.model_dump(exclude_unset=True).items():
             setattr(rfp, key, value)
         db.commit()
@@ -45,44 +226,161 @@ class RfpService:
         return rfp
 
     @staticmethod
-    def delete_rfp(db: Session, rfp_id: int):
-        rfp = RfpService.get_rfp_by_id(db, rfp_id)
-        db.delete(rfp)
+    def delete_rfp(db: Session, tenant_id: str, rfp_id: int):
+        rfp = RfpService.get_rfp_by_id(db, tenant_id, rfp_id)
+        # Soft delete; the purge job removes responses and delivery state in batches later.
+        rfp.rfp_deleted_at = datetime.utcnow()
         db.commit()
+        event_bus.publish("rfp.deleted", tenant_id=tenant_id, rfp_id=rfp_id)
 
     @staticmethod
-    def send_rfp_to_vendors(db: Session, rfp_id: int, vendor_ids: List[int]):
-        rfp = RfpService.get_rfp_by_id(db, rfp_id)
-        vendors = db.query(VendorInfo).filter(VendorInfo.vendor_id.in_(vendor_ids)).all()
+    def send_rfp_to_vendors(db: Session, tenant_id: str, rfp_id: int, vendor_ids: List[int]):
+        rfp = RfpService.get_rfp_by_id(db, tenant_id, rfp_id)
+        RfpService._ensure_rfp_parsed(db, rfp)
+        vendors = db.query(VendorInfo).filter(
+            VendorInfo.tenant_id == tenant_id, VendorInfo.vendor_id.in_(vendor_ids), VendorInfo.vendor_deleted_at.is_(None)
+        ).all()
         
         if len(vendors) != len(vendor_ids):
             raise HTTPException(status_code=400, detail="Some vendor IDs not found")
         
-        email_service.send_rfp_emails(rfp, vendors)
+        sent_vendor_ids = email_service.send_rfp_emails(rfp, vendors)
+        VendorPerformanceService.record_invitations(db, rfp.rfp_id, sent_vendor_ids)
+        DeliveryTrackingService.record_sent(db, rfp.rfp_id, sent_vendor_ids)
         
         rfp.rfp_status = "SENT"
         db.commit()
+        RfpService._publish_status_change(rfp)
 
     @staticmethod
-    def evaluate_rfp_responses(db: Session, rfp_id: int) -> RfpEvaluateResponse:
-        rfp = RfpService.get_rfp_by_id(db, rfp_id)
-        responses = db.query(VendorRfpResponse).filter(VendorRfpResponse.fk_rfp_id == rfp_id).all()
-        
+    def get_rfp_deliveries(db: Session, tenant_id: str, rfp_id: int) -> List[dict]:
+        RfpService.get_rfp_by_id(db, tenant_id, rfp_id)
+        return DeliveryTrackingService.get_delivery_states(db, rfp_id)
+
+    @staticmethod
+    def evaluate_rfp_responses(db: Session, tenant_id: str, rfp_id: int) -> RfpEvaluateResponse:
+        rfp = RfpService.get_rfp_by_id(db, tenant_id, rfp_id)
+        RfpService._ensure_rfp_parsed(db, rfp)
+        # The evaluation runs on its own session; don't pin this request's connection meanwhile.
+        db.rollback()
+
+        return evaluation_single_flight.do(
+            ("evaluate", rfp_id),
+            lambda: RfpService._run_exclusive_evaluation(rfp_id)
+        )
+
+    @staticmethod
+    def _run_exclusive_evaluation(rfp_id: int) -> dict:
+        try:
+            with advisory_lock(EVALUATION_LOCK_NAMESPACE, rfp_id, settings.evaluation_lock_wait_seconds):
+                for _ in range(settings.evaluation_max_attempts):
+                    evaluation = RfpService._evaluate_current_responses(rfp_id)
+                    if evaluation is not None:
+                        return evaluation
+        except AdvisoryLockTimeout:
+            raise HTTPException(status_code=409, detail="This RFP is already being evaluated, please retry shortly")
+        raise HTTPException(status_code=409, detail="Vendor responses changed during evaluation, please retry")
+
+    @staticmethod
+    def _evaluate_current_responses(rfp_id: int) -> Optional[dict]:
+        """Evaluate once; returns None if the inputs changed while the LLM was busy."""
+        db = DatabaseSession()
+        try:
+            rfp, responses = RfpService._load_evaluation_inputs(db, rfp_id)
+            input_fingerprint = RfpService._evaluation_fingerprint(rfp, responses)
+            if rfp.rfp_evaluation_fingerprint == input_fingerprint and rfp.rfp_evaluation_json is not None:
+                # Another worker evaluated these exact inputs while we waited for the lock.
+                return rfp.rfp_evaluation_json
+
+            # Evaluate detached copies so no connection is held during the LLM call.
+            db.expunge_all()
+            db.rollback()
+            try:
+                evaluation = ai_service.evaluate_vendor_responses(rfp, responses)
+            except LLMUnavailableError as error:
+                logger.warning("Evaluation of RFP %s failed: %s", rfp_id, error)
+                raise HTTPException(status_code=503, detail="AI evaluation is unavailable, please retry shortly")
+
+            current_rfp, current_responses = RfpService._load_evaluation_inputs(db, rfp_id)
+            if RfpService._evaluation_fingerprint(current_rfp, current_responses) != input_fingerprint:
+                return None
+
+            evaluated_scores = {response.id: response for response in responses}
+            score_changes = []
+            for current_response in current_responses:
+                evaluated_response = evaluated_scores[current_response.id]
+                score_changes.append((
+                    current_response.fk_vendor_id,
+                    current_response.ai_score, current_response.ai_recommended,
+                    evaluated_response.ai_score, evaluated_response.ai_recommended
+                ))
+                current_response.ai_score = evaluated_response.ai_score
+                current_response.ai_recommended = evaluated_response.ai_recommended
+            VendorPerformanceService.record_evaluation(db, score_changes)
+
+            stored_evaluation = json.loads(json.dumps(evaluation, default=str))
+            current_rfp.rfp_evaluation_json = stored_evaluation
+            current_rfp.rfp_evaluation_fingerprint = input_fingerprint
+            current_rfp.rfp_status = "EVALUATED"
+            db.commit()
+
+            RfpService._publish_status_change(current_rfp)
+            event_bus.publish(
+                "evaluation.completed", tenant_id=current_rfp.tenant_id, rfp_id=rfp_id,
+                data={"best_vendor_id": stored_evaluation.get("best_vendor_id")}
+            )
+            task_runner.submit(("archive_rfp_text", rfp_id), TextBlobService.archive_rfp_text, rfp_id)
+            return stored_evaluation
+        finally:
+            db.close()
+
+    @staticmethod
+    def _load_evaluation_inputs(db: Session, rfp_id: int):
+        rfp = db.query(RfpInfo).filter(RfpInfo.rfp_id == rfp_id, RfpInfo.rfp_deleted_at.is_(None)).first()
+        if not rfp:
+            raise HTTPException(status_code=404, detail="RFP not found")
+        responses = db.query(VendorRfpResponse).join(VendorRfpResponse.vendor).filter(
+            VendorRfpResponse.fk_rfp_id == rfp_id, VendorInfo.vendor_deleted_at.is_(None)
+        ).order_by(VendorRfpResponse.id).all()
+
         if not responses:
             raise HTTPException(status_code=400, detail="No vendor responses found")
-        
-        evaluation = ai_service.evaluate_vendor_responses(rfp, responses)
-        
-        rfp.rfp_status = "EVALUATED"
-        db.commit()
-        
-        return evaluation
+        return rfp, responses
+
+    @staticmethod
+    def _evaluation_fingerprint(rfp: RfpInfo, responses: List[VendorRfpResponse]) -> str:
+        # Everything evaluate_vendor_responses reads, so a re-parse or backfill changes the fingerprint.
+        evaluation_inputs = {
+            "rfp": [rfp.rfp_title, rfp.rfp_structured_json],
+            "responses": [
+                [
+                    response.id, response.fk_vendor_id, response.total_price, response.delivery_days,
+                    response.warranty_years, response.payment_terms,
+                    (response.email_parsed_json or {}).get("additional_notes")
+                ]
+                for response in responses
+            ]
+        }
+        return hashlib.sha256(
+            json.dumps(evaluation_inputs, sort_keys=True, default=str).encode()
+        ).hexdigest()
 
     @staticmethod
-    def get_rfp_responses(database_session: Session, rfp_id: int):
-        responses = database_session.query(VendorRfpResponse).options(
-            joinedload(VendorRfpResponse.vendor)
-        ).filter(VendorRfpResponse.fk_rfp_id == rfp_id).all()
+    def get_rfp_responses(
+        database_session: Session, tenant_id: str, rfp_id: int, filters: Optional[ResponseListFilters] = None
+    ):
+        RfpService.get_rfp_by_id(database_session, tenant_id, rfp_id)
+        responses_query = database_session.query(VendorRfpResponse).join(VendorRfpResponse.vendor).options(
+            contains_eager(VendorRfpResponse.vendor)
+        ).filter(
+            VendorRfpResponse.tenant_id == tenant_id,
+            VendorRfpResponse.fk_rfp_id == rfp_id,
+            VendorInfo.vendor_deleted_at.is_(None)
+        )
+        if filters is not None:
+            responses_query = RfpService._apply_response_filters(responses_query, filters)
+        responses = responses_query.all()
+        load_blob_texts(database_session, [response.email_raw_text_hash for response in responses], tenant_id)
         
         responses_data = []
         for response in responses:
@@ -104,3 +402,30 @@ class RfpService:
             responses_data.append(response_dict)
         
         return responses_data
+
+    @staticmethod
+    def _apply_response_filters(responses_query, filters: ResponseListFilters):
+        if filters.min_total_price is not None:
+            responses_query = responses_query.filter(VendorRfpResponse.total_price >= filters.min_total_price)
+        if filters.max_total_price is not None:
+            responses_query = responses_query.filter(VendorRfpResponse.total_price <= filters.max_total_price)
+        if filters.max_delivery_days is not None:
+            responses_query = responses_query.filter(VendorRfpResponse.delivery_days <= filters.max_delivery_days)
+        if filters.min_warranty_years is not None:
+            responses_query = responses_query.filter(VendorRfpResponse.warranty_years >= filters.min_warranty_years)
+
+        if filters.parsed_field is not None or filters.parsed_value is not None:
+            if not filters.parsed_field or filters.parsed_value is None:
+                raise HTTPException(status_code=400, detail="parsed_field and parsed_value must be given together")
+            if not PARSED_FIELD_PATTERN.match(filters.parsed_field):
+                raise HTTPException(status_code=400, detail="parsed_field must be a plain field name")
+            try:
+                parsed_value = json.loads(filters.parsed_value)
+            except ValueError:
+                parsed_value = filters.parsed_value
+            if isinstance(parsed_value, (dict, list)):
+                raise HTTPException(status_code=400, detail="parsed_value must be a JSON scalar, not an object or array")
+            responses_query = responses_query.filter(
+                JsonFieldEquals(VendorRfpResponse.email_parsed_json, filters.parsed_field, parsed_value)
+            )
+        return responses_query
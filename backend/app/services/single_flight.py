@@ -0,0 +1,83 @@
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from sqlalchemy import text
+
+from app.database import database_engine
+
+ADVISORY_LOCK_POLL_SECONDS = 0.2
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one execution.
+
+    The first caller runs the function; callers arriving while it is in
+    flight wait for and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = Lock()
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        with self._lock:
+            in_flight_call = self._in_flight.get(key)
+            is_leader = in_flight_call is None
+            if is_leader:
+                in_flight_call = Future()
+                self._in_flight[key] = in_flight_call
+
+        if not is_leader:
+            return in_flight_call.result()
+
+        try:
+            in_flight_call.set_result(function())
+        except BaseException as error:
+            in_flight_call.set_exception(error)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return in_flight_call.result()
+
+
+class AdvisoryLockTimeout(TimeoutError):
+    pass
+
+
+@contextmanager
+def advisory_lock(namespace: int, key: int, timeout_seconds: Optional[float] = None):
+    """Postgres session-level advisory lock held for the duration of the block.
+
+    Serializes work on ``key`` across worker processes. The lock lives on a
+    dedicated pool connection, checked out for the whole block (including
+    the wait), so session commits cannot release it early; size the pool
+    for one extra connection per concurrent holder or waiter. Waits poll
+    ``pg_try_advisory_lock`` and raise ``AdvisoryLockTimeout`` after
+    ``timeout_seconds`` (``None`` waits indefinitely, ``0`` tries once).
+    On other databases (SQLite in tests) this is a no-op.
+    """
+    if database_engine.dialect.name != "postgresql":
+        yield
+        return
+
+    lock_parameters = {"namespace": namespace, "key": key}
+    deadline = None if timeout_seconds is None else time.monotonic() + timeout_seconds
+    with database_engine.connect() as lock_connection:
+        while True:
+            is_acquired = lock_connection.execute(
+                text("SELECT pg_try_advisory_lock(:namespace, :key)"), lock_parameters
+            ).scalar()
+            lock_connection.commit()
+            if is_acquired:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                raise AdvisoryLockTimeout(f"Advisory lock ({namespace}, {key}) is held elsewhere")
+            time.sleep(ADVISORY_LOCK_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            lock_connection.execute(text("SELECT pg_advisory_unlock(:namespace, :key)"), lock_parameters)
+            lock_connection.commit()
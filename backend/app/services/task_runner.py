@@ -0,0 +1,80 @@
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTaskRunner:
+    """Runs slow jobs (LLM calls, bulk work) on a worker pool with retries.
+
+    Jobs are keyed so the same piece of work is never queued twice while it is
+    still pending, and callers can look up the in-flight future to wait on it.
+    """
+
+    def __init__(self, max_workers: int, max_retries: int, retry_backoff_seconds: float):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rfp-task")
+        self.max_retries = max(1, max_retries)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._pending_tasks: Dict[Hashable, Future] = {}
+        self._lock = Lock()
+
+    def submit(
+        self,
+        task_key: Hashable,
+        task_function: Callable[..., Any],
+        *args: Any,
+        on_failure: Optional[Callable[[Exception], None]] = None
+    ) -> Future:
+        with self._lock:
+            existing_task = self._pending_tasks.get(task_key)
+            if existing_task is not None and not existing_task.done():
+                return existing_task
+
+            task = self.executor.submit(self._run_with_retries, task_key, task_function, args, on_failure)
+            self._pending_tasks[task_key] = task
+
+        task.add_done_callback(lambda finished: self._forget(task_key, finished))
+        return task
+
+    def get(self, task_key: Hashable) -> Optional[Future]:
+        with self._lock:
+            return self._pending_tasks.get(task_key)
+
+    def shutdown(self, wait: bool = False):
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _forget(self, task_key: Hashable, finished_task: Future):
+        with self._lock:
+            if self._pending_tasks.get(task_key) is finished_task:
+                del self._pending_tasks[task_key]
+
+    def _run_with_retries(
+        self,
+        task_key: Hashable,
+        task_function: Callable[..., Any],
+        args: tuple,
+        on_failure: Optional[Callable[[Exception], None]]
+    ) -> Any:
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                return task_function(*args)
+            except Exception as error:
+                if attempt == self.max_retries:
+                    logger.exception("Task %s failed after %d attempts", task_key, attempt)
+                    if on_failure is not None:
+                        on_failure(error)
+                    raise
+                logger.warning("Task %s failed (attempt %d/%d): %s", task_key, attempt, self.max_retries, error)
+                time.sleep(self.retry_backoff_seconds * (2 ** (attempt - 1)))
+
+
+task_runner = BackgroundTaskRunner(
+    max_workers=settings.task_worker_count,
+    max_retries=settings.task_max_retries,
+    retry_backoff_seconds=settings.task_retry_backoff_seconds
+)
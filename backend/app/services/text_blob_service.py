@@ -0,0 +1,80 @@
+import logging
+from datetime import datetime
+from typing import Set
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import DatabaseSession
+from app.models.models import RfpInfo, VendorRfpResponse
+from app.models.text_blob import ArchivedTextBlob, TextBlob, insert_ignoring_duplicates
+from app.utils.compression import compress_text, decompress_text
+
+logger = logging.getLogger(__name__)
+
+ARCHIVABLE_RFP_STATUSES = ("EVALUATED",)
+
+
+class TextBlobService:
+    @staticmethod
+    def archive_rfp_text(rfp_id: int) -> int:
+        """Move an evaluated RFP's raw texts from the hot blob table to the archive tier.
+
+        Blobs still referenced by an RFP (or a response to one) that is not
+        archivable stay hot. Returns the number of blobs moved.
+        """
+        db = DatabaseSession()
+        try:
+            rfp = db.query(RfpInfo).filter(RfpInfo.rfp_id == rfp_id).first()
+            if not rfp or rfp.rfp_status not in ARCHIVABLE_RFP_STATUSES:
+                return 0
+
+            candidate_hashes = {rfp.rfp_raw_text_hash} | {
+                email_hash for (email_hash,) in db.query(VendorRfpResponse.email_raw_text_hash)
+                .filter(VendorRfpResponse.fk_rfp_id == rfp_id).all()
+            }
+            archivable_hashes = candidate_hashes - TextBlobService._hashes_in_active_use(db, candidate_hashes)
+
+            hot_blobs = db.execute(
+                select(TextBlob).where(TextBlob.blob_hash.in_(archivable_hashes))
+            ).scalars().all() if archivable_hashes else []
+            archived_rows = []
+            for blob in hot_blobs:
+                blob_codec, blob_data = compress_text(
+                    decompress_text(blob.blob_codec, blob.blob_data),
+                    settings.text_blob_archive_compression_level
+                )
+                archived_rows.append({
+                    "blob_hash": blob.blob_hash,
+                    "blob_codec": blob_codec,
+                    "blob_data": blob_data,
+                    "blob_size": blob.blob_size,
+                    "blob_created_at": blob.blob_created_at,
+                    "blob_used_at": blob.blob_used_at,
+                    "blob_archived_at": datetime.utcnow()
+                })
+            if not archived_rows:
+                return 0
+
+            insert_ignoring_duplicates(db, ArchivedTextBlob, archived_rows)
+            db.execute(delete(TextBlob).where(TextBlob.blob_hash.in_([row["blob_hash"] for row in archived_rows])))
+            db.commit()
+            logger.info("Archived %d text blobs for RFP %s", len(archived_rows), rfp_id)
+            return len(archived_rows)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _hashes_in_active_use(db: Session, blob_hashes: Set[str]) -> Set[str]:
+        active_rfp_hashes = db.query(RfpInfo.rfp_raw_text_hash).filter(
+            RfpInfo.rfp_raw_text_hash.in_(blob_hashes),
+            RfpInfo.rfp_status.notin_(ARCHIVABLE_RFP_STATUSES)
+        ).all()
+        active_email_hashes = db.query(VendorRfpResponse.email_raw_text_hash).join(
+            RfpInfo, RfpInfo.rfp_id == VendorRfpResponse.fk_rfp_id
+        ).filter(
+            VendorRfpResponse.email_raw_text_hash.in_(blob_hashes),
+            RfpInfo.rfp_status.notin_(ARCHIVABLE_RFP_STATUSES)
+        ).all()
+        return {blob_hash for (blob_hash,) in active_rfp_hashes + active_email_hashes}
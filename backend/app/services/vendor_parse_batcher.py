@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Tuple
+
+from app.config import settings
+from app.services.ai_service import ai_service
+
+logger = logging.getLogger(__name__)
+
+
+class ParseFuture(Future):
+    """Future for one email's parse, noting how long LLM calls spent on it.
+
+    Time between ``submit`` and the result beyond ``llm_seconds`` was spent
+    waiting for a batch to fill or for an executor slot.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.llm_seconds = 0.0
+
+
+class VendorResponseParseBatcher:
+    """Micro-batches inbound vendor emails into multi-document LLM calls.
+
+    Emails are collected until ``max_batch_size`` are waiting or the oldest
+    has waited ``max_wait_seconds``, then parsed in a single request. Emails
+    the batch result does not cover cleanly are re-parsed singly, as separate
+    tasks on the same executor.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_seconds: float, max_concurrent_batches: int):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max_wait_seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix="parse-batch")
+        self._pending: List[Tuple[str, str, ParseFuture, float]] = []
+        self._condition = threading.Condition()
+        self._collector_thread = None
+
+    def submit(self, email_text: str, attachments_text: str = "") -> ParseFuture:
+        parse_result = ParseFuture()
+        with self._condition:
+            self._pending.append((email_text, attachments_text, parse_result, time.monotonic()))
+            if self._collector_thread is None:
+                self._collector_thread = threading.Thread(
+                    target=self._collect_batches, name="parse-batch-collector", daemon=True
+                )
+                self._collector_thread.start()
+            self._condition.notify()
+        return parse_result
+
+    def _collect_batches(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+
+                flush_at = self._pending[0][3] + self.max_wait_seconds
+                while len(self._pending) < self.max_batch_size:
+                    remaining = flush_at - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+
+            self.executor.submit(self._process_batch, batch)
+
+    def _process_batch(self, batch: List[Tuple[str, str, ParseFuture, float]]):
+        if len(batch) == 1:
+            email_text, attachments_text, parse_result, _ = batch[0]
+            self._parse_single(email_text, attachments_text, parse_result)
+            return
+
+        started_at = time.perf_counter()
+        try:
+            batch_results = ai_service.parse_vendor_responses_batch([
+                (email_text, attachments_text) for email_text, attachments_text, _, _ in batch
+            ])
+        except Exception:
+            logger.exception("Batched vendor response parsing failed, falling back to single calls")
+            batch_results = [None] * len(batch)
+        batch_seconds = time.perf_counter() - started_at
+
+        for (email_text, attachments_text, parse_result, _), batch_result in zip(batch, batch_results):
+            parse_result.llm_seconds += batch_seconds
+            if batch_result is None:
+                # Each retry is its own task, so a failed batch is re-parsed in parallel.
+                self.executor.submit(self._parse_single, email_text, attachments_text, parse_result)
+            else:
+                parse_result.set_result(batch_result)
+
+    @staticmethod
+    def _parse_single(email_text: str, attachments_text: str, parse_result: ParseFuture):
+        started_at = time.perf_counter()
+        try:
+            parsed_response = ai_service.parse_vendor_response(email_text, attachments_text)
+        except Exception as error:
+            parse_result.llm_seconds += time.perf_counter() - started_at
+            parse_result.set_exception(error)
+            return
+        parse_result.llm_seconds += time.perf_counter() - started_at
+        parse_result.set_result(parsed_response)
+
+
+vendor_parse_batcher = VendorResponseParseBatcher(
+    max_batch_size=settings.vendor_parse_batch_size,
+    max_wait_seconds=settings.vendor_parse_batch_wait_ms / 1000,
+    max_concurrent_batches=settings.vendor_parse_batch_concurrency
+)
@@ -0,0 +1,155 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.models import RfpInfo, RfpVendorDeliveryState, VendorPerformance, VendorRfpResponse
+from app.services.delivery_tracking_service import DeliveryTrackingService
+
+PERFORMANCE_COUNTERS = (
+    "rfps_invited",
+    "responses_received",
+    "reply_seconds_total",
+    "reply_samples",
+    "ai_score_total",
+    "ai_score_samples",
+    "win_count",
+    "price_to_budget_total",
+    "price_to_budget_samples",
+)
+
+
+def _price_to_budget(total_price: Optional[float], budget_max: Optional[float],
+                     budget_min: Optional[float]) -> Optional[float]:
+    budget = budget_max or budget_min
+    if total_price is None or not budget or budget <= 0:
+        return None
+    return total_price / budget
+
+
+class VendorPerformanceService:
+    """Keeps ``vendor_performance`` current with additive deltas, never by rescanning history.
+
+    Every update is an upsert adding deltas to the running totals, written in
+    the caller's transaction so it commits (or rolls back) with the change it
+    describes.
+    """
+
+    @staticmethod
+    def record_invitations(db: Session, rfp_id: int, vendor_ids: List[int]):
+        """Count an invitation the first time each vendor is sent a given RFP; call before recording the send."""
+        if not vendor_ids:
+            return
+        already_invited = {
+            vendor_id for (vendor_id,) in db.query(RfpVendorDeliveryState.vendor_id).filter(
+                RfpVendorDeliveryState.rfp_id == rfp_id,
+                RfpVendorDeliveryState.vendor_id.in_(vendor_ids)
+            ).all()
+        }
+        VendorPerformanceService._add_deltas(db, {
+            vendor_id: {"rfps_invited": 1} for vendor_id in set(vendor_ids) - already_invited
+        })
+
+    @staticmethod
+    def record_response(db: Session, rfp: RfpInfo, vendor_id: int, total_price: Optional[float],
+                        previous_total_price: Optional[float] = None, is_new_response: bool = True):
+        """Fold a saved vendor reply in; a re-sent reply only swaps its price-to-budget sample."""
+        deltas: Dict[str, float] = defaultdict(float)
+        if is_new_response:
+            deltas["responses_received"] += 1
+            delivery_state = db.query(RfpVendorDeliveryState.sent_at).filter(
+                RfpVendorDeliveryState.rfp_id == rfp.rfp_id,
+                RfpVendorDeliveryState.vendor_id == vendor_id
+            ).first()
+            if delivery_state is None:
+                # Replied without an emailed invitation; count one so the response rate stays <= 1. The
+                # state row it leaves stops record_invitations counting it again if the RFP is sent later.
+                if DeliveryTrackingService.record_unsent(db, rfp.rfp_id, vendor_id):
+                    deltas["rfps_invited"] += 1
+            elif delivery_state.sent_at is not None:
+                deltas["reply_seconds_total"] += max(0.0, (datetime.utcnow() - delivery_state.sent_at).total_seconds())
+                deltas["reply_samples"] += 1
+        else:
+            previous_ratio = _price_to_budget(previous_total_price, rfp.rfp_budget_max, rfp.rfp_budget_min)
+            if previous_ratio is not None:
+                deltas["price_to_budget_total"] -= previous_ratio
+                deltas["price_to_budget_samples"] -= 1
+
+        price_ratio = _price_to_budget(total_price, rfp.rfp_budget_max, rfp.rfp_budget_min)
+        if price_ratio is not None:
+            deltas["price_to_budget_total"] += price_ratio
+            deltas["price_to_budget_samples"] += 1
+        VendorPerformanceService._add_deltas(db, {vendor_id: deltas})
+
+    @staticmethod
+    def price_samples(db: Session, response_filter) -> Dict[int, Tuple[int, Optional[float]]]:
+        """Price-to-budget sample of each matching response, as {response id: (vendor id, ratio)}.
+
+        The rows are locked, so they can't change between this read and the write it brackets.
+        """
+        sample_rows = db.query(
+            VendorRfpResponse.id, VendorRfpResponse.fk_vendor_id, VendorRfpResponse.total_price,
+            RfpInfo.rfp_budget_max, RfpInfo.rfp_budget_min
+        ).join(RfpInfo, RfpInfo.rfp_id == VendorRfpResponse.fk_rfp_id).filter(response_filter).with_for_update().all()
+        return {
+            row.id: (row.fk_vendor_id, _price_to_budget(row.total_price, row.rfp_budget_max, row.rfp_budget_min))
+            for row in sample_rows
+        }
+
+    @staticmethod
+    def record_price_changes(db: Session, previous_samples: Dict[int, Tuple[int, Optional[float]]],
+                             samples: Dict[int, Tuple[int, Optional[float]]]):
+        """Swap responses' earlier price-to-budget samples (from ``price_samples``) for their current ones."""
+        vendor_deltas: Dict[int, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for vendor_id, previous_ratio in previous_samples.values():
+            if previous_ratio is not None:
+                vendor_deltas[vendor_id]["price_to_budget_total"] -= previous_ratio
+                vendor_deltas[vendor_id]["price_to_budget_samples"] -= 1
+        for vendor_id, ratio in samples.values():
+            if ratio is not None:
+                vendor_deltas[vendor_id]["price_to_budget_total"] += ratio
+                vendor_deltas[vendor_id]["price_to_budget_samples"] += 1
+        VendorPerformanceService._add_deltas(db, vendor_deltas)
+
+    @staticmethod
+    def record_evaluation(db: Session,
+                          score_changes: Iterable[Tuple[int, Optional[float], bool, Optional[float], bool]]):
+        """Apply re-scored responses as (vendor_id, old score, old recommended, new score, new recommended).
+
+        Swapping old for new makes re-evaluating an RFP replace its earlier scores instead of adding to them.
+        """
+        vendor_deltas: Dict[int, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for vendor_id, previous_score, previously_recommended, score, recommended in score_changes:
+            deltas = vendor_deltas[vendor_id]
+            if previous_score is not None:
+                deltas["ai_score_total"] -= previous_score
+                deltas["ai_score_samples"] -= 1
+            if score is not None:
+                deltas["ai_score_total"] += score
+                deltas["ai_score_samples"] += 1
+            deltas["win_count"] += int(bool(recommended)) - int(bool(previously_recommended))
+        VendorPerformanceService._add_deltas(db, vendor_deltas)
+
+    @staticmethod
+    def _add_deltas(db: Session, vendor_deltas: Dict[int, Dict[str, float]]):
+        rows = [
+            {
+                "vendor_id": vendor_id,
+                **{counter: deltas.get(counter, 0) for counter in PERFORMANCE_COUNTERS},
+                "performance_updated_at": datetime.utcnow()
+            }
+            for vendor_id, deltas in sorted(vendor_deltas.items()) if any(deltas.values())
+        ]
+        if not rows:
+            return
+        insert_statement = dialect_insert(db, VendorPerformance)
+        current = VendorPerformance.__table__.c
+        db.execute(insert_statement.on_conflict_do_update(
+            index_elements=["vendor_id"],
+            set_={
+                **{counter: current[counter] + insert_statement.excluded[counter] for counter in PERFORMANCE_COUNTERS},
+                "performance_updated_at": insert_statement.excluded.performance_updated_at
+            }
+        ), rows)
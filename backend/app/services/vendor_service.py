@@ -1,18 +1,30 @@
-from typing import List
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session, contains_eager, joinedload
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 
-from app.models import VendorInfo
-from app.schemas import VendorCreate, VendorUpdate
+from app.models import VendorInfo, VendorPerformance
+from app.schemas import VendorCreate, VendorUpdate, VendorListParams
+
+VENDOR_SORT_COLUMNS = {
+    "vendor_created_at": VendorInfo.vendor_created_at,
+    "vendor_rating": VendorInfo.vendor_rating,
+    "response_rate": VendorPerformance.response_rate,
+    "average_reply_hours": VendorPerformance.average_reply_hours,
+    "average_ai_score": VendorPerformance.average_ai_score,
+    "win_count": VendorPerformance.win_count,
+    "average_price_to_budget": VendorPerformance.average_price_to_budget,
+}
 
 
 class VendorService:
 
     @staticmethod
-    def create_vendor(database_session: Session, vendor_details: VendorCreate) -> VendorInfo:
+    def create_vendor(database_session: Session, tenant_id: str, vendor_details: VendorCreate) -> VendorInfo:
         try:
             new_vendor = VendorInfo(
+                tenant_id=tenant_id,
                 vendor_name=vendor_details.vendor_name,
                 vendor_email=vendor_details.vendor_email,
                 vendor_rating=vendor_details.vendor_rating
@@ -29,26 +41,54 @@ class VendorService:
             )
 
     @staticmethod
-    def get_all_vendors(database_session: Session) -> List[VendorInfo]:
-        return database_session.query(VendorInfo).order_by(VendorInfo.vendor_created_at.desc()).all()
+    def get_all_vendors(
+        database_session: Session,
+        tenant_id: str,
+        list_params: Optional[VendorListParams] = None
+    ) -> List[VendorInfo]:
+        sort_by = (list_params.sort_by if list_params else None) or "vendor_created_at"
+        sort_order = list_params.sort_order if list_params else "desc"
+        if sort_by not in VENDOR_SORT_COLUMNS:
+            raise HTTPException(
+                status_code=400, detail=f"sort_by must be one of: {', '.join(VENDOR_SORT_COLUMNS)}"
+            )
+        if sort_order not in ("asc", "desc"):
+            raise HTTPException(status_code=400, detail="sort_order must be asc or desc")
+
+        sort_column = VENDOR_SORT_COLUMNS[sort_by]
+        sort_expression = sort_column.asc() if sort_order == "asc" else sort_column.desc()
+        # Performance comes from the same join used for sorting, so listing stays one query.
+        return database_session.query(VendorInfo).outerjoin(VendorInfo.performance).options(
+            contains_eager(VendorInfo.performance)
+        ).filter(
+            VendorInfo.tenant_id == tenant_id, VendorInfo.vendor_deleted_at.is_(None)
+        ).order_by(sort_expression.nulls_last(), VendorInfo.vendor_id).all()
 
     @staticmethod
-    def get_vendor_by_id(database_session: Session, vendor_id: int) -> VendorInfo:
-        vendor_info = database_session.query(VendorInfo).filter(VendorInfo.vendor_id == vendor_id).first()
+    def get_vendor_by_id(database_session: Session, tenant_id: str, vendor_id: int) -> VendorInfo:
+        vendor_info = database_session.query(VendorInfo).options(
+            joinedload(VendorInfo.performance)
+        ).filter(
+            VendorInfo.tenant_id == tenant_id, VendorInfo.vendor_id == vendor_id, VendorInfo.vendor_deleted_at.is_(None)
+        ).first()
         if not vendor_info:
             raise HTTPException(status_code=404, detail="Vendor not found")
         return vendor_info
 
     @staticmethod
-    def get_vendor_by_email(database_session: Session, email: str) -> VendorInfo:
-        vendor_info = database_session.query(VendorInfo).filter(VendorInfo.vendor_email == email).first()
+    def get_vendor_by_email(database_session: Session, tenant_id: str, email: str) -> VendorInfo:
+        vendor_info = database_session.query(VendorInfo).filter(
+            VendorInfo.tenant_id == tenant_id, VendorInfo.vendor_email == email, VendorInfo.vendor_deleted_at.is_(None)
+        ).first()
         if not vendor_info:
             raise HTTPException(status_code=404, detail="Vendor not found")
         return vendor_info
 
     @staticmethod
-    def update_vendor(database_session: Session, vendor_id: int, vendor_updates: VendorUpdate) -> VendorInfo:
-        existing_vendor = VendorService.get_vendor_by_id(database_session, vendor_id)
+    def update_vendor(
+        database_session: Session, tenant_id: str, vendor_id: int, vendor_updates: VendorUpdate
+    ) -> VendorInfo:
+        existing_vendor = VendorService.get_vendor_by_id(database_session, tenant_id, vendor_id)
 
         if vendor_updates.vendor_name is not None:
             existing_vendor.vendor_name = vendor_updates.vendor_name
@@ -69,18 +109,8 @@ class VendorService:
             )
 
     @staticmethod
-    def delete_vendor(database_session: Session, vendor_id: int):
-        try:
-            vendor = database_session.query(VendorInfo).filter(VendorInfo.vendor_id == vendor_id).first()
-            if not vendor:
-                raise HTTPException(status_code=404, detail="Vendor not found")
-            
-            database_session.delete(vendor)
-            database_session.commit()
-            
-        except IntegrityError:
-            database_session.rollback()
-            raise HTTPException(
-                status_code=400, 
-                detail="Can't delete this vendor as it has associated RFP responses."
-            )
+    def delete_vendor(database_session: Session, tenant_id: str, vendor_id: int):
+        # Soft delete; the purge job removes the vendor and its responses in batches later.
+        vendor = VendorService.get_vendor_by_id(database_session, tenant_id, vendor_id)
+        vendor.vendor_deleted_at = datetime.utcnow()
+        database_session.commit()
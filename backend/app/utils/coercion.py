@@ -0,0 +1,107 @@
+import re
+from typing import Any, Optional
+
+NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+MAGNITUDE_SUFFIXES = {
+    "k": 1_000,
+    "thousand": 1_000,
+    "m": 1_000_000,
+    "mm": 1_000_000,
+    "million": 1_000_000,
+    "b": 1_000_000_000,
+    "bn": 1_000_000_000,
+    "billion": 1_000_000_000
+}
+AMOUNT_PATTERN = re.compile(
+    r"(-?\d+(?:\.\d+)?)\s*(" + "|".join(sorted(MAGNITUDE_SUFFIXES, key=len, reverse=True)) + r")?\b",
+    re.IGNORECASE
+)
+DURATION_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)(?:\s*(?:-|to)\s*(\d+(?:\.\d+)?))?\s*"
+    r"(business days?|working days?|days?|weeks?|wks?|months?|mos?|years?|yrs?)",
+    re.IGNORECASE
+)
+DAYS_PER_UNIT = {
+    "business day": 7 / 5,
+    "working day": 7 / 5,
+    "day": 1,
+    "week": 7,
+    "wk": 7,
+    "month": 30,
+    "mo": 30,
+    "year": 365,
+    "yr": 365
+}
+YEARS_PER_UNIT = {unit: days / 365 for unit, days in DAYS_PER_UNIT.items()}
+YEARS_PER_UNIT.update({"month": 1 / 12, "mo": 1 / 12, "year": 1, "yr": 1})
+NULL_STRINGS = {"", "null", "none", "n/a", "na", "not specified", "not found", "unknown", "-"}
+
+
+def is_null_like(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and value.strip().lower() in NULL_STRINGS)
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """Coerce money-ish values such as ``"$12,000"``, ``"12k"`` or ``"USD 1.2 million"``."""
+    if is_null_like(value):
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"not an amount: {value!r}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        raise ValueError(f"not an amount: {value!r}")
+
+    match = AMOUNT_PATTERN.search(value.replace(",", ""))
+    if not match:
+        raise ValueError(f"not an amount: {value!r}")
+    multiplier = MAGNITUDE_SUFFIXES.get((match.group(2) or "").lower(), 1)
+    return float(match.group(1)) * multiplier
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """Coerce plain numeric strings such as ``"85"`` or ``"85/100"`` (first number wins)."""
+    if is_null_like(value):
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"not a number: {value!r}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = NUMBER_PATTERN.search(value.replace(",", ""))
+        if match:
+            return float(match.group(0))
+    raise ValueError(f"not a number: {value!r}")
+
+
+def _parse_duration(value: Any, units_per_unit: dict) -> Optional[float]:
+    if is_null_like(value):
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"not a duration: {value!r}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        raise ValueError(f"not a duration: {value!r}")
+    if NUMBER_PATTERN.fullmatch(value.strip()):
+        # A bare number is already in the target unit.
+        return float(value.strip())
+
+    match = DURATION_PATTERN.search(value)
+    if not match:
+        raise ValueError(f"not a duration: {value!r}")
+    amount = float(match.group(2) or match.group(1))
+    unit = match.group(3).lower().rstrip("s")
+    return amount * units_per_unit[unit]
+
+
+def parse_duration_days(value: Any) -> Optional[int]:
+    """Coerce durations such as ``"6 weeks"`` or ``"2-3 months"`` to days (upper bound of a range)."""
+    days = _parse_duration(value, DAYS_PER_UNIT)
+    return None if days is None else round(days)
+
+
+def parse_duration_years(value: Any) -> Optional[float]:
+    """Coerce durations such as ``"24 months"`` or ``"2 years"`` to years."""
+    years = _parse_duration(value, YEARS_PER_UNIT)
+    return None if years is None else round(years, 2)
@@ -0,0 +1,34 @@
+import hashlib
+import zlib
+from typing import Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZSTD_CODEC = "zstd"
+ZLIB_CODEC = "zlib"
+ZLIB_MAX_LEVEL = 9
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress_text(text: str, level: int) -> Tuple[str, bytes]:
+    """Compress with zstd when available, zlib otherwise. Returns (codec, data)."""
+    encoded = text.encode("utf-8")
+    if zstandard is not None:
+        return ZSTD_CODEC, zstandard.ZstdCompressor(level=level).compress(encoded)
+    return ZLIB_CODEC, zlib.compress(encoded, min(level, ZLIB_MAX_LEVEL))
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    if codec == ZSTD_CODEC:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed text")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if codec == ZLIB_CODEC:
+        return zlib.decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown text codec: {codec}")
@@ -0,0 +1,39 @@
+import hashlib
+import hmac
+import re
+from typing import Optional, Tuple
+
+from app.config import settings
+
+REPLY_TOKEN_PATTERN = re.compile(r"\[ref:(\d+)-(\d+)-([0-9a-f]{16})\]")
+SIGNATURE_LENGTH = 16
+
+
+def _secret() -> bytes:
+    return (settings.email_reply_token_secret or settings.sendgrid_api_key).encode()
+
+
+def _signature(rfp_id: int, vendor_id: int) -> str:
+    message = f"{rfp_id}:{vendor_id}".encode()
+    return hmac.new(_secret(), message, hashlib.sha256).hexdigest()[:SIGNATURE_LENGTH]
+
+
+def make_reply_token(rfp_id: int, vendor_id: int) -> str:
+    return f"{rfp_id}-{vendor_id}-{_signature(rfp_id, vendor_id)}"
+
+
+def reply_tag(reply_token: str) -> str:
+    return f"[ref:{reply_token}]"
+
+
+def find_reply_reference(text: str) -> Optional[Tuple[int, int]]:
+    """Return (rfp_id, vendor_id) from the first validly signed reply tag in ``text``."""
+    for match in REPLY_TOKEN_PATTERN.finditer(text or ""):
+        rfp_id, vendor_id, signature = int(match.group(1)), int(match.group(2)), match.group(3)
+        if hmac.compare_digest(signature, _signature(rfp_id, vendor_id)):
+            return rfp_id, vendor_id
+    return None
+
+
+def strip_reply_tags(text: str) -> str:
+    return REPLY_TOKEN_PATTERN.sub("", text).strip()
@@ -0,0 +1,55 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from functools import wraps
+from typing import Dict, Optional
+
+# Wall-clock seconds per category for the request being handled. The dict is
+# shared by every context copied from the request (threadpool calls included).
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def start_request_timing() -> Token:
+    return _request_timings.set({})
+
+
+def finish_request_timing(token: Token) -> Dict[str, float]:
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    return timings
+
+
+def current_request_timings() -> Optional[Dict[str, float]]:
+    return _request_timings.get()
+
+
+def record_timing(category: str, seconds: float):
+    """Add an already measured duration to ``category`` for the current request, if any."""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[category] = timings.get(category, 0.0) + seconds
+
+
+@contextmanager
+def timed(category: str):
+    """Add the block's wall time to ``category`` for the current request, if any."""
+    timings = _request_timings.get()
+    if timings is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[category] = timings.get(category, 0.0) + time.perf_counter() - started_at
+
+
+def timed_call(category: str):
+    """Decorator form of ``timed``."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed(category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
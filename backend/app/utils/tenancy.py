@@ -0,0 +1,33 @@
+import re
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.config import settings
+
+TENANT_HEADER = "X-Tenant-ID"
+TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+def resolve_tenant_id(header_value: Optional[str]) -> Optional[str]:
+    """Tenant for a raw header value: the default tenant when absent (unless required), None if invalid."""
+    if not header_value:
+        return None if settings.tenant_header_required else settings.default_tenant_id
+    return header_value if TENANT_ID_PATTERN.match(header_value) else None
+
+
+def get_tenant_id(x_tenant_id: Optional[str] = Header(None, alias=TENANT_HEADER)) -> str:
+    tenant_id = resolve_tenant_id(x_tenant_id)
+    if tenant_id is None:
+        if not x_tenant_id:
+            raise HTTPException(status_code=400, detail=f"{TENANT_HEADER} header is required")
+        raise HTTPException(status_code=400, detail=f"Invalid {TENANT_HEADER} header")
+    return tenant_id
+
+
+def scope_tenant_id(scope) -> Optional[str]:
+    """Tenant of a raw ASGI request, for middleware that runs before dependencies."""
+    for header_name, header_value in scope.get("headers", []):
+        if header_name == b"x-tenant-id":
+            return resolve_tenant_id(header_value.decode("latin-1"))
+    return resolve_tenant_id(None)
@@ -0,0 +1,55 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+
+class TenantLRUCache:
+    """LRU cache bounded in total, with each tenant's share capped.
+
+    A tenant holds at most ``max_entries_per_tenant`` entries; beyond that it
+    only evicts its own. When the whole cache is full, the entry evicted is
+    the least recently used one of the *largest* tenant, so a burst of new
+    (or made-up) tenants trims the biggest partitions one entry at a time
+    instead of dropping anyone's hot set wholesale.
+    """
+
+    def __init__(self, max_entries: int, max_entries_per_tenant: int):
+        self.max_entries = max_entries
+        self.max_entries_per_tenant = max(1, min(max_entries_per_tenant, max_entries))
+        self._partitions: "OrderedDict[str, OrderedDict[Hashable, Any]]" = OrderedDict()
+        self._entry_count = 0
+        self._lock = Lock()
+
+    def get(self, tenant_id: str, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            partition = self._partitions.get(tenant_id)
+            if partition is None or key not in partition:
+                return None
+            self._partitions.move_to_end(tenant_id)
+            partition.move_to_end(key)
+            return partition[key]
+
+    def put(self, tenant_id: str, key: Hashable, value: Any):
+        with self._lock:
+            partition = self._partitions.get(tenant_id)
+            if partition is None:
+                partition = self._partitions[tenant_id] = OrderedDict()
+            else:
+                self._partitions.move_to_end(tenant_id)
+            if key not in partition:
+                self._entry_count += 1
+            partition[key] = value
+            partition.move_to_end(key)
+
+            if len(partition) > self.max_entries_per_tenant:
+                self._evict_from(tenant_id)
+            while self._entry_count > self.max_entries:
+                # max() keeps the first of equal sizes, i.e. the least recently used tenant.
+                self._evict_from(max(self._partitions, key=lambda tenant: len(self._partitions[tenant])))
+
+    def _evict_from(self, tenant_id: str):
+        partition = self._partitions[tenant_id]
+        partition.popitem(last=False)
+        self._entry_count -= 1
+        if not partition:
+            del self._partitions[tenant_id]
@@ -0,0 +1,45 @@
+import time
+from threading import Lock
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def seconds_until_available(self, tokens: float = 1.0) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            missing_tokens = tokens - self._tokens
+            if missing_tokens <= 0:
+                return 0.0
+            return missing_tokens / self.rate if self.rate > 0 else float("inf")
+
+    def acquire(self, tokens: float = 1.0, timeout: float = 0.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.try_acquire(tokens):
+                return True
+            wait_seconds = self.seconds_until_available(tokens)
+            if time.monotonic() + wait_seconds > deadline:
+                return False
+            time.sleep(wait_seconds)
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Settings are read at import time; tests run offline against SQLite and the mock LLM backend.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SENDGRID_API_KEY", "test")
+os.environ.setdefault("SENDGRID_FROM_EMAIL", "rfp@example.com")
+os.environ.setdefault("LLM_PROVIDER_ORDER", "mock")
+os.environ.setdefault("ENVIRONMENT", "test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
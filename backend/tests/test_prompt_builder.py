@@ -0,0 +1,74 @@
+import json
+
+from app.models.models import RfpInfo, VendorRfpResponse
+from app.services.ai_service import AIService
+from app.services.llm_router import LLMRouter, MockLLMBackend
+from app.services.prompt_builder import PromptBuilder, count_tokens
+
+TOKEN_BUDGET = 1500
+
+
+def _mock_ai_service(vendor_ids):
+    def respond(model, messages):
+        return json.dumps({
+            "recommendations": {str(vendor_id): 50 for vendor_id in vendor_ids},
+            "best_vendor_id": vendor_ids[0],
+            "reasoning": "ok"
+        })
+
+    backend = MockLLMBackend(responder=respond)
+    router = LLMRouter(request_timeout_seconds=5, hedge_min_delay_seconds=1)
+    router.register(backend, rate_per_second=100, burst=100, failure_threshold=5, reset_timeout_seconds=30)
+    return AIService(router), backend
+
+
+def test_large_evaluation_prompt_is_trimmed_to_budget(monkeypatch):
+    monkeypatch.setattr("app.services.prompt_builder.settings.llm_prompt_token_budget", TOKEN_BUDGET)
+    rfp = RfpInfo(rfp_title="Office laptops", rfp_structured_json={
+        "requirements": [f"Requirement {index}: " + "detailed specification text " * 20 for index in range(200)],
+        "evaluation_criteria": ["criterion " * 50 for _ in range(50)],
+        "budget_range": {"min": 10000, "max": 50000},
+        "timeline": "30 days"
+    })
+    vendor_ids = list(range(1, 31))
+    responses = [
+        VendorRfpResponse(
+            fk_vendor_id=vendor_id, total_price=1000.0 * vendor_id, delivery_days=14, warranty_years=2,
+            payment_terms="Net 30", email_parsed_json={"additional_notes": "long vendor note " * 200}
+        )
+        for vendor_id in vendor_ids
+    ]
+    ai_service, backend = _mock_ai_service(vendor_ids)
+
+    result = ai_service.evaluate_vendor_responses(rfp, responses)
+
+    prompt = backend.calls[0]["messages"][0]["content"]
+    assert count_tokens(prompt) <= TOKEN_BUDGET
+    # Required context survives whole: every vendor's row and the RFP basics.
+    assert "Office laptops" in prompt
+    for vendor_id in vendor_ids:
+        assert f"\n{vendor_id}|{1000 * vendor_id}|14|2|Net 30" in prompt
+    assert set(result["recommendations"]) == set(vendor_ids)
+
+
+def test_required_sections_are_never_truncated():
+    email_text = "quote " * 2000
+    prompt = PromptBuilder("parse", "Parse it.", token_budget=200).add_text("Email Text", email_text).build()
+
+    assert email_text.strip() in prompt.text
+    assert prompt.over_budget
+
+
+def test_optional_sections_of_equal_priority_shrink_evenly():
+    builder = PromptBuilder("parse", "Parse them.", token_budget=400)
+    for index in range(3):
+        builder.add_text(f"Email {index}", f"body {index}")
+        builder.add_text(f"Email {index} Attachments", "attachment text " * 500, required=False)
+
+    prompt = builder.build()
+
+    assert not prompt.over_budget
+    shrink_levels = [section.shrink_level for section in builder.sections if not section.required]
+    assert max(shrink_levels) - min(shrink_levels) <= 1
+    for index in range(3):
+        assert f"body {index}" in prompt.text
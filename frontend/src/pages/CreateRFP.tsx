@@ -15,7 +15,7 @@ export default function CreateRFP() {
     setIsSubmitting(true);
     try {
       const rfp = await rfpService.createRFP(data);
-      toast.success('RFP created successfully! AI has parsed your requirements.');
+      toast.success('RFP created successfully! AI is parsing your requirements.');
       navigate(`/rfps/${rfp.rfp_id}`);
     } catch (error: any) {
       toast.error(error.response?.data?.detail || 'Failed to create RFP');
@@ -14,6 +14,16 @@ export default function Dashboard() {
     loadDashboardData();
   }, []);
 
+  useEffect(() => {
+    return rfpService.subscribeToAllRFPEvents((event) => {
+      if (event.type === 'rfp.status_changed' || event.type === 'rfp.deleted') {
+        rfpService.getAllRFPs().then(setRFPs).catch((error) => {
+          console.error('Failed to refresh RFPs:', error);
+        });
+      }
+    });
+  }, []);
+
   const loadDashboardData = async () => {
     try {
       setLoading(true);
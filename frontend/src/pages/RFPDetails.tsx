@@ -21,16 +21,20 @@ export default function RFPDetails() {
     }
   }, [id]);
 
-  // Poll for responses every 30 seconds if RFP is sent
+  // Refresh on live server events instead of polling
   useEffect(() => {
-    if (rfp?.rfp_status === 'SENT') {
-      const interval = setInterval(() => {
-        loadResponses();
-      }, 30000); // 30 seconds
-
-      return () => clearInterval(interval);
+    if (!id) {
+      return;
     }
-  }, [rfp?.rfp_status, id]);
+
+    return rfpService.subscribeToRFPEvents(Number(id), (event) => {
+      if (event.type === 'response.upserted') {
+        loadResponses();
+      } else if (event.type === 'rfp.status_changed') {
+        loadRFPData();
+      }
+    });
+  }, [id]);
 
   const loadRFPData = async () => {
     try {
@@ -38,7 +42,7 @@ export default function RFPDetails() {
       const rfpData = await rfpService.getRFPById(Number(id));
       setRFP(rfpData);
       
-      if (rfpData.rfp_status !== 'DRAFT') {
+      if (rfpData.rfp_status === 'SENT' || rfpData.rfp_status === 'EVALUATED') {
         await loadResponses();
       }
     } catch (error) {
@@ -204,7 +208,7 @@ export default function RFPDetails() {
           )}
 
           {/* Vendor Responses */}
-          {rfp.rfp_status !== 'DRAFT' && (
+          {(rfp.rfp_status === 'SENT' || rfp.rfp_status === 'EVALUATED') && (
             <div className="card">
               <div className="flex items-center justify-between mb-4">
                 <h2 className="text-xl font-semibold">Vendor Responses ({responses.length})</h2>
@@ -262,6 +266,17 @@ export default function RFPDetails() {
                         </div>
                       </div>
 
+                      <details className="mb-3">
+                        <summary className="text-sm text-gray-600 cursor-pointer">Original email</summary>
+                        {response.email_raw_text ? (
+                          <p className="mt-2 text-sm text-gray-700 whitespace-pre-wrap">{response.email_raw_text}</p>
+                        ) : (
+                          <p className="mt-2 text-sm text-gray-500 italic">
+                            No longer stored (retention period passed); the parsed fields above are kept.
+                          </p>
+                        )}
+                      </details>
+
                       {response.ai_score && (
                         <div className="pt-3 border-t border-gray-300">
                           <p className="text-sm text-gray-600">AI Score: <span className="font-semibold">{response.ai_score}/100</span></p>
@@ -42,6 +42,10 @@ export default function RFPs() {
 
   const getStatusColor = (status: string) => {
     switch (status) {
+      case 'PARSING':
+        return 'bg-yellow-100 text-yellow-700';
+      case 'PARSE_FAILED':
+        return 'bg-red-100 text-red-700';
       case 'DRAFT':
         return 'bg-gray-200 text-gray-700';
       case 'SENT':
@@ -4,7 +4,8 @@ const API_BASE_URL = 'http://localhost:4200';
 
 export const api = axios.create({
   baseURL: API_BASE_URL,
-//   withCredentials: false, 
+  // Sends the read-your-writes cookie so reads after a write hit the primary database
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   },
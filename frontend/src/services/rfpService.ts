@@ -1,5 +1,14 @@
 import api from './api';
-import type { ApiResponse, RFP, RFPCreate, RFPSendRequest, VendorResponse, Evaluation } from '../types';
+import type { ApiResponse, RFP, RFPCreate, RFPEvent, RFPSendRequest, RFPStatus, VendorResponse, Evaluation } from '../types';
+
+const RFP_EVENT_TYPES: RFPEvent['type'][] = ['rfp.status_changed', 'rfp.deleted', 'response.upserted', 'evaluation.completed'];
+
+const subscribeToEvents = (path: string, onEvent: (event: RFPEvent) => void): (() => void) => {
+  const source = new EventSource(`${api.defaults.baseURL}${path}`);
+  const handleMessage = (message: MessageEvent) => onEvent(JSON.parse(message.data));
+  RFP_EVENT_TYPES.forEach((type) => source.addEventListener(type, handleMessage));
+  return () => source.close();
+};
 
 export const rfpService = {
   // Get all RFPs
@@ -20,6 +29,12 @@ export const rfpService = {
     return response.data.data;
   },
 
+  // Get RFP parsing status
+  getRFPStatus: async (id: number): Promise<RFPStatus> => {
+    const response = await api.get<ApiResponse<RFPStatus>>(`/rfp_management/rfps/${id}/status`);
+    return response.data.data;
+  },
+
   // Delete RFP
   deleteRFP: async (id: number): Promise<void> => {
     await api.delete(`/rfp_management/rfps/${id}`);
@@ -42,4 +57,12 @@ export const rfpService = {
     const response = await api.post<ApiResponse<Evaluation>>(`/rfp_management/rfps/${id}/evaluate`);
     return response.data.data;
   },
+
+  // Subscribe to live updates for one RFP; returns an unsubscribe function
+  subscribeToRFPEvents: (id: number, onEvent: (event: RFPEvent) => void): (() => void) =>
+    subscribeToEvents(`/rfp_management/events/rfps/${id}`, onEvent),
+
+  // Subscribe to live updates for all RFPs; returns an unsubscribe function
+  subscribeToAllRFPEvents: (onEvent: (event: RFPEvent) => void): (() => void) =>
+    subscribeToEvents('/rfp_management/events', onEvent),
 };
@@ -32,7 +32,7 @@ export interface RFP {
   rfp_title: string;
   rfp_raw_text: string;
   rfp_structured_json: RFPStructuredData | null;
-  rfp_status: 'DRAFT' | 'SENT' | 'EVALUATED';
+  rfp_status: 'PARSING' | 'PARSE_FAILED' | 'DRAFT' | 'SENT' | 'EVALUATED';
   rfp_created_at: string;
 }
 
@@ -53,6 +53,13 @@ export interface RFPCreate {
   rfp_raw_text: string;
 }
 
+export interface RFPStatus {
+  rfp_id: number;
+  rfp_status: RFP['rfp_status'];
+  is_parsed: boolean;
+  is_parsing: boolean;
+}
+
 export interface RFPSendRequest {
   vendor_ids: number[];
 }
@@ -63,7 +70,8 @@ export interface VendorResponse {
   fk_rfp_id: number;
   fk_vendor_id: number;
   vendor_name: string;
-  email_raw_text: string;
+  // null once the raw email has passed the retention period
+  email_raw_text: string | null;
   email_parsed_json: {
     total_price: number;
     delivery_days: number;
@@ -80,6 +88,15 @@ export interface VendorResponse {
   response_created_at: string;
 }
 
+// Live Event Types
+export interface RFPEvent {
+  id: number;
+  type: 'rfp.status_changed' | 'rfp.deleted' | 'response.upserted' | 'evaluation.completed';
+  rfp_id: number | null;
+  data: Record<string, unknown>;
+  published_at: string;
+}
+
 // Evaluation Types
 export interface Evaluation {
   recommendations: Record<string, number>;